@@ -0,0 +1,18 @@
+import click
+from flask.cli import AppGroup
+
+from App.utils.static_files import get_static_asset_manifest
+
+assets_cli = AppGroup('assets', help='Static asset commands')
+
+
+@assets_cli.command("manifest", help="Lists the fingerprinted static assets and their precompressed sizes")
+def manifest_command():
+    manifest = get_static_asset_manifest()
+    if manifest is None:
+        click.echo("Static asset fingerprinting is off (debug mode or STATIC_ASSET_FINGERPRINTING).")
+        return
+
+    for asset in sorted(manifest, key=lambda asset: asset.path):
+        encodings = ", ".join(f"{encoding}: {len(content)} B" for encoding, content in asset.encodings.items())
+        click.echo(f"{asset.path} -> {asset.fingerprinted_path}" + (f" ({encodings})" if encodings else ""))
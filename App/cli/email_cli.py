@@ -0,0 +1,23 @@
+import click
+from flask.cli import AppGroup
+from sqlalchemy import func
+
+from App.database import db
+from App.models import EmailOutboxMessage
+from App.utils.email_outbox import dispatch_email_outbox
+
+email_cli = AppGroup('email', help='Email outbox commands')
+
+
+@email_cli.command("dispatch", help="Sends the emails waiting in the outbox (e.g. from a cron job)")
+@click.option("--max-batches", type=int, default=None, help="Stop after this many batches")
+def dispatch_command(max_batches):
+    sent = dispatch_email_outbox(max_batches)
+    click.echo(f"Sent {sent} email(s).")
+
+
+@email_cli.command("status", help="Counts the outbox messages by delivery status")
+def status_command():
+    counts = db.session.query(EmailOutboxMessage.status, func.count()).group_by(EmailOutboxMessage.status).all()
+    for status, count in sorted(counts):
+        click.echo(f"{status}: {count}")
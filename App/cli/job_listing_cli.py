@@ -4,6 +4,9 @@ from App.controllers.job_listing import (
     add_job_listing,
     get_all_job_listings,
 )
+from App.models import JobListing
+from App.utils.db_utils import iter_json_array, iter_json_records
+from App.utils.search_index import rebuild_search_index
 
 job_listing_cli = AppGroup('listing', help='Listing object commands')
 
@@ -11,7 +14,20 @@ job_listing_cli = AppGroup('listing', help='Listing object commands')
 @job_listing_cli.command("list", help="Lists listings in the database")
 @click.option("--jsonify-results", is_flag=True, help="Return results in JSON format")
 def list_listing_command(jsonify_results):
-    print(get_all_job_listings(jsonify_results))
+    if jsonify_results:
+        # Written as it is read, straight from the listings' columns, however many there are
+        for chunk in iter_json_array(iter_json_records(JobListing.query)):
+            click.echo(chunk, nl=False)
+        click.echo()
+        return
+
+    print(get_all_job_listings())
+
+
+@job_listing_cli.command("reindex", help="Rebuilds the full-text search index for job listings")
+def reindex_listings_command():
+    indexed = rebuild_search_index()
+    click.echo(f"Indexed {indexed} job listing(s).")
 
 
 # flask listing add
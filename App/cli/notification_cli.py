@@ -0,0 +1,24 @@
+import click
+from flask.cli import AppGroup
+
+from App.controllers.listing_digests import flush_listing_digests
+from App.controllers.notification_archive import archive_reviewed_notifications
+
+notification_cli = AppGroup('notification', help='Notification maintenance commands')
+
+
+@notification_cli.command("archive", help="Moves old reviewed notifications into the archive as digests")
+@click.option("--older-than-days", type=float, default=None, help="Retention period (NOTIFICATION_RETENTION_DAYS)")
+@click.option("--batch-size", type=int, default=None, help="Notifications moved per transaction")
+@click.option("--jsonl", "path", type=click.Path(dir_okay=False), default=None,
+              help="Append the digests to this JSONL file instead of the archive table")
+@click.option("--max-batches", type=int, default=None, help="Stop after this many batches")
+def archive_command(older_than_days, batch_size, path, max_batches):
+    archived = archive_reviewed_notifications(older_than_days, batch_size, path, max_batches)
+    click.echo(f"Archived {archived} notification(s).")
+
+
+@notification_cli.command("flush-digests", help="Sends the buffered listing events to subscribers as digests")
+def flush_digests_command():
+    notified = flush_listing_digests()
+    click.echo(f"Sent digests to {notified} subscriber(s).")
@@ -0,0 +1,19 @@
+import click
+from flask.cli import AppGroup
+
+from App.utils.resume_storage import collect_unused_resumes, import_legacy_resumes
+
+resume_cli = AppGroup('resume', help='Resume storage commands')
+
+
+@resume_cli.command("gc", help="Deletes the stored resumes that no job application uses")
+@click.option("--grace-seconds", type=float, default=None, help="Spare files uploaded this recently")
+def gc_command(grace_seconds):
+    deleted = collect_unused_resumes(grace_seconds)
+    click.echo(f"Deleted {deleted} unused resume(s).")
+
+
+@resume_cli.command("import-legacy", help="Moves resumes saved under their upload filename into the content-addressed storage")
+def import_legacy_command():
+    updated = import_legacy_resumes()
+    click.echo(f"Updated {updated} job application(s).")
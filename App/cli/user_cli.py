@@ -1,5 +1,7 @@
 import click
 from flask.cli import AppGroup
+from App.controllers.account_directory import get_account_directory_conflicts, rebuild_account_directory
+from App.controllers.notification_counts import recount_unread_notifications
 from App.controllers.base_user_account import (
     get_all_users, get_all_users_json
 )
@@ -10,3 +12,20 @@ user_cli = AppGroup('user', help='User commands')
 @click.argument("format", default="string")
 def list_user_command(format):
     print(get_all_users() if format == 'string' else get_all_users_json())
+
+
+@user_cli.command("rebuild-directory", help="Rebuilds the account directory used for login and uniqueness lookups")
+def rebuild_directory_command():
+    for conflict in get_account_directory_conflicts():
+        click.echo(
+            f"Skipped {conflict['field']} <{conflict['value']}> of {conflict['account_type']} "
+            f"{conflict['account_id']}: already held by {conflict['held_by'][0]} {conflict['held_by'][1]}"
+        )
+    accounts = rebuild_account_directory()
+    click.echo(f"Added {accounts} account(s) to the directory.")
+
+
+@user_cli.command("recount-notifications", help="Recomputes every account's unread notification counter")
+def recount_notifications_command():
+    corrected = recount_unread_notifications()
+    click.echo(f"Corrected the unread notification counter of {corrected} account(s).")
@@ -12,7 +12,8 @@ def load_config(app, overrides):
 
     # Core settings
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['TEMPLATES_AUTO_RELOAD'] = True
+    # TEMPLATES_AUTO_RELOAD is left to the configuration (e.g. FLASK_TEMPLATES_AUTO_RELOAD); by default,
+    # templates are reloaded on change in debug mode only, so that production can cache rendered fragments
     app.config['PREFERRED_URL_SCHEME'] = 'https'
     app.config['UPLOADED_PHOTOS_DEST'] = "App/uploads"
 
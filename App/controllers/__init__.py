@@ -1,10 +1,17 @@
+from .account_directory import *
 from .base_user_account import *
+from .loading_profiles import *
 from .auth import *
 
 from .admin_account import *
 from .alumnus_account import *
 from .company_account import *
 from .job_listing import *
+from .listing_validators import *
 from .notifications import *
+from .notification_counts import *
+from .notification_events import *
+from .notification_archive import *
+from .listing_digests import *
 from .company_subscription import *
 from .job_applications import *
\ No newline at end of file
@@ -0,0 +1,215 @@
+from flask import current_app
+from sqlalchemy import and_, delete, event, inspect, or_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+
+from App.database import db
+from App.models import (
+    ACCOUNT_TYPES, DIRECTORY_FIELDS, GLOBAL_DIRECTORY_FIELDS, AccountDirectoryEntry, BaseUserAccount, get_account_type
+)
+
+"""
+===== DIRECTORY MAINTENANCE =====
+"""
+
+
+def _get_directory_rows(account: BaseUserAccount, fields=DIRECTORY_FIELDS) -> List[dict]:
+    account_type = get_account_type(account)
+    return [
+        {"field": field, "value": getattr(account, field), "account_type": account_type, "account_id": account.id}
+        for field in fields if getattr(account, field, None)
+    ]
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_account_directory(session, flush_context) -> None:
+    """
+    Keeps the account directory in step with every flushed account insert, update and delete.
+
+    The directory rows are written on the flush's own connection, so they are committed or
+    rolled back together with the account changes made by the account controllers.
+    """
+    connection = session.connection()
+    table = AccountDirectoryEntry.__table__
+
+    for account in session.deleted:
+        if get_account_type(account):
+            connection.execute(delete(table).where(
+                table.c.account_type == get_account_type(account), table.c.account_id == account.id
+            ))
+
+    rows = []
+    for account in session.new:
+        if get_account_type(account):
+            rows.extend(_get_directory_rows(account))
+
+    for account in session.dirty:
+        if not get_account_type(account):
+            continue
+
+        state = inspect(account)
+        changed_fields = [
+            field for field in DIRECTORY_FIELDS
+            if field in state.attrs and state.attrs[field].history.has_changes()
+        ]
+        if changed_fields:
+            connection.execute(delete(table).where(
+                table.c.account_type == get_account_type(account),
+                table.c.account_id == account.id,
+                table.c.field.in_(changed_fields)
+            ))
+            rows.extend(_get_directory_rows(account, changed_fields))
+
+    if rows:
+        connection.execute(table.insert(), rows)
+
+
+def _get_directory_key(row: dict) -> tuple:
+    if row["field"] in GLOBAL_DIRECTORY_FIELDS:
+        return row["field"], row["value"]
+    return row["field"], row["value"], row["account_type"]
+
+
+def _get_all_directory_rows() -> Tuple[int, List[dict], List[dict]]:
+    accounts = [account for model in ACCOUNT_TYPES.values() for account in model.query.all()]
+    rows, conflicts, holders = [], [], {}
+    for row in (row for account in accounts for row in _get_directory_rows(account)):
+        key = _get_directory_key(row)
+        if key in holders:
+            conflicts.append({**row, "held_by": holders[key]})
+        else:
+            holders[key] = (row["account_type"], row["account_id"])
+            rows.append(row)
+    return len(accounts), rows, conflicts
+
+
+def get_account_directory_conflicts() -> List[dict]:
+    """
+    Finds the account field values the directory cannot hold, as another account already holds them
+    (e.g. two accounts of one type sharing a phone number, in a database older than the directory).
+
+    Returns:
+        List[dict]: The conflicting directory rows, each with the `(account_type, account_id)` of the
+            account holding the value ("held_by").
+    """
+    return _get_all_directory_rows()[2]
+
+
+def rebuild_account_directory() -> int:
+    """
+    Rebuilds the account directory from every admin, alumnus and company account and commits the result.
+    Values held by more than one account are kept for the first account only, and logged.
+
+    Returns:
+        int: The number of accounts added to the directory.
+
+    Raises:
+        SQLAlchemyError: For any database-related issues.
+    """
+    try:
+        db.session.execute(delete(AccountDirectoryEntry))
+
+        account_count, rows, conflicts = _get_all_directory_rows()
+        for conflict in conflicts:
+            current_app.logger.warning(
+                "Account directory: %s <%s> of %s %s is already held by %s %s, skipped",
+                conflict["field"], conflict["value"], conflict["account_type"], conflict["account_id"],
+                *conflict["held_by"]
+            )
+        if rows:
+            db.session.execute(AccountDirectoryEntry.__table__.insert(), rows)
+
+        db.session.commit()
+        return account_count
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise SQLAlchemyError(f"A database error has occurred: {e}")
+
+
+def ensure_account_directory() -> None:
+    """
+    Backfills the account directory when it is empty but accounts already exist
+    (e.g. the first start-up after the directory was introduced on an existing database).
+
+    Never stops the application from starting: a failed backfill (e.g. raced by another worker doing
+    the same) is logged, and can be retried with `flask user rebuild-directory`.
+    """
+    try:
+        if db.session.query(AccountDirectoryEntry.field).first() is not None:
+            return
+
+        if any(db.session.query(model.id).first() for model in ACCOUNT_TYPES.values()):
+            rebuild_account_directory()
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        current_app.logger.error(
+            "Could not backfill the account directory (run `flask user rebuild-directory`): %s", e
+        )
+
+
+"""
+===== LOOKUP =====
+"""
+
+
+def get_account_by_field(field: str, value: str, account_type: Optional[str] = None) -> Optional[BaseUserAccount]:
+    """
+    Retrieves the admin, alumnus or company account holding a unique field value.
+
+    Args:
+        field (str): The account field (e.g. "login_email"). See DIRECTORY_FIELDS.
+        value (str): The field's value.
+        account_type (str, optional): The type of account, required for fields only unique within a
+            type of account (those not in GLOBAL_DIRECTORY_FIELDS).
+
+    Returns:
+        Optional[BaseUserAccount]: The matching account if found, otherwise None.
+    """
+    # Plain columns rather than entities, as directory rows are written outside the ORM
+    query = db.session.query(
+        AccountDirectoryEntry.account_type, AccountDirectoryEntry.account_id
+    ).filter_by(field=field, value=value)
+    if field not in GLOBAL_DIRECTORY_FIELDS:
+        if account_type is None:
+            raise ValueError(f"'{field}' is only unique within a type of account: an account type is required.")
+        query = query.filter_by(account_type=account_type)
+
+    entry = query.first()
+    if entry is None:
+        return None
+
+    account_type, account_id = entry
+    return db.session.get(ACCOUNT_TYPES[account_type], account_id)
+
+
+def get_taken_account_field(field_values: Dict[str, str], account_type: str) -> Optional[str]:
+    """
+    Checks, in one query, whether any of the given unique field values is already held by an account:
+    of any type for fields in GLOBAL_DIRECTORY_FIELDS, of the given type for the others.
+
+    Args:
+        field_values (Dict[str, str]): Field names mapped to candidate values (empty values are ignored).
+        account_type (str): The type of account the values are for (e.g. "alumnus").
+
+    Returns:
+        Optional[str]: The first field (in the given order) whose value is taken, or None if all are free.
+    """
+    conditions = [
+        and_(AccountDirectoryEntry.field == field, AccountDirectoryEntry.value == value)
+        if field in GLOBAL_DIRECTORY_FIELDS else
+        and_(
+            AccountDirectoryEntry.field == field, AccountDirectoryEntry.value == value,
+            AccountDirectoryEntry.account_type == account_type
+        )
+        for field, value in field_values.items() if value
+    ]
+    if not conditions:
+        return None
+
+    taken_fields = {
+        field for (field,) in db.session.query(AccountDirectoryEntry.field).filter(or_(*conditions))
+    }
+    return next((field for field in field_values if field in taken_fields), None)
@@ -2,8 +2,9 @@ from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from typing import List, Optional, Union
 
 from App.database import db
-from App.models import BaseUserAccount, AdminAccount
+from App.models import AdminAccount
 from App.utils.db_utils import get_records_by_filter, validate_email
+from .account_directory import get_taken_account_field
 
 """
 ===== CREATE =====
@@ -28,12 +29,11 @@ def add_admin_account(login_email: str, password: str, profile_photo_file_path:
         SQLAlchemyError: For other database-related issues.
     """
 
-    # Check if unique fields exist in any subclass of BaseUserAccount dynamically
-    for subclass in BaseUserAccount.__subclasses__():
-        if subclass.query.filter_by(login_email=login_email).first():
-            raise ValueError(
-                f"Login email '{login_email}' already exists for another account."
-            )
+    # Check if the login email is held by any type of account
+    if get_taken_account_field({"login_email": login_email}, "admin"):
+        raise ValueError(
+            f"Login email '{login_email}' already exists for another account."
+        )
 
     new_admin = AdminAccount(
         login_email=login_email,
@@ -2,8 +2,9 @@ from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from typing import List, Optional, Union
 
 from App.database import db
-from App.models import BaseUserAccount, AdminAccount, AlumnusAccount
+from App.models import AdminAccount, AlumnusAccount
 from App.utils.db_utils import get_records_by_filter, validate_email
+from .account_directory import get_taken_account_field
 
 """
 ===== CREATE =====
@@ -38,14 +39,11 @@ def add_alumnus_account(
         "login_email": login_email, "phone_number": phone_number
     }
 
-    for field, value in check_fields.items():
-        if value:
-            for subclass in BaseUserAccount.__subclasses__():
-                # Only check for existing value if the field exists
-                if hasattr(subclass, field) and subclass.query.filter_by(**{field: value}).first():
-                    raise ValueError(
-                        f"{field.replace('_', ' ').title()} <'{value}'> already exists."
-                    )
+    taken_field = get_taken_account_field(check_fields, "alumnus")
+    if taken_field:
+        raise ValueError(
+            f"{taken_field.replace('_', ' ').title()} <'{check_fields[taken_field]}'> already exists."
+        )
 
     new_alumnus = AlumnusAccount(
         login_email=login_email,
@@ -438,7 +436,6 @@ def update_alumnus_account_last_name(id: int, new_last_name: str) -> AlumnusAcco
     try:
         alumnus.last_name = new_last_name
         db.session.commit()
-        print("Last name updated successfully.")
         return alumnus
 
     except SQLAlchemyError as e:
@@ -469,7 +466,6 @@ def update_alumnus_account_phone_number(id: int, new_phone_number: str) -> Alumn
     try:
         alumnus.phone_number = new_phone_number
         db.session.commit()
-        print("Phone number updated successfully.")
         return alumnus
 
     except IntegrityError as e:
@@ -505,7 +501,6 @@ def update_alumnus_account_profile_photo(
     try:
         alumnus.profile_photo_file_path = new_profile_photo_file_path
         db.session.commit()
-        print("Profile photo updated successfully.")
         return alumnus
 
     except SQLAlchemyError as e:
@@ -1,48 +1,96 @@
-from flask import jsonify
+from flask import current_app, g, jsonify
 from flask_jwt_extended import (
     create_access_token,
     set_access_cookies,
     jwt_required,
     JWTManager,
+    get_current_user,
     get_jwt_identity,
     verify_jwt_in_request
 )
 
-from App.models import BaseUserAccount, AdminAccount, AlumnusAccount, CompanyAccount
+from App.database import db
+from App.models import ACCOUNT_TYPES, BaseUserAccount, get_account_type
 from App.controllers import get_user_by_email
+from App.utils.user_cache import user_cache
+
+
+def get_identity_claims(user: BaseUserAccount) -> dict:
+    """
+    Gets the claims embedded in a user's access token so that later requests can load
+    the user by primary key instead of probing every account table by email.
+
+    Args:
+        user (BaseUserAccount): The admin, alumnus or company account.
+
+    Returns:
+        dict: The user's role and ID claims.
+    """
+    return {"role": get_account_type(user), "uid": user.id}
 
 
 def login(login_email, password):
     user = get_user_by_email(login_email)
 
     if user and user.check_password(password):
-        token = create_access_token(identity=login_email)
+        token = create_access_token(identity=login_email, additional_claims=get_identity_claims(user))
         response = jsonify(access_token=token)
         set_access_cookies(response, token)
         return response
     return None
 
 
+def load_user_from_claims(jwt_data: dict):
+    """
+    Loads the user a decoded access token belongs to, using at most one query.
+
+    Tokens carrying role and ID claims are resolved by primary key (or from the user cache,
+    see USER_CACHE_TTL); older tokens fall back to looking the user up by email.
+
+    Args:
+        jwt_data (dict): The decoded access token.
+
+    Returns:
+        Optional[BaseUserAccount]: The user, or None if the account no longer exists.
+    """
+    identity = jwt_data["sub"]
+    model = ACCOUNT_TYPES.get(jwt_data.get("role"))
+    uid = jwt_data.get("uid")
+
+    if model is None or uid is None:
+        return get_user_by_email(identity)
+
+    ttl_seconds = current_app.config.get("USER_CACHE_TTL", 0)
+    user = user_cache.get(model, uid) if ttl_seconds else None
+    if user is None:
+        user = db.session.get(model, uid)
+        if user is not None and ttl_seconds:
+            user_cache.set(user, ttl_seconds)
+
+    # The token's email no longer matches if the login email was changed since it was issued
+    if user is None or user.login_email != identity:
+        return None
+    return user
+
+
 def setup_jwt(app):
     jwt = JWTManager(app)
 
-    # configure's flask jwt to resolve get_current_identity() to the corresponding user's ID
+    # the identity is already the user's login email (role and ID travel as additional claims)
     @jwt.user_identity_loader
     def user_identity_lookup(identity):
-        for model in [AdminAccount, AlumnusAccount, CompanyAccount]:
-            user = model.query.filter_by(login_email=identity).one_or_none()
-            if user:
-                return user.login_email
-        return None
+        return identity
 
     @jwt.user_lookup_loader
     def user_lookup_callback(_jwt_header, jwt_data):
-        identity = jwt_data["sub"]
-        for model in [AdminAccount, AlumnusAccount, CompanyAccount]:
-            user = model.query.filter_by(login_email=identity).one_or_none()
-            if user:
-                return user
-        return None
+        # verify_jwt_in_request() may run several times per request (e.g. @jwt_required() and the
+        # template context processor), so the user is loaded once and memoized on `g`
+        loaded_users = g.setdefault("_jwt_loaded_users", {})
+        key = (jwt_data["sub"], jwt_data.get("role"), jwt_data.get("uid"))
+        user = loaded_users.get(key)
+        if user is None or user not in db.session:
+            user = loaded_users[key] = load_user_from_claims(jwt_data)
+        return user
 
     return jwt
 
@@ -53,11 +101,10 @@ def add_auth_context(app):
     def inject_user():
         try:
             verify_jwt_in_request()
-            login_email = get_jwt_identity()
-            current_user = get_user_by_email(login_email)
+            current_user = get_current_user()
             is_authenticated = True
-        except Exception as e:
-            print(e)
+        except Exception:
+            # No (valid) token: an anonymous request
             is_authenticated = False
             current_user = None
         return dict(is_authenticated=is_authenticated, current_user=current_user)
@@ -1,5 +1,6 @@
 from App.models import BaseUserAccount, AdminAccount, AlumnusAccount, CompanyAccount
 from App.database import db
+from .account_directory import get_account_by_field
 
 
 def create_user(password, login_email):
@@ -10,24 +11,7 @@ def create_user(password, login_email):
 
 
 def get_user_by_email(login_email):
-    alumnus = AlumnusAccount.query.filter_by(login_email=login_email).first()
-
-    if alumnus:
-        print("got alumnus by email")
-        return alumnus
-
-    admin = AdminAccount.query.filter_by(login_email=login_email).first()
-    if admin:
-        print("got Admin by email")
-        return admin
-
-    company = CompanyAccount.query.filter_by(login_email=login_email).first()
-    if company:
-        print("got company by email")
-        return company
-
-    print("found nothing by email")
-    return None
+    return get_account_by_field("login_email", login_email)
 
 
 def get_user(id):
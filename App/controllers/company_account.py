@@ -2,8 +2,11 @@ from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from typing import List, Optional, Union
 
 from App.database import db
-from App.models import BaseUserAccount, AdminAccount, CompanyAccount
+from App.models import AdminAccount, CompanyAccount
 from App.utils.db_utils import get_records_by_filter, validate_email
+from .account_directory import get_taken_account_field
+from App.utils.listing_index import listing_search_index
+from App.utils.search_index import reindex_company_job_listings, remove_job_listing_from_index
 
 """
 ===== CREATE =====
@@ -43,14 +46,11 @@ def add_company_account(
         "phone_number": phone_number, "website_url": website_url
     }
 
-    for field, value in check_fields.items():
-        if value:
-            for subclass in BaseUserAccount.__subclasses__():
-                # Only check for existing value if the field exists
-                if hasattr(subclass, field) and subclass.query.filter_by(**{field: value}).first():
-                    raise ValueError(
-                        f"{field.replace('_', ' ').title()} <'{value}'> already exists."
-                    )
+    taken_field = get_taken_account_field(check_fields, "company")
+    if taken_field:
+        raise ValueError(
+            f"{taken_field.replace('_', ' ').title()} <'{check_fields[taken_field]}'> already exists."
+        )
 
     new_company = CompanyAccount(
         login_email=login_email,
@@ -268,8 +268,10 @@ def update_company_account(
 
     try:
         # Update registered name
-        if registered_name:
+        renamed = bool(registered_name) and registered_name != company.registered_name
+        if renamed:
             company.registered_name = registered_name
+            reindex_company_job_listings(company)
 
         # Update phone number
         if phone_number:
@@ -296,6 +298,9 @@ def update_company_account(
             company.set_password(new_password)
 
         db.session.commit()
+        if renamed:
+            for listing in company.job_listings.filter_by(admin_approval_status="APPROVED"):
+                listing_search_index.add(listing)
         return company
         
 
@@ -412,7 +417,10 @@ def update_company_registered_name(id: int, new_registered_name: str) -> bool:
 
     try:
         company.registered_name = new_registered_name
+        reindex_company_job_listings(company)
         db.session.commit()
+        for listing in company.job_listings.filter_by(admin_approval_status="APPROVED"):
+            listing_search_index.add(listing)
         return company
 
     except IntegrityError as e:
@@ -608,6 +616,8 @@ def delete_company_account(target_id: int, requester_id: int) -> None:
         )
 
     try:
+        for listing in company_to_delete.job_listings:
+            remove_job_listing_from_index(listing.id)
         db.session.delete(company_to_delete)
         db.session.commit()
 
@@ -142,7 +142,33 @@ def get_company_subscriptions_by_company_id(
             - Returns an empty list if no company subscriptions are found.
     """
     return get_records_by_filter(
-        lambda: CompanySubscription.query.filter_by(alumnus_id=company_id),
+        lambda: CompanySubscription.query.filter_by(company_id=company_id),
+        jsonify_results
+    )
+
+
+def get_subscribed_alumni_by_company_id(
+        company_id: int, jsonify_results: bool = False
+) -> Union[List[AlumnusAccount], List[dict]]:
+    """
+    Retrieves every alumnus subscribed to a given company with a single join.
+
+    Args:
+        company_id (int): The unique ID of the company.
+        jsonify_results (bool, optional):
+            If True, returns alumni as a list of JSON-serializable dictionaries.
+            Defaults to False.
+
+    Returns:
+        Union[List[AlumnusAccount], List[dict]]:
+            - If `jsonify_results` is False, returns a list of `AlumnusAccount` objects.
+            - If `jsonify_results` is True, returns a list of dictionaries (JSON format).
+            - Returns an empty list if the company has no subscribers.
+    """
+    return get_records_by_filter(
+        lambda: AlumnusAccount.query.join(
+            CompanySubscription, CompanySubscription.alumnus_id == AlumnusAccount.id
+        ).filter(CompanySubscription.company_id == company_id),
         jsonify_results
     )
 
@@ -4,6 +4,7 @@ from typing import List, Optional, Union
 from App.database import db
 from App.models import AdminAccount, AlumnusAccount, JobApplication, JobListing
 from App.utils.db_utils import get_records_by_filter
+from .loading_profiles import apply_loading_profile
 
 """
 ===== CREATE =====
@@ -110,7 +111,8 @@ def get_all_job_applications(
 
 
 def get_job_applications_by_alumnus_id(
-        alumnus_id: int, jsonify_results: bool = False
+        alumnus_id: int, jsonify_results: bool = False,
+        loading_profile: Optional[str] = None
 ) -> Union[List[JobApplication], List[dict]]:
     """
     Retrieves all job applications created by a given alumnus.
@@ -120,6 +122,7 @@ def get_job_applications_by_alumnus_id(
         jsonify_results (bool, optional):
             If True, returns job applications as a list of JSON-serializable dictionaries.
             Defaults to False.
+        loading_profile (str, optional): Name of the eager-loading profile to apply (see `LOADING_PROFILES`).
 
     Returns:
         Union[List[JobApplication], List[dict]]:
@@ -128,7 +131,7 @@ def get_job_applications_by_alumnus_id(
             - Returns an empty list if no job applications are found.
     """
     return get_records_by_filter(
-        lambda: JobApplication.query.filter_by(alumnus_id=alumnus_id),
+        lambda: apply_loading_profile(JobApplication.query.filter_by(alumnus_id=alumnus_id), loading_profile),
         jsonify_results
     )
 
@@ -1,10 +1,17 @@
+import threading
 from datetime import datetime
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from typing import List, Optional, Union
+from flask import current_app
 
 from App.database import db
 from App.models import AdminAccount, CompanyAccount, JobListing
+from App.utils.background import submit_background_task
 from App.utils.db_utils import get_records_by_filter
+from .loading_profiles import apply_loading_profile
+from App.utils.listing_index import listing_search_index
+from App.utils.response_cache import COMPANIES_NAMESPACE, get_cache_generation
+from App.utils.search_index import index_job_listing, remove_job_listing_from_index
 
 """
 ===== CREATE =====
@@ -56,6 +63,8 @@ def add_job_listing(
 
     try:
         db.session.add(new_company)
+        db.session.flush()
+        index_job_listing(new_company)
         db.session.commit()
         return new_company
 
@@ -92,7 +101,8 @@ def get_job_listing(id: int) -> Optional[JobListing]:
 
 
 def get_all_job_listings(
-        jsonify_results: bool = False
+        jsonify_results: bool = False,
+        limit: Optional[int] = None, after: Optional[str] = None
 ) -> Union[List[JobListing], List[dict]]:
     """
     Retrieves all job listings from the database.
@@ -101,6 +111,8 @@ def get_all_job_listings(
         jsonify_results (bool, optional):
             If True, returns job listings as a list of JSON-serializable dictionaries.
             Defaults to False.
+        limit (int, optional): If given, returns at most this many job listings, newest first.
+        after (str, optional): If given, returns the job listings after this pagination cursor.
 
     Returns:
         Union[List[JobListing], List[dict]]:
@@ -109,13 +121,17 @@ def get_all_job_listings(
             - Returns an empty list if no job listings are found.
     """
     return get_records_by_filter(
-        lambda: JobListing.query.all(),
-        jsonify_results
+        lambda: JobListing.query,
+        jsonify_results,
+        limit,
+        after
     )
 
 
 def get_job_listings_by_company_id(
-        company_id: int, jsonify_results: bool = False
+        company_id: int, jsonify_results: bool = False,
+        limit: Optional[int] = None, after: Optional[str] = None,
+        loading_profile: Optional[str] = None
 ) -> Union[List[JobListing], List[dict]]:
     """
     Retrieves all job listings created by a company with a given ID.
@@ -125,6 +141,9 @@ def get_job_listings_by_company_id(
         jsonify_results (bool, optional):
             If True, returns job listings as a list of JSON-serializable dictionaries.
             Defaults to False.
+        limit (int, optional): If given, returns at most this many job listings, newest first.
+        after (str, optional): If given, returns the job listings after this pagination cursor.
+        loading_profile (str, optional): Name of the eager-loading profile to apply (see `LOADING_PROFILES`).
 
     Returns:
         Union[List[JobListing], List[dict]]:
@@ -133,13 +152,50 @@ def get_job_listings_by_company_id(
             - Returns an empty list if no job listings are found.
     """
     return get_records_by_filter(
-        lambda: JobListing.query.filter_by(company_id=company_id),
-        jsonify_results
+        lambda: apply_loading_profile(JobListing.query.filter_by(company_id=company_id), loading_profile),
+        jsonify_results,
+        limit,
+        after
+    )
+
+
+def get_approved_job_listings_by_company_id(
+        company_id: int, jsonify_results: bool = False,
+        limit: Optional[int] = None, after: Optional[str] = None,
+        loading_profile: Optional[str] = None
+) -> Union[List[JobListing], List[dict]]:
+    """
+    Retrieves the approved (published) job listings created by a company with a given ID.
+
+    Args:
+        company_id (int): The unique ID of the company that created the job listing
+        jsonify_results (bool, optional):
+            If True, returns job listings as a list of JSON-serializable dictionaries.
+            Defaults to False.
+        limit (int, optional): If given, returns at most this many job listings, newest first.
+        after (str, optional): If given, returns the job listings after this pagination cursor.
+        loading_profile (str, optional): Name of the eager-loading profile to apply (see `LOADING_PROFILES`).
+
+    Returns:
+        Union[List[JobListing], List[dict]]:
+            - If `jsonify_results` is False, returns a list of `JobListing` objects.
+            - If `jsonify_results` is True, returns a list of dictionaries (JSON format).
+            - Returns an empty list if no job listings are found.
+    """
+    return get_records_by_filter(
+        lambda: apply_loading_profile(
+            JobListing.query.filter_by(company_id=company_id, admin_approval_status="APPROVED"),
+            loading_profile
+        ),
+        jsonify_results,
+        limit,
+        after
     )
 
 
 def get_job_listings_by_exact_title(
-        job_title: str, jsonify_results: bool = False
+        job_title: str, jsonify_results: bool = False,
+        limit: Optional[int] = None, after: Optional[str] = None
 ) -> Union[List[JobListing], List[dict]]:
     """
     Retrieves all job listings that match the provided title exactly.
@@ -149,6 +205,8 @@ def get_job_listings_by_exact_title(
         jsonify_results (bool, optional):
             If True, returns job listings as a list of JSON-serializable dictionaries.
             Defaults to False.
+        limit (int, optional): If given, returns at most this many job listings, newest first.
+        after (str, optional): If given, returns the job listings after this pagination cursor.
 
     Returns:
         Union[List[JobListing], List[dict]]:
@@ -158,12 +216,15 @@ def get_job_listings_by_exact_title(
     """
     return get_records_by_filter(
         lambda: JobListing.query.filter_by(title=job_title),
-        jsonify_results
+        jsonify_results,
+        limit,
+        after
     )
 
 
 def get_job_listings_by_exact_position_type(
-        position_type: str, jsonify_results: bool = False
+        position_type: str, jsonify_results: bool = False,
+        limit: Optional[int] = None, after: Optional[str] = None
 ) -> Union[List[JobListing], List[dict]]:
     """
     Retrieves all job listings that match the provided position type exactly.
@@ -173,6 +234,8 @@ def get_job_listings_by_exact_position_type(
         jsonify_results (bool, optional):
             If True, returns job listings as a list of JSON-serializable dictionaries.
             Defaults to False.
+        limit (int, optional): If given, returns at most this many job listings, newest first.
+        after (str, optional): If given, returns the job listings after this pagination cursor.
 
     Returns:
         Union[List[JobListing], List[dict]]:
@@ -182,12 +245,15 @@ def get_job_listings_by_exact_position_type(
     """
     return get_records_by_filter(
         lambda: JobListing.query.filter_by(position_type=position_type),
-        jsonify_results
+        jsonify_results,
+        limit,
+        after
     )
 
 
 def get_job_listings_by_exact_description(
-        description: str, jsonify_results: bool = False
+        description: str, jsonify_results: bool = False,
+        limit: Optional[int] = None, after: Optional[str] = None
 ) -> Union[List[JobListing], List[dict]]:
     """
     Retrieves all job listings that match the provided description exactly.
@@ -197,6 +263,8 @@ def get_job_listings_by_exact_description(
         jsonify_results (bool, optional):
             If True, returns job listings as a list of JSON-serializable dictionaries.
             Defaults to False.
+        limit (int, optional): If given, returns at most this many job listings, newest first.
+        after (str, optional): If given, returns the job listings after this pagination cursor.
 
     Returns:
         Union[List[JobListing], List[dict]]:
@@ -206,12 +274,15 @@ def get_job_listings_by_exact_description(
     """
     return get_records_by_filter(
         lambda: JobListing.query.filter_by(description=description),
-        jsonify_results
+        jsonify_results,
+        limit,
+        after
     )
 
 
 def get_job_listings_by_monthly_salary_ttd(
-        monthly_salary_ttd: int, jsonify_results: bool = False
+        monthly_salary_ttd: int, jsonify_results: bool = False,
+        limit: Optional[int] = None, after: Optional[str] = None
 ) -> Union[List[JobListing], List[dict]]:
     """
     Retrieves all job listings that offer a given monthly salary.
@@ -221,6 +292,8 @@ def get_job_listings_by_monthly_salary_ttd(
         jsonify_results (bool, optional):
             If True, returns job listings as a list of JSON-serializable dictionaries.
             Defaults to False.
+        limit (int, optional): If given, returns at most this many job listings, newest first.
+        after (str, optional): If given, returns the job listings after this pagination cursor.
 
     Returns:
         Union[List[JobListing], List[dict]]:
@@ -232,12 +305,15 @@ def get_job_listings_by_monthly_salary_ttd(
         lambda: JobListing.query.filter_by(
             monthly_salary_ttd=monthly_salary_ttd
         ),
-        jsonify_results
+        jsonify_results,
+        limit,
+        after
     )
 
 
 def get_job_listings_by_is_remote(
-        is_remote: bool, jsonify_results: bool = False
+        is_remote: bool, jsonify_results: bool = False,
+        limit: Optional[int] = None, after: Optional[str] = None
 ) -> Union[List[JobListing], List[dict]]:
     """
     Retrieves all job listings that match the given remote working flag.
@@ -247,6 +323,8 @@ def get_job_listings_by_is_remote(
         jsonify_results (bool, optional):
             If True, returns job listings as a list of JSON-serializable dictionaries.
             Defaults to False.
+        limit (int, optional): If given, returns at most this many job listings, newest first.
+        after (str, optional): If given, returns the job listings after this pagination cursor.
 
     Returns:
         Union[List[JobListing], List[dict]]:
@@ -258,12 +336,15 @@ def get_job_listings_by_is_remote(
         lambda: JobListing.query.filter_by(
             is_remote=is_remote
         ),
-        jsonify_results
+        jsonify_results,
+        limit,
+        after
     )
 
 
 def get_job_listings_by_job_site_address(
-        job_site_address: str, jsonify_results: bool = False
+        job_site_address: str, jsonify_results: bool = False,
+        limit: Optional[int] = None, after: Optional[str] = None
 ) -> Union[List[JobListing], List[dict]]:
     """
     Retrieves all job listings that match the given physical jobsite address exactly.
@@ -273,6 +354,8 @@ def get_job_listings_by_job_site_address(
         jsonify_results (bool, optional):
             If True, returns job listings as a list of JSON-serializable dictionaries.
             Defaults to False.
+        limit (int, optional): If given, returns at most this many job listings, newest first.
+        after (str, optional): If given, returns the job listings after this pagination cursor.
 
     Returns:
         Union[List[JobListing], List[dict]]:
@@ -284,7 +367,9 @@ def get_job_listings_by_job_site_address(
         lambda: JobListing.query.filter_by(
             job_site_address=job_site_address
         ),
-        jsonify_results
+        jsonify_results,
+        limit,
+        after
     )
 
 
@@ -294,7 +379,8 @@ def get_job_listings_by_job_site_address(
 
 
 def get_job_listings_by_similar_title(
-        job_title: str, jsonify_results: bool = False
+        job_title: str, jsonify_results: bool = False,
+        limit: Optional[int] = None, after: Optional[str] = None
 ) -> Union[List[JobListing], List[dict]]:
     """
     Retrieves all job listings with titles that are similar to the provided title.
@@ -304,6 +390,8 @@ def get_job_listings_by_similar_title(
         jsonify_results (bool, optional):
             If True, returns job listings as a list of JSON-serializable dictionaries.
             Defaults to False.
+        limit (int, optional): If given, returns at most this many job listings, newest first.
+        after (str, optional): If given, returns the job listings after this pagination cursor.
 
     Returns:
         Union[List[JobListing], List[dict]]:
@@ -315,12 +403,15 @@ def get_job_listings_by_similar_title(
         lambda: JobListing.query.filter(
             JobListing.title.ilike(f"%{job_title}%")
         ),
-        jsonify_results
+        jsonify_results,
+        limit,
+        after
     )
 
 
 def get_job_listings_by_similar_position_type(
-        position_type: str, jsonify_results: bool = False
+        position_type: str, jsonify_results: bool = False,
+        limit: Optional[int] = None, after: Optional[str] = None
 ) -> Union[List[JobListing], List[dict]]:
     """
     Retrieves job listings with similar position types.
@@ -330,6 +421,8 @@ def get_job_listings_by_similar_position_type(
         jsonify_results (bool, optional):
             If True, returns job listings as a list of JSON-serializable dictionaries.
             Defaults to False.
+        limit (int, optional): If given, returns at most this many job listings, newest first.
+        after (str, optional): If given, returns the job listings after this pagination cursor.
 
     Returns:
         Union[List[JobListing], List[dict]]:
@@ -341,12 +434,15 @@ def get_job_listings_by_similar_position_type(
         lambda: JobListing.query.filter(
             JobListing.position_type.ilike(f"%{position_type}%")
         ),
-        jsonify_results
+        jsonify_results,
+        limit,
+        after
     )
 
 
 def get_job_listing_by_similar_description(
-        description: str, jsonify_results: bool = False
+        description: str, jsonify_results: bool = False,
+        limit: Optional[int] = None, after: Optional[str] = None
 ) -> Union[List[JobListing], List[dict]]:
     """
     Retrieves job listings with similar descriptions.
@@ -356,6 +452,8 @@ def get_job_listing_by_similar_description(
         jsonify_results (bool, optional):
             If True, returns job listings as a list of JSON-serializable dictionaries.
             Defaults to False.
+        limit (int, optional): If given, returns at most this many job listings, newest first.
+        after (str, optional): If given, returns the job listings after this pagination cursor.
 
     Returns:
         Union[List[JobListing], List[dict]]:
@@ -366,12 +464,15 @@ def get_job_listing_by_similar_description(
     return get_records_by_filter(
         lambda: JobListing.query.filter(
             JobListing.description.ilike(f"%{description}%")),
-        jsonify_results
+        jsonify_results,
+        limit,
+        after
     )
 
 
 def get_job_listing_by_similar_job_site_address(
-        job_site_address: str, jsonify_results: bool = False
+        job_site_address: str, jsonify_results: bool = False,
+        limit: Optional[int] = None, after: Optional[str] = None
 ) -> Union[List[JobListing], List[dict]]:
     """
     Retrieves job listings with similar physical jobsite addresses.
@@ -381,6 +482,8 @@ def get_job_listing_by_similar_job_site_address(
         jsonify_results (bool, optional):
             If True, returns job listings as a list of JSON-serializable dictionaries.
             Defaults to False.
+        limit (int, optional): If given, returns at most this many job listings, newest first.
+        after (str, optional): If given, returns the job listings after this pagination cursor.
 
     Returns:
         Union[List[JobListing], List[dict]]:
@@ -391,7 +494,9 @@ def get_job_listing_by_similar_job_site_address(
     return get_records_by_filter(
         lambda: JobListing.query.filter(
             JobListing.job_site_address.ilike(f"%{job_site_address}%")),
-        jsonify_results
+        jsonify_results,
+        limit,
+        after
     )
 
 
@@ -400,7 +505,8 @@ def get_job_listing_by_similar_job_site_address(
 """
 
 def get_job_listings_by_salary_range(
-    min_monthly_salary_ttd: float, max_monthly_salary_ttd: float, jsonify_results: bool = False
+    min_monthly_salary_ttd: float, max_monthly_salary_ttd: float, jsonify_results: bool = False,
+        limit: Optional[int] = None, after: Optional[str] = None
 ) -> Union[List[JobListing], List[dict]]:
     """
     Retrieves job listings that offer a salary within the specified range.
@@ -409,6 +515,8 @@ def get_job_listings_by_salary_range(
         min_monthly_salary_ttd (float): The minimum monthly salary (in TTD) to filter by.
         max_monthly_salary_ttd (float): The maximum monthly salary (in TTD) to filter by.
         jsonify_results (bool, optional): If True, returns results as JSON.
+        limit (int, optional): If given, returns at most this many job listings, newest first.
+        after (str, optional): If given, returns the job listings after this pagination cursor.
 
     Returns:
         List[JobListing] or List[dict]: A list of job listings within the given salary range.
@@ -418,7 +526,9 @@ def get_job_listings_by_salary_range(
             JobListing.monthly_salary_ttd >= min_monthly_salary_ttd,
             JobListing.monthly_salary_ttd <= max_monthly_salary_ttd
         ),
-        jsonify_results
+        jsonify_results,
+        limit,
+        after
     )
 
 
@@ -500,7 +610,9 @@ def update_job_listing(
         #update last modified field
         if has_changes:
             listing.datetime_last_modified = datetime.utcnow()
+            index_job_listing(listing)
         db.session.commit()
+        listing_search_index.sync(listing)
         return listing
 
     except IntegrityError as e:
@@ -537,7 +649,9 @@ def update_job_listing_title(
 
     try:
         listing.title = new_title
+        index_job_listing(listing)
         db.session.commit()
+        listing_search_index.sync(listing)
         return listing
 
     except IntegrityError:
@@ -575,7 +689,9 @@ def update_job_listing_position_type(
 
     try:
         listing.position_type = new_position_type
+        index_job_listing(listing)
         db.session.commit()
+        listing_search_index.sync(listing)
         return listing
 
     except SQLAlchemyError as e:
@@ -606,8 +722,10 @@ def update_job_listing_description(id: int, new_description: str) -> JobListing:
         raise ValueError("New description cannot be empty.")
 
     try:
-        listing.registered_name = new_description
+        listing.description = new_description
+        index_job_listing(listing)
         db.session.commit()
+        listing_search_index.sync(listing)
         return listing
 
     except SQLAlchemyError as e:
@@ -641,6 +759,7 @@ def update_job_listing_monthly_salary_ttd(id: int, new_monthly_salary_ttd: int)
     try:
         listing.monthly_salary_ttd = new_monthly_salary_ttd
         db.session.commit()
+        listing_search_index.sync(listing)
         return listing
 
     except SQLAlchemyError as e:
@@ -670,6 +789,7 @@ def update_job_listing_is_remote(id: int, new_is_remote: bool = False) -> JobLis
     try:
         listing.is_remote = new_is_remote
         db.session.commit()
+        listing_search_index.sync(listing)
         return listing
 
     except SQLAlchemyError as e:
@@ -699,6 +819,7 @@ def update_job_listing_job_site_address(id: int, new_job_site_address: str = Non
     try:
         listing.job_site_address = new_job_site_address
         db.session.commit()
+        listing_search_index.sync(listing)
         return listing
 
     except IntegrityError as e:
@@ -731,6 +852,7 @@ def approve_job_listing(id: int) -> JobListing:
     try:
         listing.admin_approval_status = "APPROVED"
         db.session.commit()
+        listing_search_index.add(listing)
         return listing
 
     except SQLAlchemyError as e:
@@ -759,6 +881,7 @@ def unapprove_job_listing(id: int) -> JobListing:
     try:
         listing.admin_approval_status = "PENDING"
         db.session.commit()
+        listing_search_index.remove(listing.id)
         return listing
 
     except SQLAlchemyError as e:
@@ -766,17 +889,74 @@ def unapprove_job_listing(id: int) -> JobListing:
         raise SQLAlchemyError(f"A database error has occurred: {e}")
 
 
-def get_approved_listings():
-    all_listings = JobListing.query.all()
-    my_approved_listings = []
-    for listing in all_listings:
-        if listing.admin_approval_status == "APPROVED":
-            my_approved_listings.append(listing)
-    return my_approved_listings
+def get_approved_listings(
+        jsonify_results: bool = False,
+        limit: Optional[int] = None, after: Optional[str] = None,
+        loading_profile: Optional[str] = None
+) -> Union[List[JobListing], List[dict]]:
+    """
+    Retrieves the approved (published) job listings.
+
+    Args:
+        jsonify_results (bool, optional):
+            If True, returns job listings as a list of JSON-serializable dictionaries.
+            Defaults to False.
+        limit (int, optional): If given, returns at most this many job listings, newest first.
+        after (str, optional): If given, returns the job listings after this pagination cursor.
+        loading_profile (str, optional): Name of the eager-loading profile to apply (see `LOADING_PROFILES`).
+
+    Returns:
+        Union[List[JobListing], List[dict]]:
+            - If `jsonify_results` is False, returns a list of `JobListing` objects.
+            - If `jsonify_results` is True, returns a list of dictionaries (JSON format).
+            - Returns an empty list if no job listings are approved.
+    """
+    return get_records_by_filter(
+        lambda: apply_loading_profile(JobListing.query.filter_by(admin_approval_status="APPROVED"), loading_profile),
+        jsonify_results,
+        limit,
+        after
+    )
+
+
+def refresh_listing_search_index() -> None:
+    """
+    (Re)builds this worker's in-memory search index from the approved job listings.
+    """
+    # Read first: a company committed while the listings load makes the index inconsistent, not stale
+    companies_generation = get_cache_generation(COMPANIES_NAMESPACE)
+    listing_search_index.build(get_approved_listings(), companies_generation)
+
+
+_index_rebuild_lock = threading.Lock()
+
+
+def _rebuild_listing_search_index() -> None:
+    try:
+        refresh_listing_search_index()
+    finally:
+        _index_rebuild_lock.release()
+
+
+def queue_listing_search_index_refresh() -> bool:
+    """
+    Rebuilds this worker's search index on the background worker pool, unless a rebuild is already
+    queued or running.
+
+    Returns:
+        bool: True if a rebuild was queued, False if one was already under way.
+    """
+    if not _index_rebuild_lock.acquire(blocking=False):
+        return False
+    try:
+        submit_background_task(_rebuild_listing_search_index)
+    except Exception:
+        _index_rebuild_lock.release()
+        raise
+    return True
 
 
 def toggle_listing_approval(listing_id, status):
-    print("toggle listing approval function")
     from .job_listing import get_job_listing
 
     listing = get_job_listing(listing_id)
@@ -789,9 +969,10 @@ def toggle_listing_approval(listing_id, status):
 
     try:
         db.session.commit()
+        listing_search_index.sync(listing)
         return True
     except Exception as e:
-        print(f'my error: {e}')
+        current_app.logger.warning("Could not toggle the approval of listing %s: %s", listing_id, e)
         db.session.rollback()
         return None
 
@@ -825,8 +1006,10 @@ def delete_job_listing(target_id: int, requester_id: int) -> None:
         )
 
     try:
+        remove_job_listing_from_index(listing_to_delete.id)
         db.session.delete(listing_to_delete)
         db.session.commit()
+        listing_search_index.remove(target_id)
         return True
 
     except SQLAlchemyError as e:
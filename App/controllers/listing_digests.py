@@ -0,0 +1,156 @@
+from typing import Dict, List, Sequence
+
+from flask import Flask, current_app, url_for
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from App.database import db
+from App.models import AlumnusAccount, CompanyAccount, CompanySubscription, JobListing, PendingListingEvent
+from App.utils.background import schedule_periodic_task
+from App.utils.email import (
+    LISTING_EVENT_EMAILS,
+    LISTING_PAGE_ROUTE,
+    send_listing_digest_emails,
+    send_listing_event_emails
+)
+from .company_subscription import get_subscribed_alumni_by_company_id
+from .notifications import add_alumni_notifications, queue_subscribed_alumni_notifications
+
+"""
+===== LISTING EVENT DIGESTS =====
+
+Subscribers hear about a company's listing events (published, unpublished, deleted) either right away,
+with one notification and one email per event, or, when NOTIFICATION_DIGEST_WINDOW_SECONDS is set, in
+digests:
+    - each event is buffered once, as a pending_listing_events row, whatever the number of subscribers;
+    - every window, each worker flushes the buffer: every subscriber gets one notification and one email
+      covering all of their companies' events since the last flush (`flask notification flush-digests`
+      flushes it on demand);
+    - the posting company is still notified and emailed right away.
+"""
+
+# Notification.message length
+NOTIFICATION_MESSAGE_MAX_LENGTH = 1000
+
+
+def publish_listing_event_to_subscribers(event: str, listing: JobListing, company: CompanyAccount, message: str) -> bool:
+    """
+    Notifies and emails the alumni subscribed to a company about one of its listing events: right away,
+    or in their next digest when NOTIFICATION_DIGEST_WINDOW_SECONDS is set.
+
+    Args:
+        event (str): The listing event. See LISTING_EVENT_EMAILS.
+        listing (JobListing): The job listing the event happened to.
+        company (CompanyAccount): The company that posted the job.
+        message (str): The subscribers' notification message.
+
+    Returns:
+        bool: True if the event was buffered for the next digest, False if it was sent right away.
+
+    Raises:
+        ValueError: If the event is unknown.
+        SQLAlchemyError: For any database-related issues.
+    """
+    if event not in LISTING_EVENT_EMAILS:
+        raise ValueError(f"Unknown listing event '{event}'.")
+
+    if not current_app.config.get("NOTIFICATION_DIGEST_WINDOW_SECONDS"):
+        queue_subscribed_alumni_notifications(message, company.id)
+        send_listing_event_emails(event, get_subscribed_alumni_by_company_id(company.id), listing, company)
+        return False
+
+    try:
+        db.session.add(PendingListingEvent(
+            company_id=company.id,
+            listing_id=listing.id,
+            event=event,
+            message=message,
+            job_title=listing.title,
+            company_name=company.registered_name,
+            job_location=listing.job_site_address,
+            # Built now, as the digest is flushed outside of any request
+            job_url=url_for(LISTING_PAGE_ROUTE, id=listing.id, _external=True)
+        ))
+        db.session.commit()
+        return True
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise SQLAlchemyError(f"A database error has occurred: {e}")
+
+
+def _get_digest_message(events: Sequence) -> str:
+    if len(events) == 1:
+        return events[0].message
+
+    message = f"{len(events)} updates from companies you follow: " + " ".join(event.message for event in events)
+    if len(message) > NOTIFICATION_MESSAGE_MAX_LENGTH:
+        message = message[:NOTIFICATION_MESSAGE_MAX_LENGTH - 3] + "..."
+    return message
+
+
+def flush_listing_digests() -> int:
+    """
+    Sends every buffered listing event to the subscribers of its company, as one notification and one
+    email per subscriber. Subscribers are those subscribed at the time of the flush.
+
+    Returns:
+        int: The number of subscribers notified.
+
+    Raises:
+        SQLAlchemyError: For any database-related issues.
+    """
+    table = PendingListingEvent.__table__
+
+    try:
+        # Claimed by deleting them, so that concurrent flushes (e.g. one per worker) never send an event twice
+        events = db.session.execute(delete(table).returning(*table.c)).all()
+        if not events:
+            db.session.rollback()
+            return 0
+
+        events.sort(key=lambda event: (event.created_at, event.id))
+        events_by_company: Dict[int, List] = {}
+        for event in events:
+            events_by_company.setdefault(event.company_id, []).append(event)
+
+        subscribers: Dict[int, AlumnusAccount] = {}
+        digests: Dict[int, List] = {}
+        for company_id, alumnus in db.session.execute(
+            select(CompanySubscription.company_id, AlumnusAccount)
+            .join(AlumnusAccount, AlumnusAccount.id == CompanySubscription.alumnus_id)
+            .where(CompanySubscription.company_id.in_(events_by_company))
+        ):
+            subscribers[alumnus.id] = alumnus
+            digests.setdefault(alumnus.id, []).extend(events_by_company[company_id])
+
+        for digest in digests.values():
+            # Several companies' events, back in the order they happened
+            digest.sort(key=lambda event: (event.created_at, event.id))
+
+        add_alumni_notifications({
+            alumnus_id: _get_digest_message(digest) for alumnus_id, digest in digests.items()
+        })
+        # Written to the outbox in the same transaction as the notifications and the claimed events
+        send_listing_digest_emails((subscribers[alumnus_id], digest) for alumnus_id, digest in digests.items())
+        db.session.commit()
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise SQLAlchemyError(f"A database error has occurred: {e}")
+
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return len(digests)
+
+
+def schedule_listing_digest_flush(app: Flask) -> None:
+    """
+    Runs `flush_listing_digests` on the background worker pool every NOTIFICATION_DIGEST_WINDOW_SECONDS.
+
+    Args:
+        app (Flask): The application.
+    """
+    schedule_periodic_task(app, app.config.get("NOTIFICATION_DIGEST_WINDOW_SECONDS", 0), flush_listing_digests)
@@ -0,0 +1,139 @@
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import func, select
+
+from App.database import db
+from App.models import BaseUserAccount, JobListing, SavedJobListing
+from App.utils.response_cache import COMPANIES_NAMESPACE, get_cache_generation
+
+"""
+===== LISTING VALIDATORS =====
+
+HTTP validators (see App/utils/conditional_requests.py) of the pages and APIs built from job listings,
+each computed with a single aggregate query (and, for pages showing an alumnus' saved listings, a lookup
+of their IDs):
+    - listings contribute their latest `datetime_last_modified` (updated on every change, approval
+      included) and their count (which catches deletions);
+    - an alumnus' saved listings contribute their IDs, which no aggregate (e.g. their count and sum) would
+      tell apart from every other set, and their listings' latest modification;
+    - companies contribute the generation of the companies namespace, bumped whenever a company is
+      committed (see App/utils/response_cache.py), and accounts the values of their columns. Without
+      generations shared by every worker, the pages showing companies have no validators (None).
+"""
+
+# What a response's ETag is derived from, and its Last-Modified date (if known)
+Validators = Tuple[tuple, Optional[datetime]]
+
+# Columns that change without changing what a page shows
+_UNVERSIONED_ACCOUNT_COLUMNS = {"password_hash", "unread_notification_count"}
+
+
+def _listings_aggregate(*conditions):
+    return (
+        select(func.max(JobListing.datetime_last_modified)).where(*conditions).scalar_subquery(),
+        select(func.count(JobListing.id)).where(*conditions).scalar_subquery()
+    )
+
+
+def _saved_listings_last_modified(alumnus_id: int):
+    return (
+        select(func.max(JobListing.datetime_last_modified))
+        .join(SavedJobListing, SavedJobListing.job_listing_id == JobListing.id)
+        .where(SavedJobListing.alumnus_id == alumnus_id).scalar_subquery()
+    )
+
+
+def _get_saved_listing_ids(alumnus_id: int) -> tuple:
+    return tuple(db.session.scalars(
+        select(SavedJobListing.job_listing_id)
+        .where(SavedJobListing.alumnus_id == alumnus_id)
+        .order_by(SavedJobListing.job_listing_id)
+    ))
+
+
+def _get_account_version(account: BaseUserAccount) -> tuple:
+    # From the already loaded account (`current_user` is a proxy, so its mapper is looked up through it)
+    return tuple(
+        getattr(account, attr.key) for attr in account.__mapper__.column_attrs
+        if attr.key not in _UNVERSIONED_ACCOUNT_COLUMNS
+    )
+
+
+def _latest(*datetimes: Optional[datetime]) -> Optional[datetime]:
+    return max((value for value in datetimes if value is not None), default=None)
+
+
+def get_listing_page_validators(listing_id: int, alumnus: BaseUserAccount) -> Optional[Validators]:
+    """
+    Gets the validators of a job listing's page, which also shows the alumnus' saved listings.
+
+    Args:
+        listing_id (int): The job listing's ID.
+        alumnus (BaseUserAccount): The current user.
+
+    Returns:
+        Validators, optional: The ETag's parts and the Last-Modified date.
+    """
+    companies_generation = get_cache_generation(COMPANIES_NAMESPACE)
+    if companies_generation is None:
+        return None
+    row = db.session.execute(select(
+        *_listings_aggregate(JobListing.id == listing_id), _saved_listings_last_modified(alumnus.id)
+    )).one()
+    return (
+        (*row, _get_saved_listing_ids(alumnus.id), companies_generation, _get_account_version(alumnus)),
+        _latest(row[0], row[2])
+    )
+
+
+def get_company_listings_validators(company_id: int, alumnus: BaseUserAccount) -> Optional[Validators]:
+    """
+    Gets the validators of a company's listings page, which also shows the alumnus' saved listings.
+
+    Args:
+        company_id (int): The company's ID.
+        alumnus (BaseUserAccount): The current user.
+
+    Returns:
+        Validators, optional: The ETag's parts and the Last-Modified date.
+    """
+    companies_generation = get_cache_generation(COMPANIES_NAMESPACE)
+    if companies_generation is None:
+        return None
+    row = db.session.execute(select(
+        *_listings_aggregate(JobListing.company_id == company_id, JobListing.admin_approval_status == "APPROVED"),
+        _saved_listings_last_modified(alumnus.id)
+    )).one()
+    return (
+        (*row, _get_saved_listing_ids(alumnus.id), companies_generation, _get_account_version(alumnus)),
+        _latest(row[0], row[2])
+    )
+
+
+def get_listing_search_validators() -> Optional[Validators]:
+    """
+    Gets the validators of listing searches. Every listing counts, as one leaving the approved listings
+    changes the results too.
+
+    Returns:
+        Validators, optional: The ETag's parts and the Last-Modified date.
+    """
+    companies_generation = get_cache_generation(COMPANIES_NAMESPACE)
+    if companies_generation is None:
+        return None
+    row = db.session.execute(select(*_listings_aggregate())).one()
+    return (*row, companies_generation), row[0]
+
+
+def get_saved_listings_validators(alumnus: BaseUserAccount) -> Validators:
+    """
+    Gets the validators of the alumnus' saved listing IDs.
+
+    Args:
+        alumnus (BaseUserAccount): The current user.
+
+    Returns:
+        Validators: The ETag's parts and the Last-Modified date (unknown, as saving has no timestamp).
+    """
+    return (alumnus.id, _get_saved_listing_ids(alumnus.id)), None
@@ -0,0 +1,49 @@
+from sqlalchemy.orm import Query, joinedload
+
+from App.models import JobApplication, JobListing, SavedJobListing
+
+"""
+===== LOADING PROFILES =====
+
+Named eager-loading presets for the relationships each page renders. Without them every
+row touches a lazy relationship (e.g. `job.company.registered_name` in a job card), so a
+page of N rows costs 1 + N queries; with them the page loads in a constant number of queries.
+"""
+
+LOADING_PROFILES = {
+    # Job cards: title, company name and logo
+    "listing_card": (
+        joinedload(JobListing.company),
+    ),
+    # Submitted applications sidebar: the listing applied to and its company
+    "application_with_listing": (
+        joinedload(JobApplication.job_listing).joinedload(JobListing.company),
+    ),
+    # Saved listings sidebar: the saved listing and its company
+    "saved_listing_with_listing": (
+        joinedload(SavedJobListing.job_listing).joinedload(JobListing.company),
+    ),
+}
+
+
+def apply_loading_profile(query: Query, profile: str = None) -> Query:
+    """
+    Applies a named eager-loading profile to a query.
+
+    Args:
+        query (Query): The query to apply the profile to.
+        profile (str, optional): The name of the profile in `LOADING_PROFILES`. Defaults to None (lazy loading).
+
+    Returns:
+        Query: The query with the profile's loader options applied.
+
+    Raises:
+        ValueError: If the profile does not exist.
+    """
+    if profile is None:
+        return query
+
+    if profile not in LOADING_PROFILES:
+        raise ValueError(f"Loading profile '{profile}' does not exist.")
+
+    return query.options(*LOADING_PROFILES[profile])
@@ -0,0 +1,215 @@
+import json
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from flask import Flask, current_app
+from sqlalchemy import bindparam, case, delete, insert, select, tuple_, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from App.database import db
+from App.models import ACCOUNT_TYPES, Notification, NotificationArchiveEntry
+from App.utils.background import schedule_periodic_task
+from .notification_counts import NOTIFICATION_RECIPIENT_COLUMNS
+
+"""
+===== NOTIFICATION RETENTION =====
+
+Reviewed notifications older than NOTIFICATION_RETENTION_DAYS are moved out of the notifications table,
+so that it only holds recent and unread notifications:
+    - notifications are moved in batches of NOTIFICATION_ARCHIVE_BATCH_SIZE, each in a short transaction
+      of its own, so that no lock is held for long; a batch is claimed by deleting it (DELETE ... RETURNING),
+      which makes concurrent runs (e.g. one per worker) safe;
+    - each recipient's notifications with the same message collapse into one digest, kept in the
+      notification_archive table, or appended to a JSONL file when NOTIFICATION_ARCHIVE_PATH is set;
+    - `flask notification archive` runs it once, and every worker schedules it every
+      NOTIFICATION_ARCHIVE_INTERVAL_SECONDS (0 disables the schedule).
+"""
+
+# (recipient type, recipient ID, message). Digests map it to [occurrences, first created at, last created at].
+DigestKey = Tuple[str, int, str]
+
+_RECIPIENT_TYPES = {
+    column: account_type
+    for column, model in NOTIFICATION_RECIPIENT_COLUMNS.items()
+    for account_type, account_model in ACCOUNT_TYPES.items() if account_model is model
+}
+
+
+def _collapse_into_digests(rows) -> Dict[DigestKey, list]:
+    digests: Dict[DigestKey, list] = {}
+    for row in rows:
+        recipient = next(
+            ((recipient_type, getattr(row, column)) for column, recipient_type in _RECIPIENT_TYPES.items()
+             if getattr(row, column)),
+            None
+        )
+        if recipient is None:
+            continue
+
+        digest = digests.get((*recipient, row.message))
+        if digest is None:
+            digests[(*recipient, row.message)] = [1, row.created_at, row.created_at]
+            continue
+
+        digest[0] += 1
+        if row.created_at and (digest[1] is None or row.created_at < digest[1]):
+            digest[1] = row.created_at
+        if row.created_at and (digest[2] is None or row.created_at > digest[2]):
+            digest[2] = row.created_at
+    return digests
+
+
+def _write_digests_to_table(digests: Dict[DigestKey, list], archived_at: datetime) -> None:
+    archive = NotificationArchiveEntry.__table__
+    key_columns = tuple_(archive.c.recipient_type, archive.c.recipient_id, archive.c.message)
+    existing = {
+        (row.recipient_type, row.recipient_id, row.message): row.id
+        for row in db.session.execute(
+            select(archive.c.id, archive.c.recipient_type, archive.c.recipient_id, archive.c.message)
+            .where(key_columns.in_(list(digests)))
+        )
+    }
+
+    new_entries: List[dict] = []
+    updated_entries: List[dict] = []
+    for key, (occurrences, first_created_at, last_created_at) in digests.items():
+        values = {
+            "occurrences": occurrences, "first_created_at": first_created_at,
+            "last_created_at": last_created_at, "archived_at": archived_at
+        }
+        if key in existing:
+            updated_entries.append({"entry_id": existing[key], **values})
+        else:
+            recipient_type, recipient_id, message = key
+            new_entries.append({
+                "recipient_type": recipient_type, "recipient_id": recipient_id, "message": message, **values
+            })
+
+    if new_entries:
+        db.session.execute(insert(archive), new_entries)
+    if updated_entries:
+        first_created_at = bindparam("first_created_at")
+        last_created_at = bindparam("last_created_at")
+        db.session.execute(
+            update(archive).where(archive.c.id == bindparam("entry_id")).values(
+                occurrences=archive.c.occurrences + bindparam("occurrences"),
+                first_created_at=case(
+                    (archive.c.first_created_at > first_created_at, first_created_at),
+                    else_=archive.c.first_created_at
+                ),
+                last_created_at=case(
+                    (archive.c.last_created_at < last_created_at, last_created_at),
+                    else_=archive.c.last_created_at
+                ),
+                archived_at=bindparam("archived_at")
+            ),
+            updated_entries
+        )
+
+
+def _write_digests_to_file(digests: Dict[DigestKey, list], archived_at: datetime, path: str) -> None:
+    with open(path, "a", encoding="utf-8") as archive_file:
+        for (recipient_type, recipient_id, message), (occurrences, first_created_at, last_created_at) in digests.items():
+            archive_file.write(json.dumps({
+                "recipient_type": recipient_type,
+                "recipient_id": recipient_id,
+                "message": message,
+                "occurrences": occurrences,
+                "first_created_at": first_created_at.isoformat() if first_created_at else None,
+                "last_created_at": last_created_at.isoformat() if last_created_at else None,
+                "archived_at": archived_at.isoformat()
+            }) + "\n")
+
+
+def archive_reviewed_notifications(
+        older_than_days: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        path: Optional[str] = None,
+        max_batches: Optional[int] = None
+) -> int:
+    """
+    Moves reviewed notifications older than the retention period into the archive, as digests.
+
+    Args:
+        older_than_days (float, optional): The retention period. Defaults to NOTIFICATION_RETENTION_DAYS.
+        batch_size (int, optional): Notifications moved per transaction. Defaults to NOTIFICATION_ARCHIVE_BATCH_SIZE.
+        path (str, optional): A JSONL file to append the digests to instead of the notification_archive
+            table. Defaults to NOTIFICATION_ARCHIVE_PATH.
+        max_batches (int, optional): Stop after this many batches. Defaults to moving every eligible notification.
+
+    Returns:
+        int: The number of notifications archived.
+
+    Raises:
+        ValueError: If the retention period or batch size is invalid.
+        SQLAlchemyError: For any database-related issues.
+    """
+    config = current_app.config
+    if older_than_days is None:
+        older_than_days = config.get("NOTIFICATION_RETENTION_DAYS", 90)
+    if batch_size is None:
+        batch_size = config.get("NOTIFICATION_ARCHIVE_BATCH_SIZE", 500)
+    if path is None:
+        path = config.get("NOTIFICATION_ARCHIVE_PATH")
+
+    if older_than_days < 0:
+        raise ValueError("The retention period cannot be negative.")
+    if batch_size < 1:
+        raise ValueError("The batch size must be at least 1.")
+
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    table = Notification.__table__
+    archived = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        try:
+            batch = (
+                select(table.c.id)
+                .where(table.c.reviewed_by_user.is_(True), table.c.created_at < cutoff)
+                .order_by(table.c.id)
+                .limit(batch_size)
+                .scalar_subquery()
+            )
+            rows = db.session.execute(
+                delete(table).where(table.c.id.in_(batch)).returning(
+                    table.c.alumnus_id, table.c.company_id, table.c.admin_id, table.c.message, table.c.created_at
+                )
+            ).all()
+            if not rows:
+                db.session.rollback()
+                break
+
+            digests = _collapse_into_digests(rows)
+            archived_at = datetime.utcnow()
+            if path:
+                # Appended before the commit: a failed commit may leave a duplicate digest, never a lost one
+                _write_digests_to_file(digests, archived_at, path)
+            elif digests:
+                _write_digests_to_table(digests, archived_at)
+
+            db.session.commit()
+
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise SQLAlchemyError(f"A database error has occurred: {e}")
+
+        archived += len(rows)
+        batches += 1
+        if len(rows) < batch_size:
+            break
+
+    return archived
+
+
+def schedule_notification_archival(app: Flask) -> None:
+    """
+    Runs `archive_reviewed_notifications` on the background worker pool every
+    NOTIFICATION_ARCHIVE_INTERVAL_SECONDS.
+
+    Args:
+        app (Flask): The application.
+    """
+    schedule_periodic_task(
+        app, app.config.get("NOTIFICATION_ARCHIVE_INTERVAL_SECONDS", 0), archive_reviewed_notifications
+    )
@@ -0,0 +1,224 @@
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional, Tuple, Type
+
+from flask import current_app
+from sqlalchemy import event, func, inspect, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from App.database import db
+from App.models import AdminAccount, AlumnusAccount, BaseUserAccount, CompanyAccount, Notification
+
+"""
+===== UNREAD NOTIFICATION COUNTERS =====
+
+Each account keeps a denormalized `unread_notification_count`, so checking for new notifications is
+a primary key lookup instead of loading every unread notification:
+    - every flush that adds, reads/unreads or deletes notifications adjusts the recipients' counters in
+      the same transaction, and bulk inserts adjust them with `adjust_unread_notification_counts`;
+    - reads may be served from a per-worker cache for NOTIFICATION_COUNT_CACHE_TTL seconds (0 disables it);
+    - `flask user recount-notifications` recomputes every counter from the notifications table.
+"""
+
+# Notification column naming the recipient -> the recipient's account model
+NOTIFICATION_RECIPIENT_COLUMNS: Dict[str, Type[BaseUserAccount]] = {
+    "alumnus_id": AlumnusAccount,
+    "company_id": CompanyAccount,
+    "admin_id": AdminAccount
+}
+
+RecipientKey = Tuple[Type[BaseUserAccount], int]
+
+
+class UnreadCountCache:
+    """
+    A thread-safe TTL cache of unread notification counts keyed by (model, ID).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[RecipientKey, Tuple[float, int]] = {}
+
+    def get(self, key: RecipientKey) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                return None
+            return entry[1]
+
+    def set(self, key: RecipientKey, count: int, ttl_seconds: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, count)
+
+    def invalidate(self, key: RecipientKey) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# One cache per worker process
+unread_count_cache = UnreadCountCache()
+
+
+def get_notification_recipient_column(model: Type[BaseUserAccount]):
+    """
+    Gets the notification column naming recipients of a type of account (e.g. `Notification.alumnus_id`).
+
+    Args:
+        model (Type[BaseUserAccount]): The account model.
+
+    Returns:
+        InstrumentedAttribute: The notification column.
+    """
+    for column, recipient_model in NOTIFICATION_RECIPIENT_COLUMNS.items():
+        if recipient_model is model:
+            return getattr(Notification, column)
+    raise ValueError(f"{model.__name__} accounts do not receive notifications.")
+
+
+def get_notification_recipient(values: dict) -> Optional[RecipientKey]:
+    """
+    Gets the recipient of a notification from its column values (e.g. `inspect(notification).dict`).
+
+    Returns:
+        Optional[RecipientKey]: The recipient's (account model, account ID), or None if it has no recipient.
+    """
+    for column, model in NOTIFICATION_RECIPIENT_COLUMNS.items():
+        if values.get(column):
+            return model, values[column]
+    return None
+
+
+def adjust_unread_notification_counts(connection, deltas: Dict[RecipientKey, int]) -> None:
+    """
+    Adds to (or subtracts from) the unread notification counters of several accounts, with one
+    UPDATE per account type and amount.
+
+    Args:
+        connection (Connection): The connection of the transaction the notifications were changed in.
+        deltas (Dict[RecipientKey, int]): (account model, account ID) mapped to the change in unread notifications.
+    """
+    grouped: Dict[Tuple[Type[BaseUserAccount], int], list] = {}
+    for (model, account_id), delta in deltas.items():
+        if delta:
+            grouped.setdefault((model, delta), []).append(account_id)
+
+    for (model, delta), account_ids in grouped.items():
+        table = model.__table__
+        connection.execute(
+            update(table).where(table.c.id.in_(account_ids))
+            .values(unread_notification_count=table.c.unread_notification_count + delta)
+        )
+
+    for key in deltas:
+        unread_count_cache.invalidate(key)
+
+
+@event.listens_for(Session, "after_flush")
+def _count_flushed_notifications(session, flush_context) -> None:
+    deltas = Counter()
+
+    for notification in session.new:
+        if isinstance(notification, Notification) and not notification.reviewed_by_user:
+            deltas[get_notification_recipient(inspect(notification).dict)] += 1
+
+    for notification in session.dirty:
+        if not isinstance(notification, Notification):
+            continue
+
+        history = inspect(notification).attrs.reviewed_by_user.history
+        if not history.has_changes():
+            continue
+
+        was_reviewed = bool(history.deleted[0]) if history.deleted else not notification.reviewed_by_user
+        if was_reviewed != bool(notification.reviewed_by_user):
+            deltas[get_notification_recipient(inspect(notification).dict)] += -1 if notification.reviewed_by_user else 1
+
+    for notification in session.deleted:
+        # Only already loaded values: the row is gone, so expired attributes cannot be loaded
+        values = inspect(notification).dict if isinstance(notification, Notification) else {}
+        if values and values.get("reviewed_by_user") is False:
+            deltas[get_notification_recipient(values)] -= 1
+
+    deltas.pop(None, None)
+    if deltas:
+        adjust_unread_notification_counts(session.connection(), deltas)
+
+
+"""
+===== READ =====
+"""
+
+
+def get_unread_notification_count(account: BaseUserAccount) -> int:
+    """
+    Gets an account's number of unread notifications.
+
+    Args:
+        account (BaseUserAccount): The admin, alumnus or company account.
+
+    Returns:
+        int: The number of unread notifications.
+    """
+    # `__class__` rather than type(), which would be the proxy's type for `current_user`
+    model = account.__class__
+    key = (model, account.id)
+    ttl_seconds = current_app.config.get("NOTIFICATION_COUNT_CACHE_TTL", 0)
+    if ttl_seconds:
+        count = unread_count_cache.get(key)
+        if count is not None:
+            return count
+
+    # Read the column rather than the account, which may be a cached snapshot (see App/utils/user_cache.py)
+    count = db.session.scalar(
+        select(model.unread_notification_count).where(model.id == account.id)
+    ) or 0
+
+    if ttl_seconds:
+        unread_count_cache.set(key, count, ttl_seconds)
+    return count
+
+
+"""
+===== MAINTENANCE =====
+"""
+
+
+def recount_unread_notifications() -> int:
+    """
+    Recomputes every account's unread notification counter from the notifications table and commits the result.
+
+    Returns:
+        int: The number of accounts whose counter was corrected.
+
+    Raises:
+        SQLAlchemyError: For any database-related issues.
+    """
+    try:
+        corrected = 0
+        for column, model in NOTIFICATION_RECIPIENT_COLUMNS.items():
+            unread_count = (
+                select(func.count(Notification.id))
+                .where(getattr(Notification, column) == model.id, Notification.reviewed_by_user.is_(False))
+                .scalar_subquery()
+            )
+            result = db.session.execute(
+                update(model.__table__)
+                .where(model.__table__.c.unread_notification_count != unread_count)
+                .values(unread_notification_count=unread_count)
+            )
+            corrected += result.rowcount
+
+        db.session.commit()
+        unread_count_cache.clear()
+        return corrected
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise SQLAlchemyError(f"A database error has occurred: {e}")
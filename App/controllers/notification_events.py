@@ -0,0 +1,192 @@
+import json
+import time
+from typing import Iterable, Iterator, Optional, Type
+
+from flask import Response, current_app, has_app_context, request, stream_with_context
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from App.database import db
+from App.models import ACCOUNT_TYPES, BaseUserAccount, Notification
+from App.utils.pubsub import get_pubsub
+from .notification_counts import RecipientKey, get_notification_recipient, get_notification_recipient_column
+
+"""
+===== LIVE NOTIFICATION EVENTS =====
+
+Each role has a Server-Sent Events stream of the current account's new notifications:
+    - committing a notification signals its recipient's pub/sub channel (see App/utils/pubsub.py),
+      which wakes the recipient's open streams; streams also poll every NOTIFICATION_STREAM_POLL_SECONDS
+      to pick up notifications committed by workers they do not share a pub/sub with;
+    - every event's ID is the notification ID, so a reconnecting browser resumes after the last
+      notification it received (the Last-Event-ID header) and nothing committed meanwhile is lost;
+    - idle streams send a heartbeat comment every NOTIFICATION_STREAM_HEARTBEAT_SECONDS, and close
+      after NOTIFICATION_STREAM_MAX_SECONDS so that the browser reconnects (and workers are recycled).
+"""
+
+# Notifications sent per database read while catching up
+NOTIFICATION_STREAM_BATCH_SIZE = 100
+
+_ACCOUNT_TYPE_BY_MODEL = {model: account_type for account_type, model in ACCOUNT_TYPES.items()}
+
+
+def get_notification_channel(model: Type[BaseUserAccount], account_id: int) -> str:
+    return f"notifications:{_ACCOUNT_TYPE_BY_MODEL[model]}:{account_id}"
+
+
+"""
+===== PUBLISHING =====
+"""
+
+
+def queue_notification_events(session: Session, recipients: Iterable[RecipientKey]) -> None:
+    """
+    Signals the recipients' notification streams once the session's transaction commits. Notifications
+    added through the ORM are signalled automatically; bulk inserts must call this.
+
+    Args:
+        session (Session): The session the notifications were inserted with.
+        recipients (Iterable[RecipientKey]): The recipients' (account model, account ID).
+    """
+    session.info.setdefault("_notified_recipients", set()).update(recipients)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_notifications(session, flush_context) -> None:
+    recipients = [
+        get_notification_recipient(inspect(notification).dict)
+        for notification in session.new if isinstance(notification, Notification)
+    ]
+    if any(recipients):
+        queue_notification_events(session, filter(None, recipients))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_notification_events(session) -> None:
+    recipients = session.info.pop("_notified_recipients", None)
+    if recipients and has_app_context():
+        get_pubsub().publish(get_notification_channel(model, account_id) for model, account_id in recipients)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_notification_events(session) -> None:
+    session.info.pop("_notified_recipients", None)
+
+
+"""
+===== STREAMING =====
+"""
+
+
+def _format_event(row) -> str:
+    data = json.dumps({
+        "id": row.id,
+        "message": row.message,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "reviewed_by_user": row.reviewed_by_user
+    })
+    return f"id: {row.id}\nevent: notification\ndata: {data}\n\n"
+
+
+def _read_notifications(recipient_column, account_id: int, after_id: int) -> list:
+    # A short-lived connection of its own, so an open stream never holds on to a session or connection
+    table = Notification.__table__
+    with db.engine.connect() as connection:
+        return connection.execute(
+            select(table.c.id, table.c.message, table.c.created_at, table.c.reviewed_by_user)
+            .where(recipient_column == account_id, table.c.id > after_id)
+            .order_by(table.c.id)
+            .limit(NOTIFICATION_STREAM_BATCH_SIZE)
+        ).all()
+
+
+def stream_notification_events(
+        account: BaseUserAccount, last_event_id: Optional[int] = None, max_seconds: Optional[float] = None
+) -> Iterator[str]:
+    """
+    Streams an account's new notifications as Server-Sent Events.
+
+    Args:
+        account (BaseUserAccount): The admin, alumnus or company account.
+        last_event_id (int, optional): The ID of the last notification the client received; any later
+            notifications are sent first. Defaults to the account's latest notification (only new
+            notifications are sent).
+        max_seconds (float, optional): How long to stream for. Defaults to NOTIFICATION_STREAM_MAX_SECONDS.
+
+    Returns:
+        Iterator[str]: The event stream.
+    """
+    # Resolved now, as the generator may run after `current_user` has gone
+    model = account.__class__
+    account_id = account.id
+    config = current_app.config
+    if max_seconds is None:
+        max_seconds = config.get("NOTIFICATION_STREAM_MAX_SECONDS", 300)
+    poll_seconds = config.get("NOTIFICATION_STREAM_POLL_SECONDS", 5)
+    heartbeat_seconds = config.get("NOTIFICATION_STREAM_HEARTBEAT_SECONDS", 15)
+    retry_ms = int(config.get("NOTIFICATION_STREAM_RETRY_SECONDS", 5) * 1000)
+    recipient_column = Notification.__table__.c[get_notification_recipient_column(model).key]
+    pubsub = get_pubsub()
+
+    def generate() -> Iterator[str]:
+        # Subscribe before the first read, so that nothing committed in between is missed
+        subscription = pubsub.subscribe(get_notification_channel(model, account_id))
+        try:
+            cursor = last_event_id
+            if cursor is None:
+                with db.engine.connect() as connection:
+                    cursor = connection.execute(
+                        select(func.max(Notification.__table__.c.id)).where(recipient_column == account_id)
+                    ).scalar() or 0
+
+            yield f"retry: {retry_ms}\n\n"
+            deadline = time.monotonic() + max_seconds
+            last_sent = time.monotonic()
+
+            while True:
+                rows = _read_notifications(recipient_column, account_id, cursor)
+                for row in rows:
+                    yield _format_event(row)
+                    cursor = row.id
+                if rows:
+                    last_sent = time.monotonic()
+                if len(rows) == NOTIFICATION_STREAM_BATCH_SIZE:
+                    continue
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+
+                if not subscription.wait(min(poll_seconds, remaining)):
+                    if time.monotonic() - last_sent >= heartbeat_seconds:
+                        yield ": heartbeat\n\n"
+                        last_sent = time.monotonic()
+        finally:
+            subscription.close()
+
+    return generate()
+
+
+def notification_stream_response(account: BaseUserAccount) -> Response:
+    """
+    Builds the Server-Sent Events response streaming an account's new notifications, resuming after
+    the request's Last-Event-ID header (or `last_event_id` query parameter) when given.
+
+    Args:
+        account (BaseUserAccount): The admin, alumnus or company account.
+
+    Returns:
+        Response: The event stream response, or a 400 response if the last event ID is invalid.
+    """
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    if last_event_id is not None:
+        try:
+            last_event_id = int(last_event_id)
+        except ValueError:
+            return Response("Invalid Last-Event-ID.", status=400)
+
+    return Response(
+        stream_with_context(stream_notification_events(account, last_event_id)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
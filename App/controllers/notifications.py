@@ -1,34 +1,99 @@
-from App.models import AlumnusAccount, CompanyAccount, Notification
+from concurrent.futures import Future
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from typing import Dict, List, Optional, Union
+
+from App.models import AlumnusAccount, BaseUserAccount, CompanyAccount, Notification
 from App.database import db
+from App.utils.background import submit_background_task
+from App.utils.db_utils import decode_cursor, get_records_by_filter
+from .notification_counts import adjust_unread_notification_counts, get_notification_recipient_column
+from .notification_events import queue_notification_events
 
 from App.controllers.admin_account import get_all_admin_accounts
 
 from App.models import CompanySubscription
 
 
+def add_alumni_notifications(messages: Dict[int, str]) -> None:
+    """
+    Adds a notification for each of several alumni with bulk inserts of NOTIFICATION_FAN_OUT_CHUNK_SIZE
+    rows, and updates their unread counters and live streams. The caller commits.
+
+    Args:
+        messages (Dict[int, str]): Alumnus ID mapped to the alumnus' notification message.
+    """
+    chunk_size = current_app.config.get("NOTIFICATION_FAN_OUT_CHUNK_SIZE", 1000)
+    alumnus_ids = list(messages)
+    created_at = datetime.utcnow()
+
+    for start in range(0, len(alumnus_ids), chunk_size):
+        chunk = alumnus_ids[start:start + chunk_size]
+        db.session.execute(insert(Notification), [
+            {
+                "alumnus_id": alumnus_id,
+                "company_id": None,
+                "admin_id": None,
+                "message": messages[alumnus_id],
+                "created_at": created_at,
+                "reviewed_by_user": False
+            }
+            for alumnus_id in chunk
+        ])
+        # Bulk inserts bypass the flush hooks that maintain the unread counters and signal live streams
+        recipients = [(AlumnusAccount, alumnus_id) for alumnus_id in chunk]
+        adjust_unread_notification_counts(db.session.connection(), dict.fromkeys(recipients, 1))
+        queue_notification_events(db.session, recipients)
+
+
 def notify_subscribed_alumni(message, company_id):
-    company = CompanyAccount.query.get(company_id)
+    """
+    Notifies every alumnus subscribed to a company.
 
-    if company:
-        subscribed_alumni = CompanySubscription.query.filter_by(
-            company_id=company.id).all()
+    Subscribers are resolved with one join and their notifications are written with bulk inserts of
+    NOTIFICATION_FAN_OUT_CHUNK_SIZE rows, so the cost no longer grows with one query per subscriber.
 
-        for subscription in subscribed_alumni:
-            alumnus = AlumnusAccount.query.get(subscription.alumnus_id)
+    Args:
+        message (str): The notification message.
+        company_id (int): The ID of the company whose subscribers are notified.
 
-            if alumnus:
-                new_notification = Notification(
-                    alumnus_id=alumnus.id,
-                    company_id=None,
-                    admin_id=None,
-                    message=message
-                )
-                db.session.add(new_notification)
+    Returns:
+        str: The notification message.
+    """
+    subscriber_ids = db.session.scalars(
+        select(CompanySubscription.alumnus_id)
+        .join(AlumnusAccount, AlumnusAccount.id == CompanySubscription.alumnus_id)
+        .where(CompanySubscription.company_id == company_id)
+    ).all()
+
+    try:
+        add_alumni_notifications(dict.fromkeys(subscriber_ids, message))
+        db.session.commit()
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise SQLAlchemyError(f"A database error has occurred: {e}")
 
-    db.session.commit()
     return message
 
 
+def queue_subscribed_alumni_notifications(message, company_id) -> Future:
+    """
+    Queues `notify_subscribed_alumni` on the background worker pool, so the request that triggered
+    the fan-out does not wait for it.
+
+    Args:
+        message (str): The notification message.
+        company_id (int): The ID of the company whose subscribers are notified.
+
+    Returns:
+        Future: The fan-out task's future.
+    """
+    return submit_background_task(notify_subscribed_alumni, message, company_id)
+
+
 def notify_company_account(message, company_id):
     company = CompanyAccount.query.get(company_id)
 
@@ -58,6 +123,96 @@ def notify_admins(message):
         db.session.commit()
     return message
 
+def get_unread_notifications_by_account(
+        account: BaseUserAccount, jsonify_results: bool = False,
+        limit: Optional[int] = None, after: Optional[str] = None
+) -> Union[List[Notification], List[dict]]:
+    """
+    Retrieves an account's unread notifications, newest first.
+
+    Args:
+        account (BaseUserAccount): The admin, alumnus or company account.
+        jsonify_results (bool, optional):
+            If True, returns notifications as a list of JSON-serializable dictionaries.
+            Defaults to False.
+        limit (int, optional): If given, returns at most this many notifications.
+        after (str, optional): If given, returns the notifications after this pagination cursor.
+
+    Returns:
+        Union[List[Notification], List[dict]]:
+            - If `jsonify_results` is False, returns a list of `Notification` objects.
+            - If `jsonify_results` is True, returns a list of dictionaries (JSON format).
+            - Returns an empty list if there are no unread notifications.
+
+    Raises:
+        ValueError: If the pagination cursor is malformed.
+    """
+    recipient_column = get_notification_recipient_column(account.__class__)
+    return get_records_by_filter(
+        lambda: Notification.query.filter(
+            recipient_column == account.id, Notification.reviewed_by_user.is_(False)
+        ).order_by(Notification.created_at.desc(), Notification.id.desc()),
+        jsonify_results,
+        limit,
+        after
+    )
+
+
+def mark_notifications_as_reviewed(
+        account: BaseUserAccount, notification_ids: Optional[List[int]] = None, through: Optional[str] = None
+) -> int:
+    """
+    Marks several of an account's notifications as read with a single UPDATE.
+
+    Args:
+        account (BaseUserAccount): The admin, alumnus or company account the notifications belong to.
+        notification_ids (List[int], optional): The IDs of the notifications to mark.
+        through (str, optional): A pagination cursor (see `encode_cursor`); the notification it points
+            at and every older notification are marked.
+
+    Returns:
+        int: The number of notifications that were marked as read.
+
+    Raises:
+        ValueError: If neither notification IDs nor a cursor are given, or either is malformed.
+        SQLAlchemyError: For any database-related issues.
+    """
+    if notification_ids is None and not through:
+        raise ValueError("Notification IDs or a cursor are required.")
+
+    model = account.__class__
+    conditions = [get_notification_recipient_column(model) == account.id, Notification.reviewed_by_user.is_(False)]
+
+    if notification_ids is not None:
+        try:
+            notification_ids = [int(notification_id) for notification_id in notification_ids]
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid notification IDs: {notification_ids}")
+        conditions.append(Notification.id.in_(notification_ids))
+
+    if through:
+        created_at, id = decode_cursor(through)
+        conditions.append(or_(
+            Notification.created_at < created_at,
+            and_(Notification.created_at == created_at, Notification.id <= id)
+        ))
+
+    try:
+        result = db.session.execute(
+            update(Notification).where(*conditions).values(reviewed_by_user=True)
+            .execution_options(synchronize_session=False)
+        )
+        # Bulk updates bypass the flush hook that maintains the unread counters
+        if result.rowcount:
+            adjust_unread_notification_counts(db.session.connection(), {(model, account.id): -result.rowcount})
+        db.session.commit()
+        return result.rowcount
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise SQLAlchemyError(f"A database error has occurred: {e}")
+
+
 def mark_notification_as_reviewed(notification_id):
     notification = Notification.query.get(notification_id)
     if not notification:
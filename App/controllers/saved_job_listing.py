@@ -4,6 +4,7 @@ from typing import List, Optional, Union
 from App.database import db
 from App.models import AdminAccount, AlumnusAccount, JobListing, SavedJobListing
 from App.utils.db_utils import get_records_by_filter
+from .loading_profiles import apply_loading_profile
 
 """
 ===== CREATE =====
@@ -100,7 +101,8 @@ def get_all_saved_job_listings(
 
 
 def get_saved_job_listings_by_alumnus_id(
-        alumnus_id: int, jsonify_results: bool = False
+        alumnus_id: int, jsonify_results: bool = False,
+        loading_profile: Optional[str] = None
 ) -> Union[List[SavedJobListing], List[dict]]:
     """
     Retrieves all saved job listings created by a given alumnus.
@@ -110,6 +112,7 @@ def get_saved_job_listings_by_alumnus_id(
         jsonify_results (bool, optional):
             If True, returns saved job listings as a list of JSON-serializable dictionaries.
             Defaults to False.
+        loading_profile (str, optional): Name of the eager-loading profile to apply (see `LOADING_PROFILES`).
 
     Returns:
         Union[List[SavedJobListing], List[dict]]:
@@ -118,7 +121,7 @@ def get_saved_job_listings_by_alumnus_id(
             - Returns an empty list if no saved job listings are found.
     """
     return get_records_by_filter(
-        lambda: SavedJobListing.query.filter_by(alumnus_id=alumnus_id),
+        lambda: apply_loading_profile(SavedJobListing.query.filter_by(alumnus_id=alumnus_id), loading_profile),
         jsonify_results
     )
 
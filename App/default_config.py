@@ -14,3 +14,117 @@ APPROVAL_STATUSES = {
     "PENDING",
     "REJECTED"
 }
+
+# Per-worker in-memory listing search index (see App/utils/listing_index.py)
+LISTING_SEARCH_INDEX_ENABLED = True
+LISTING_SEARCH_INDEX_CHECK_INTERVAL = 30
+
+# Keyset pagination of job listings (page size used when a request does not specify `limit`)
+LISTING_PAGE_SIZE = 20
+LISTING_MAX_PAGE_SIZE = 100
+
+# Seconds an authenticated user may be served from the per-worker user cache (0 disables it)
+USER_CACHE_TTL = 0
+
+# Per-worker thread pool for work run off the request path (see App/utils/background.py)
+BACKGROUND_WORKERS = 4
+BACKGROUND_TASKS_SYNCHRONOUS = False
+
+# Rows per bulk insert when fanning notifications out to a company's subscribers
+NOTIFICATION_FAN_OUT_CHUNK_SIZE = 1000
+
+# Email outbox and background sender (see App/utils/email_outbox.py). "recording" keeps emails in memory.
+EMAIL_BACKEND = "smtp"
+EMAIL_SENDER_ADDRESS = None
+EMAIL_SMTP_HOST = "smtp.gmail.com"
+EMAIL_SMTP_PORT = 587
+EMAIL_SMTP_USE_TLS = True
+EMAIL_SMTP_TIMEOUT = 30
+EMAIL_SMTP_POOL_SIZE = 2
+EMAIL_BATCH_SIZE = 50
+EMAIL_MAX_PER_MINUTE = 100
+EMAIL_MAX_ATTEMPTS = 5
+EMAIL_RETRY_BACKOFF_SECONDS = 30
+EMAIL_RETRY_MAX_BACKOFF_SECONDS = 3600
+EMAIL_CLAIM_TIMEOUT_SECONDS = 600
+# Seconds between two sweeps of the outbox for due messages (0 disables the sweep)
+EMAIL_DISPATCH_INTERVAL_SECONDS = 60
+
+# Seconds an account's unread notification count may be served from the per-worker cache (0 disables it)
+NOTIFICATION_COUNT_CACHE_TTL = 5
+
+# Live notification streams (see App/controllers/notification_events.py). Without PUBSUB_REDIS_URL,
+# streams are woken within their own worker and poll for notifications committed by other workers.
+PUBSUB_REDIS_URL = None
+NOTIFICATION_STREAM_POLL_SECONDS = 5
+NOTIFICATION_STREAM_HEARTBEAT_SECONDS = 15
+NOTIFICATION_STREAM_RETRY_SECONDS = 5
+NOTIFICATION_STREAM_MAX_SECONDS = 300
+
+# Keyset pagination of the notification pages
+NOTIFICATION_PAGE_SIZE = 20
+NOTIFICATION_MAX_PAGE_SIZE = 100
+
+# Retention of reviewed notifications (see App/controllers/notification_archive.py). Without
+# NOTIFICATION_ARCHIVE_PATH, digests are kept in the notification_archive table instead of a JSONL file.
+NOTIFICATION_RETENTION_DAYS = 90
+NOTIFICATION_ARCHIVE_BATCH_SIZE = 500
+NOTIFICATION_ARCHIVE_PATH = None
+NOTIFICATION_ARCHIVE_INTERVAL_SECONDS = 86400
+
+# Seconds subscribers' listing events are collected for before being sent as one notification and one
+# email per subscriber (see App/controllers/listing_digests.py). 0 sends every event right away.
+NOTIFICATION_DIGEST_WINDOW_SECONDS = 0
+
+# Content-addressed resume storage, inside the static folder (see App/utils/resume_storage.py)
+RESUME_UPLOAD_FOLDER = "uploads/resumes"
+RESUME_GC_GRACE_SECONDS = 3600
+
+# Profile photo processing (see App/utils/images.py); resizing and thumbnails require Pillow
+PROFILE_IMAGE_FORMAT = "WEBP"
+PROFILE_IMAGE_QUALITY = 80
+PROFILE_IMAGE_MAX_SIZE = 512
+PROFILE_IMAGE_THUMBNAIL_SIZE = 128
+PROFILE_IMAGE_MAX_UPLOAD_BYTES = 10485760
+
+# Cache lifetime of content-addressed static files (see App/utils/static_files.py)
+STATIC_IMMUTABLE_MAX_AGE = 31536000
+
+# Fingerprinted, precompressed application assets (see App/utils/static_files.py); always off in debug mode
+STATIC_ASSET_FINGERPRINTING = True
+STATIC_ASSET_EXCLUDED_FOLDERS = ["profile-images", "uploads"]
+STATIC_ASSET_MAX_PRECOMPRESSED_BYTES = 1048576
+
+# Caching of responses shared by every user of a role, e.g. listing searches (see App/utils/response_cache.py).
+# "sqlite" shares entries and invalidations between workers through RESPONSE_CACHE_PATH (in the instance
+# folder by default); "memory" keeps them per worker. A TTL of 0 disables the cache. Generations shared by every
+# worker ("sqlite") also version the cached company fragments, listing page ETags and the listing search index;
+# with "memory" (or a TTL of 0) those fragments are always rendered and those pages are sent without ETags.
+RESPONSE_CACHE_TTL = 300
+RESPONSE_CACHE_MAX_ENTRIES = 1024
+RESPONSE_CACHE_BACKEND = "sqlite"
+RESPONSE_CACHE_PATH = None
+
+# Per-worker cache of rendered template fragments (see App/utils/fragment_cache.py). Off when the TTL is 0
+# or templates are reloaded on change (TEMPLATES_AUTO_RELOAD, which defaults to debug mode).
+FRAGMENT_CACHE_TTL = 3600
+FRAGMENT_CACHE_MAX_ENTRIES = 2048
+
+# Answer revalidations of listing pages and searches with 304 Not Modified (see App/utils/conditional_requests.py)
+CONDITIONAL_REQUESTS = True
+
+# Per-request timings, SQL query counts and N+1 detection (see App/utils/profiling.py). Requests slower than
+# SLOW_REQUEST_MS, or running one statement shape N_PLUS_ONE_THRESHOLD times, are logged on "App.profiling".
+# REQUEST_PROFILER ("off", "header" for requests sent with `X-Profile: 1`, or "always") writes a pyinstrument
+# or cProfile report per request to REQUEST_PROFILER_DIR (instance/profiles by default).
+REQUEST_PROFILING = True
+SLOW_REQUEST_MS = 500
+REQUEST_PROFILING_N_PLUS_ONE_THRESHOLD = 5
+REQUEST_PROFILING_SERVER_TIMING = False
+REQUEST_PROFILER = "off"
+REQUEST_PROFILER_DIR = None
+
+# Prometheus metrics at /metrics, when prometheus_client is installed (see App/utils/metrics.py). With
+# METRICS_TOKEN set, scrapes must send `Authorization: Bearer <token>`.
+METRICS_ENABLED = True
+METRICS_TOKEN = None
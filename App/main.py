@@ -1,6 +1,6 @@
 import os
 from dotenv import load_dotenv
-from flask import Flask, render_template
+from flask import Config, Flask, render_template
 from flask_uploads import DOCUMENTS, IMAGES, TEXT, UploadSet, configure_uploads
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
@@ -8,10 +8,23 @@ from werkzeug.datastructures import FileStorage
 
 from App.database import init_db, db
 from App.config import load_config
+from App.utils.search_index import ensure_search_index
+from App.utils.email_outbox import schedule_email_dispatch
+from App.utils.fragment_cache import register_fragment_cache
+from App.utils.images import get_thumbnail_path
+from App.utils.metrics import register_metrics
+from App.utils.profiling import register_request_profiling
+from App.utils.response_cache import register_response_cache
+from App.utils.resume_storage import HashingRequest
+from App.utils.static_files import register_static_asset_manifest, register_static_cache_headers
 
 from App.controllers import (
     setup_jwt,
-    add_auth_context
+    add_auth_context,
+    ensure_account_directory,
+    refresh_listing_search_index,
+    schedule_listing_digest_flush,
+    schedule_notification_archival
 )
 
 from App.views import views
@@ -27,12 +40,16 @@ def create_app(overrides={}):
     load_dotenv()
 
     app = Flask(__name__, static_url_path='/static')
+    app.request_class = HashingRequest
 
     # Load config from environment or override dict
     load_config(app, overrides)
     
-    # Optional fallback config
-    app.config.from_pyfile('default_config.py', silent=True)
+    # Optional fallback config, for the settings a custom config leaves out (it never overrides the above)
+    fallback = Config(app.root_path)
+    if fallback.from_pyfile('default_config.py', silent=True):
+        for key, value in fallback.items():
+            app.config.setdefault(key, value)
 
     CORS(app)
     add_auth_context(app)
@@ -41,6 +58,19 @@ def create_app(overrides={}):
     init_db(app)
     with app.app_context():
         db.create_all()
+        ensure_account_directory()
+        ensure_search_index()
+        if app.config.get('LISTING_SEARCH_INDEX_ENABLED'):
+            refresh_listing_search_index()
+
+    register_request_profiling(app)
+    register_metrics(app)
+    register_response_cache(app)
+
+    # Periodic maintenance, run on the background worker pool
+    schedule_listing_digest_flush(app)
+    schedule_notification_archival(app)
+    schedule_email_dispatch(app)
 
     # File upload setup
     photos = UploadSet('photos', TEXT + DOCUMENTS + IMAGES)
@@ -48,6 +78,10 @@ def create_app(overrides={}):
 
     # Register views
     add_views(app)
+    register_static_asset_manifest(app)
+    register_static_cache_headers(app)
+    app.add_template_filter(get_thumbnail_path, 'thumbnail')
+    register_fragment_cache(app)
     
     # JWT setup
     jwt = setup_jwt(app)
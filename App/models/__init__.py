@@ -7,3 +7,8 @@ from .job_application import *
 from .job_listing import *
 from .notification import *
 from .saved_job_listing import *
+from .account_directory_entry import *
+from .email_outbox_message import *
+from .notification_archive_entry import *
+from .pending_listing_event import *
+from .resume_blob import *
@@ -0,0 +1,84 @@
+from typing import Dict, Optional, Type
+
+from App.database import db
+from .admin_account import AdminAccount
+from .alumnus_account import AlumnusAccount
+from .base_user_account import BaseUserAccount
+from .company_account import CompanyAccount
+
+# Account type stored in directory entries (and access token claims) -> account model
+ACCOUNT_TYPES: Dict[str, Type[BaseUserAccount]] = {
+    "admin": AdminAccount,
+    "alumnus": AlumnusAccount,
+    "company": CompanyAccount
+}
+
+# Account fields kept in the directory
+DIRECTORY_FIELDS = ("login_email", "phone_number", "website_url", "registered_name")
+
+# Directory fields unique across every type of account (login emails, and phone numbers, which sign-up has always
+# checked against every account table); website URLs and registered names only belong to company accounts
+GLOBAL_DIRECTORY_FIELDS = ("login_email", "phone_number")
+GLOBAL_DIRECTORY_CONDITION = "field IN ({})".format(", ".join(f"'{field}'" for field in GLOBAL_DIRECTORY_FIELDS))
+
+
+def get_account_type(account: BaseUserAccount) -> Optional[str]:
+    """
+    Gets the account type of an admin, alumnus or company account.
+
+    Args:
+        account (BaseUserAccount): The account.
+
+    Returns:
+        Optional[str]: The account type, or None if it is not a known type of account.
+    """
+    for account_type, model in ACCOUNT_TYPES.items():
+        if isinstance(account, model):
+            return account_type
+    return None
+
+
+class AccountDirectoryEntry(db.Model):
+    """
+    Maps a unique account field value to the account that holds it, so that an account can be found
+    (or a value checked for uniqueness) with one indexed lookup instead of probing every account table.
+    Values are unique per type of account, and fields in GLOBAL_DIRECTORY_FIELDS across every type.
+
+    Attributes:
+        field (str): The account field (e.g. "login_email"). See DIRECTORY_FIELDS.
+        value (str): The field's value.
+        account_type (str): The type of account holding the value (e.g. "alumnus"). See ACCOUNT_TYPES.
+        account_id (int): The ID of the account holding the value.
+    """
+
+    __tablename__ = "account_directory"
+    __table_args__ = (
+        db.Index("ix_account_directory_account", "account_type", "account_id"),
+        db.Index(
+            "uq_account_directory_global_value", "field", "value", unique=True,
+            sqlite_where=db.text(GLOBAL_DIRECTORY_CONDITION), postgresql_where=db.text(GLOBAL_DIRECTORY_CONDITION)
+        ),
+    )
+
+    field = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.String(255), primary_key=True)
+    account_type = db.Column(db.String(50), primary_key=True)
+    account_id = db.Column(db.Integer, nullable=False)
+
+    def __init__(self, field: str, value: str, account_type: str, account_id: int) -> None:
+        self.field = field
+        self.value = value
+        self.account_type = account_type
+        self.account_id = account_id
+
+    def __repr__(self) -> str:
+        return (f"<{self.__class__.__name__} (field='{self.field}', value='{self.value}', "
+                f"account_type='{self.account_type}', account_id={self.account_id})>")
+
+    def __json__(self) -> dict:
+        return {
+            "field": self.field,
+            "value": self.value,
+            "account_type": self.account_type,
+            "account_id": self.account_id
+        }
@@ -11,6 +11,9 @@ class BaseUserAccount(db.Model):
     password_hash = db.Column(db.String(120), nullable=False)
     profile_photo_file_path = db.Column(db.String, default=None)
 
+    # Denormalized count of unread notifications (maintained by App/controllers/notification_counts.py)
+    unread_notification_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
     # @declared_attr
     # def notifications(cls):
     #     return db.relationship(
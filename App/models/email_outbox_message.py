@@ -0,0 +1,67 @@
+from datetime import datetime
+from App.database import db
+
+EMAIL_OUTBOX_STATUSES = ("PENDING", "SENDING", "SENT", "FAILED")
+
+
+class EmailOutboxMessage(db.Model):
+    """
+    Represents a rendered email waiting in the outbox for the background sender.
+
+    Attributes:
+        id (int): A unique identifier for the message.
+        recipient_email (str): The recipient's email address.
+        subject (str): The email's subject line.
+        text_content (str): The plain text body.
+        html_content (str): The HTML body (optional).
+        status (str): The delivery status. See EMAIL_OUTBOX_STATUSES.
+        attempts (int): How many delivery attempts have failed so far.
+        next_attempt_at (datetime): The earliest time the message may be (re)sent.
+        claim_token (str): Identifies the sender currently delivering the message.
+        claimed_at (datetime): When the message was claimed by a sender.
+        last_error (str): The error raised by the latest failed attempt.
+        created_at (datetime): When the message was queued.
+        sent_at (datetime): When the message was delivered.
+    """
+
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        db.Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    recipient_email = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    text_content = db.Column(db.Text, nullable=False)
+    html_content = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default="PENDING")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claim_token = db.Column(db.String(32), nullable=True)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.String(1000), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    def __init__(self, recipient_email: str, subject: str, text_content: str, html_content: str = None) -> None:
+        self.recipient_email = recipient_email
+        self.subject = subject
+        self.text_content = text_content
+        self.html_content = html_content
+
+    def __repr__(self) -> str:
+        return (f"<{self.__class__.__name__} (id={self.id}, recipient_email='{self.recipient_email}', "
+                f"status='{self.status}', attempts={self.attempts})>")
+
+    def __json__(self) -> dict:
+        return {
+            "id": self.id,
+            "recipient_email": self.recipient_email,
+            "subject": self.subject,
+            "status": self.status,
+            "attempts": self.attempts,
+            "next_attempt_at": self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            "last_error": self.last_error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "sent_at": self.sent_at.isoformat() if self.sent_at else None
+        }
@@ -29,6 +29,12 @@ class JobApplication(db.Model):
     job_listing = db.relationship(
         "JobListing", back_populates='job_applications')
 
+    # The columns __json__ is built from, in order (see `get_json_projection` in App/utils/db_utils.py)
+    __json_projection__ = (
+        "id", "alumnus_id", "job_listing_id", "resume_file_path", "work_experience", "datetime_applied",
+        "company_approval_status"
+    )
+
     # was causing errors -CTZ
     # @validates("company_approval_status")
     # def validate_approval_status(self, key, value: str) -> str:
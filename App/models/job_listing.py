@@ -29,6 +29,14 @@ class JobListing(db.Model):
     """
 
     __tablename__ = "job_listings"
+    __table_args__ = (
+        # Published listings, newest first (dashboard, search and keyset pagination)
+        db.Index("ix_job_listings_approval_status_created",
+                 "admin_approval_status", "datetime_created"),
+        # A company's listings with a given status (company listings page)
+        db.Index("ix_job_listings_company_approval_status",
+                 "company_id", "admin_approval_status"),
+    )
 
     id = db.Column(db.Integer(), primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey(
@@ -52,6 +60,12 @@ class JobListing(db.Model):
     saved_job_listings = db.relationship(
         "SavedJobListing", back_populates='job_listing', lazy="dynamic", cascade="all, delete-orphan")
 
+    # The columns __json__ is built from, in order (see `get_json_projection` in App/utils/db_utils.py)
+    __json_projection__ = (
+        "id", "company_id", "title", "position_type", "description", "monthly_salary_ttd", "is_remote",
+        "job_site_address", "datetime_created", "datetime_last_modified", "admin_approval_status"
+    )
+
     def __init__(self, company_id: int, title: str, position_type: str, description: str, monthly_salary_ttd: int, is_remote: bool = False, job_site_address: str = None,  datetime_created=None, datetime_last_modified=None, admin_approval_status: str = 'PENDING') -> None:
         """
         Initializes a JobListing instance.
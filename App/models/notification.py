@@ -17,6 +17,14 @@ class Notification(db.Model):
 
     """
     __tablename__ = "notifications"
+    __table_args__ = (
+        # An account's unread (or read) notifications, newest first (notification pages and keyset pagination)
+        db.Index("ix_notifications_alumnus_reviewed_created", "alumnus_id", "reviewed_by_user", "created_at"),
+        db.Index("ix_notifications_company_reviewed_created", "company_id", "reviewed_by_user", "created_at"),
+        db.Index("ix_notifications_admin_reviewed_created", "admin_id", "reviewed_by_user", "created_at"),
+        # Reviewed notifications past the retention period (see App/controllers/notification_archive.py)
+        db.Index("ix_notifications_reviewed_created", "reviewed_by_user", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     alumnus_id = db.Column(db.Integer, db.ForeignKey(
@@ -92,9 +100,9 @@ class Notification(db.Model):
     def __json__(self):
         return {
             "id": self.id,
-            "Alumnus ID": {self.alumnus_id},
-            "Company ID": {self.company_id},
-            "Admin ID": {self.admin_id},
+            "Alumnus ID": self.alumnus_id,
+            "Company ID": self.company_id,
+            "Admin ID": self.admin_id,
             "message": self.message,
             "created_at": self.created_at.isoformat(),
             "reviewed_by_user": self.reviewed_by_user
@@ -0,0 +1,49 @@
+from datetime import datetime
+from App.database import db
+
+
+class NotificationArchiveEntry(db.Model):
+    """
+    Represents a digest of archived notifications: every reviewed notification an account received with the
+    same message (e.g. a listing published, unpublished and republished) collapses into a single entry.
+
+    Attributes:
+        id (int): A unique identifier for the entry.
+        recipient_type (str): The recipient's account type ("admin", "alumnus" or "company").
+        recipient_id (int): The recipient's account ID.
+        message (str): The notifications' message.
+        occurrences (int): How many notifications were collapsed into the entry.
+        first_created_at (datetime): When the oldest of the notifications was created.
+        last_created_at (datetime): When the newest of the notifications was created.
+        archived_at (datetime): When notifications were last added to the entry.
+    """
+
+    __tablename__ = "notification_archive"
+    __table_args__ = (
+        db.UniqueConstraint("recipient_type", "recipient_id", "message", name="uq_notification_archive_digest"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    recipient_type = db.Column(db.String(20), nullable=False)
+    recipient_id = db.Column(db.Integer, nullable=False)
+    message = db.Column(db.String(1000), nullable=False)
+    occurrences = db.Column(db.Integer, nullable=False, default=1)
+    first_created_at = db.Column(db.DateTime, nullable=True)
+    last_created_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return (f"<{self.__class__.__name__} (id={self.id}, recipient_type='{self.recipient_type}', "
+                f"recipient_id={self.recipient_id}, occurrences={self.occurrences})>")
+
+    def __json__(self) -> dict:
+        return {
+            "id": self.id,
+            "recipient_type": self.recipient_type,
+            "recipient_id": self.recipient_id,
+            "message": self.message,
+            "occurrences": self.occurrences,
+            "first_created_at": self.first_created_at.isoformat() if self.first_created_at else None,
+            "last_created_at": self.last_created_at.isoformat() if self.last_created_at else None,
+            "archived_at": self.archived_at.isoformat() if self.archived_at else None
+        }
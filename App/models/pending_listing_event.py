@@ -0,0 +1,49 @@
+from datetime import datetime
+from App.database import db
+
+
+class PendingListingEvent(db.Model):
+    """
+    Represents a listing event waiting to be sent to the posting company's subscribers as part of their
+    next digest. The listing's details are copied, as the listing may be edited or deleted in the meantime.
+
+    Attributes:
+        id (int): A unique identifier for the event.
+        company_id (int): Foreign key referencing the company whose subscribers are notified.
+        listing_id (int): The ID of the job listing the event happened to.
+        event (str): The listing event ("published", "unpublished" or "deleted").
+        message (str): The notification message sent when the digest holds no other event.
+        job_title (str): The listing's title.
+        company_name (str): The posting company's name.
+        job_location (str): The listing's location.
+        job_url (str): The listing page's URL.
+        created_at (datetime): When the event happened.
+    """
+
+    __tablename__ = "pending_listing_events"
+
+    id = db.Column(db.Integer, primary_key=True)
+    company_id = db.Column(db.Integer, db.ForeignKey('company_accounts.id', ondelete='CASCADE'), nullable=False)
+    listing_id = db.Column(db.Integer, nullable=False)
+    event = db.Column(db.String(20), nullable=False)
+    message = db.Column(db.String(1000), nullable=False)
+    job_title = db.Column(db.String(255), nullable=False)
+    company_name = db.Column(db.String(255), nullable=False)
+    job_location = db.Column(db.String(255), nullable=True)
+    job_url = db.Column(db.String(500), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __init__(self, company_id: int, listing_id: int, event: str, message: str, job_title: str,
+                 company_name: str, job_location: str = None, job_url: str = None) -> None:
+        self.company_id = company_id
+        self.listing_id = listing_id
+        self.event = event
+        self.message = message
+        self.job_title = job_title
+        self.company_name = company_name
+        self.job_location = job_location
+        self.job_url = job_url
+
+    def __repr__(self) -> str:
+        return (f"<{self.__class__.__name__} (id={self.id}, company_id={self.company_id}, "
+                f"listing_id={self.listing_id}, event='{self.event}')>")
@@ -0,0 +1,35 @@
+from datetime import datetime
+from App.database import db
+
+
+class ResumeBlob(db.Model):
+    """
+    Represents a stored resume file, identified by the SHA-256 of its content. Every application that
+    uploads the same file shares one blob.
+
+    Attributes:
+        content_hash (str): The hex SHA-256 of the file's content.
+        path (str): The file's path, relative to the static folder (what `JobApplication.resume_file_path` holds).
+        size (int): The file's size in bytes.
+        ref_count (int): How many job applications use the file.
+        created_at (datetime): When the file was first stored.
+        last_stored_at (datetime): When the file was last uploaded (garbage collection spares recent uploads).
+    """
+
+    __tablename__ = "resume_blobs"
+
+    content_hash = db.Column(db.String(64), primary_key=True)
+    path = db.Column(db.String(255), nullable=False, unique=True)
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_stored_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __init__(self, content_hash: str, path: str, size: int) -> None:
+        self.content_hash = content_hash
+        self.path = path
+        self.size = size
+
+    def __repr__(self) -> str:
+        return (f"<{self.__class__.__name__} (content_hash='{self.content_hash}', path='{self.path}', "
+                f"size={self.size}, ref_count={self.ref_count})>")
@@ -1,19 +1,37 @@
+import base64
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
 import pytest
 import logging
+import tempfile
 import unittest
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from flask import current_app, render_template, render_template_string, url_for
+from flask_jwt_extended import create_access_token, decode_token
+from sqlalchemy import select, text, update
+from sqlalchemy.exc import SQLAlchemyError
+from werkzeug.datastructures import FileStorage
 from werkzeug.security import generate_password_hash, check_password_hash
 
 from App.main import create_app
 from App.database import db, create_db
 from App.models import AdminAccount, AlumnusAccount, CompanyAccount
 
-from App.controllers.auth import login
+from App.controllers.auth import load_user_from_claims, login
 from App.controllers.base_user_account import get_user_by_email
 from App.controllers import (
     add_admin_account,
     add_alumnus_account,
     add_company_account,
     add_job_listing,
+    delete_company_account,
     get_all_users_json,
     get_approved_listings,
     get_company_account_by_login_email,
@@ -25,8 +43,45 @@ from App.controllers import (
     get_company_subscriptions_by_alumnus_id,
     delete_company_subscription,
     update_alumnus_account,
-    delete_job_listing
+    delete_job_listing,
+    approve_job_listing,
+    update_job_listing,
+    update_job_listing_title,
+    update_company_registered_name,
+    get_all_job_listings,
+    get_all_job_applications,
+    queue_listing_search_index_refresh,
+    refresh_listing_search_index
 )
+from App.models import (
+    EmailOutboxMessage, JobApplication, JobListing, Notification, NotificationArchiveEntry, PendingListingEvent,
+    ResumeBlob, SavedJobListing
+)
+from App.controllers.account_directory import get_account_directory_conflicts, rebuild_account_directory
+from App.controllers.alumnus_account import (
+    update_alumnus_account_first_name, update_alumnus_account_login_email, update_alumnus_account_profile_photo
+)
+from App.controllers.base_user_account import get_all_users
+from App.controllers.company_subscription import get_subscribed_alumni_by_company_id
+from App.controllers.listing_digests import flush_listing_digests
+from App.controllers.notification_archive import archive_reviewed_notifications
+from App.controllers.notification_counts import get_unread_notification_count, recount_unread_notifications
+from App.controllers.notification_events import get_notification_channel, stream_notification_events
+from App.controllers.notifications import (
+    get_unread_notifications_by_account, mark_notification_as_reviewed, mark_notifications_as_reviewed,
+    notify_company_account, queue_subscribed_alumni_notifications
+)
+from App.controllers.saved_job_listing import add_saved_job_listing
+from App.utils.db_utils import count_queries, encode_cursor, get_next_cursor, iter_json_array, iter_json_records
+from App.utils.email_outbox import RecordingSMTP, dispatch_email_outbox
+from App.utils.images import get_thumbnail_path, save_profile_image
+from App.utils.profiling import PROFILING_LOGGER, get_request_profile, get_statement_shape
+from App.utils.pubsub import get_pubsub
+from App.utils.response_cache import LISTINGS_NAMESPACE, ResponseCache, SQLiteCacheBackend
+from App.utils.resume_storage import collect_unused_resumes, store_resume
+from App.utils.listing_index import ListingSearchIndex, listing_search_index
+from App.utils.search_index import filter_query_by_search_term
+from App.utils.user_cache import user_cache
 
 
 LOGGER = logging.getLogger(__name__)
@@ -144,13 +199,27 @@ def test_generate_hashed_password():
 @pytest.fixture(autouse=True, scope="module")
 def empty_db():
     app = create_app(
-        {'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'}
+        {'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db', 'RESPONSE_CACHE_BACKEND': 'memory'}
     )
     create_db()
     yield app.test_client()
     db.drop_all()
 
 
+@contextmanager
+def shared_response_cache():
+    # A response cache shared through a temporary SQLite file, as with RESPONSE_CACHE_BACKEND = "sqlite"
+    response_cache = current_app.extensions.get('response_cache')
+    with tempfile.TemporaryDirectory() as directory:
+        cache = current_app.extensions['response_cache'] = ResponseCache(
+            300, 1024, SQLiteCacheBackend(os.path.join(directory, 'response-cache.db'), 1024)
+        )
+        try:
+            yield cache
+        finally:
+            current_app.extensions['response_cache'] = response_cache
+
+
 # def test_authenticate():
 #     user = add_admin("bob", "bobpass", 'bob@mail')
 #     assert login("bob", "bobpass") != None
@@ -219,6 +288,101 @@ class UserIntegrationTests(unittest.TestCase):
     # def get_all_applicants(self):
     #     applicants = get_all_applicants('1')
 
+    def test_etag_listing_requests(self):
+        with shared_response_cache():
+            company = get_user_by_email('company10@mail.com')
+            alumnus = get_user_by_email('robby2@mail.com')
+            Admin = get_user_by_email('bob2@mail.com')
+            job = add_job_listing(company.id, 'Revalidated listing', 'Full-time', 'ETags', 5000, False, 'Arima')
+            approve_job_listing(job.id)
+            client = current_app.test_client()
+            headers = {'Authorization': f"Bearer {create_access_token(identity=alumnus.login_email)}"}
+
+            def revalidate(url, etag):
+                return client.get(url, headers={**headers, 'If-None-Match': etag})
+
+            for url in (f'/view_listing_alumnus/{job.id}', f'/view_company_listings/{company.id}', '/get_saved_listing',
+                        '/search_listings?search=Revalidated'):
+                response = client.get(url, headers=headers)
+                assert response.status_code == 200 and response.cache_control.private and response.cache_control.no_cache
+                etag = response.headers['ETag']
+                response = revalidate(url, etag)
+                assert response.status_code == 304 and not response.data and response.headers['ETag'] == etag
+
+            # Changes to the listing, the saved listings and the company all show in the ETags
+            response = client.get(f'/view_listing_alumnus/{job.id}', headers=headers)
+            etag, last_modified = response.headers['ETag'], response.last_modified
+            assert last_modified is not None
+            saved_etag = client.get('/get_saved_listing', headers=headers).headers['ETag']
+            update_job_listing(job.id, title='Revalidated renamed listing')
+            response = revalidate(f'/view_listing_alumnus/{job.id}', etag)
+            assert response.status_code == 200 and response.headers['ETag'] != etag
+            etag = response.headers['ETag']
+
+            add_saved_job_listing(alumnus.id, job.id)
+            assert revalidate('/get_saved_listing', saved_etag).status_code == 200
+            assert revalidate(f'/view_listing_alumnus/{job.id}', etag).status_code == 200
+            search_etag = client.get('/search_listings?search=Revalidated', headers=headers).headers['ETag']
+            original_name = company.registered_name
+            update_company_registered_name(company.id, 'Revalidated Company')
+            assert revalidate('/search_listings?search=Revalidated', search_etag).status_code == 200
+            update_company_registered_name(company.id, original_name)
+
+            # Another user's ETag for the same page is never answered with a 304
+            admin_headers = {'Authorization': f"Bearer {create_access_token(identity=Admin.login_email)}"}
+            search_etag = client.get('/search_listings?search=Revalidated', headers=headers).headers['ETag']
+            response = client.get('/search_listings?search=Revalidated', headers={**admin_headers, 'If-None-Match': search_etag})
+            assert response.status_code == 200
+            response = client.get('/api/search_listings?search=Revalidated')
+            assert revalidate('/api/search_listings?search=Revalidated', response.headers['ETag']).status_code == 304
+
+            # Saved listings with the same count and sum of IDs are still told apart
+            jobs = [
+                add_job_listing(company.id, f'Saved listing {n}', 'Full-time', 'ETags', 5000, False, 'Arima')
+                for n in range(4)
+            ]
+            assert [saved.id for saved in jobs] == list(range(jobs[0].id, jobs[0].id + 4))
+            add_saved_job_listing(alumnus.id, jobs[0].id)
+            add_saved_job_listing(alumnus.id, jobs[3].id)
+            saved_etag = client.get('/get_saved_listing', headers=headers).headers['ETag']
+            SavedJobListing.query.filter(
+                SavedJobListing.alumnus_id == alumnus.id, SavedJobListing.job_listing_id.in_([jobs[0].id, jobs[3].id])
+            ).delete()
+            db.session.commit()
+            add_saved_job_listing(alumnus.id, jobs[1].id)
+            add_saved_job_listing(alumnus.id, jobs[2].id)
+            assert revalidate('/get_saved_listing', saved_etag).status_code == 200
+
+            # Pages with flashed messages waiting are always sent, without an ETag
+            etag = client.get(f'/view_listing_alumnus/{job.id}', headers=headers).headers['ETag']
+            with client.session_transaction() as session:
+                session['_flashes'] = [('message', 'Listing saved')]
+            response = revalidate(f'/view_listing_alumnus/{job.id}', etag)
+            assert response.status_code == 200 and 'ETag' not in response.headers
+            for saved in jobs:
+                delete_job_listing(saved.id, Admin.id)
+            delete_job_listing(job.id, Admin.id)
+
+    def test_export_streams_json(self):
+        Admin = get_user_by_email('bob2@mail.com')
+        alumnus = get_user_by_email('robby2@mail.com')
+        client = current_app.test_client()
+        headers = {'Authorization': f"Bearer {create_access_token(identity=Admin.login_email)}"}
+
+        response = client.get('/api/export/listings', headers=headers)
+        assert response.status_code == 200 and response.is_streamed
+        assert response.mimetype == 'application/json'
+        expected = sorted(get_all_job_listings(jsonify_results=True), key=lambda listing: listing['id'])
+        assert expected and response.get_json() == expected
+
+        response = client.get('/api/export/listings?status=approved', headers=headers)
+        assert response.get_json() == [listing for listing in expected if listing['admin_approval_status'] == 'APPROVED']
+        response = client.get('/api/export/applications', headers=headers)
+        assert response.status_code == 200 and isinstance(response.get_json(), list)
+
+        alumnus_headers = {'Authorization': f"Bearer {create_access_token(identity=alumnus.login_email)}"}
+        assert client.get('/api/export/listings', headers=alumnus_headers).status_code == 403
+
     def test_get_all_users_json(self):
         print(get_all_users_json())
         users_json = get_all_users_json()
@@ -282,6 +446,125 @@ class UserIntegrationTests(unittest.TestCase):
     #     user = get_user(1)
     #     assert user.username == "ronnie"
 
+    def test_healthcheck_and_metrics(self):
+        client = current_app.test_client()
+        for url in ('/health', '/healthcheck'):
+            response = client.get(url)
+            assert response.status_code == 200 and response.get_json() == {'status': 'healthy', 'database': 'ok'}
+
+        try:
+            import prometheus_client
+        except ImportError:
+            # Optional: without it nothing is recorded nor served
+            assert client.get('/metrics').status_code == 404
+            return
+
+        client.get('/api/search_listings?search=metrics')
+        client.get('/api/search_listings?search=metrics')
+        metrics = client.get('/metrics').get_data(as_text=True)
+        assert 'http_request_duration_seconds_count{endpoint="index_views.health_check",method="GET",status="200"} 2.0' in metrics
+        assert 'db_queries_total{endpoint="alumnus_views.api_search_jobs"}' in metrics
+        assert 'cache_lookups_total{cache="response",result="hit"}' in metrics
+        assert 'db_pool_checkout_duration_seconds_count' in metrics and 'email_outbox_messages' in metrics
+        assert 'pending_listing_events' in metrics
+
+        current_app.config['METRICS_TOKEN'] = 'scraper-token'
+        try:
+            assert client.get('/metrics').status_code == 401
+            assert client.get('/metrics', headers={'Authorization': 'Bearer scraper-token'}).status_code == 200
+        finally:
+            current_app.config['METRICS_TOKEN'] = None
+
+    def test_identity_account_directory(self):
+        alumnus_id = get_user_by_email('robby2@mail.com').id
+
+        # Login emails and phone numbers are unique across every type of account
+        with pytest.raises(ValueError, match='Login Email'):
+            add_company_account(
+                'robby2@mail.com', 'compass', 'company11', 'mailing_address',
+                'public11@email.com', 'company11_website.com', '1868-399-9955'
+            )
+        with pytest.raises(ValueError, match='Phone Number'):
+            add_alumnus_account('robby11@mail.com', 'robpass', 'rob', 'by', '1868-399-9944')
+        with pytest.raises(ValueError, match='Phone Number'):
+            add_company_account(
+                'company11@mail.com', 'compass', 'company11', 'mailing_address',
+                'public11@email.com', 'company11_website.com', '1868-399-9944'
+            )
+        company = add_company_account(
+            'company11@mail.com', 'compass', 'company11', 'mailing_address',
+            'public11@email.com', 'company11_website.com', '1868-399-9955'
+        )
+        with pytest.raises(ValueError, match='Phone Number'):
+            add_alumnus_account('robby11@mail.com', 'robpass', 'rob', 'by', '1868-399-9955')
+
+        # Changing a login email moves the account in the directory within the same commit
+        update_alumnus_account_login_email(alumnus_id, 'robpass', 'robby3@mail.com')
+        assert get_user_by_email('robby2@mail.com') is None
+        assert get_user_by_email('robby3@mail.com').id == alumnus_id
+
+        update_alumnus_account_login_email(alumnus_id, 'robpass', 'robby2@mail.com')
+        assert get_user_by_email('robby2@mail.com').id == alumnus_id
+
+        assert rebuild_account_directory() == len(get_all_users())
+        assert isinstance(get_user_by_email('bob2@mail.com'), AdminAccount)
+        assert get_account_directory_conflicts() == []
+
+        # Values held by several accounts (e.g. in databases older than the directory) are skipped, not fatal
+        db.session.execute(update(CompanyAccount).where(CompanyAccount.id == company.id).values(login_email='robby2@mail.com'))
+        db.session.commit()
+        conflicts = get_account_directory_conflicts()
+        assert [(conflict['field'], conflict['account_type']) for conflict in conflicts] == [('login_email', 'company')]
+        assert rebuild_account_directory() == len(get_all_users())
+        assert get_user_by_email('robby2@mail.com').id == alumnus_id
+        db.session.execute(update(CompanyAccount).where(CompanyAccount.id == company.id).values(login_email='company11@mail.com'))
+        db.session.commit()
+        rebuild_account_directory()
+        delete_company_account(company.id, get_user_by_email('bob2@mail.com').id)
+
+    def test_identity_claims_and_user_cache(self):
+        alumnus_id = get_user_by_email('robby2@mail.com').id
+        token = login('robby2@mail.com', 'robpass').get_json()['access_token']
+        claims = decode_token(token)
+        assert (claims['role'], claims['uid']) == ('alumnus', alumnus_id)
+
+        # A token with claims resolves the user by primary key alone
+        db.session.expunge_all()
+        with count_queries(db.engine) as statements:
+            assert load_user_from_claims(claims).id == alumnus_id
+        assert len(statements) == 1
+
+        # Cached users are served without a query until the account is updated
+        user_cache.set(get_user_by_email('robby2@mail.com'), 60)
+        db.session.expunge_all()
+        with count_queries(db.engine) as statements:
+            assert user_cache.get(AlumnusAccount, alumnus_id).first_name == 'robfname'
+        assert statements == []
+
+        update_alumnus_account_first_name(alumnus_id, 'robert')
+        assert user_cache.get(AlumnusAccount, alumnus_id) is None
+        update_alumnus_account_first_name(alumnus_id, 'robfname')
+
+    def test_json_projection(self):
+        company = get_user_by_email('company10@mail.com')
+        job = add_job_listing(company.id, 'Projected listing', 'Full-time', 'Projection', 5000, False, 'Arima')
+        listings = get_all_job_listings()
+        expected = [listing.__json__() for listing in listings]
+        assert any(record['id'] == job.id for record in expected)
+
+        # Serialized from the columns alone: no JobListing is loaded into the session
+        db.session.expunge_all()
+        assert get_all_job_listings(jsonify_results=True) == expected
+        assert not any(isinstance(instance, JobListing) for instance in db.session.identity_map.values())
+        assert get_all_job_applications(jsonify_results=True) == [
+            application.__json__() for application in get_all_job_applications()
+        ]
+
+        # Streamed as a JSON array, in chunks
+        chunks = list(iter_json_array(iter_json_records(JobListing.query, batch_size=2), records_per_chunk=2))
+        assert len(chunks) > 1 and json.loads(''.join(chunks)) == expected
+        assert json.loads(''.join(iter_json_array([]))) == []
+
     def test_initial_isapproved(self):
         company2 = get_user_by_email('company10@mail.com')
         job = add_job_listing(
@@ -310,6 +593,41 @@ class UserIntegrationTests(unittest.TestCase):
         toggled_job = get_job_listing(job.id)
         assert toggled_job.admin_approval_status == "APPROVED"
 
+    def test_dashboard_query_count(self):
+        company = get_user_by_email('company10@mail.com')
+        alumnus = get_user_by_email('robby2@mail.com')
+        client = current_app.test_client()
+        headers = {'Authorization': f"Bearer {create_access_token(identity=alumnus.login_email)}"}
+
+        def render_dashboard():
+            # Start from an empty identity map so that lazy loads would really hit the database
+            db.session.expunge_all()
+            with count_queries(db.engine) as statements:
+                response = client.get('/app', headers=headers)
+            assert response.status_code == 200
+            return len(statements)
+
+        baseline = render_dashboard()
+
+        # More saved listings and applications must not cost more queries (these listings are
+        # unpublished, so they are not already loaded by the job cards)
+        jobs = [
+            add_job_listing(company.id, f'Dashboard listing {n}', 'Full-time', 'Dashboard', 5000, False, 'Arima')
+            for n in range(3)
+        ]
+        for job in jobs:
+            add_saved_job_listing(alumnus.id, job.id)
+            db.session.add(JobApplication(alumnus.id, job.id, 'resumes/resume.pdf', 2))
+        db.session.commit()
+        job_ids = [job.id for job in jobs]
+
+        assert render_dashboard() == baseline
+
+        Admin = get_user_by_email('bob2@mail.com')
+        for job_id in job_ids:
+            delete_job_listing(job_id, Admin.id)
+
+
     def test_get_approved_listings(self):
         company2 = get_user_by_email('company10@mail.com')
         job = add_job_listing(
@@ -336,6 +654,223 @@ class UserIntegrationTests(unittest.TestCase):
         add_company_subscription(user.id,company2.id)
         assert get_company_subscriptions_by_alumnus_id (1,True) == [{'alumnus_id': {1}, 'company_id': {1}}]
 
+    def test_subscribe_notification_fan_out(self):
+        company2 = get_user_by_email('company10@mail.com')
+        user = get_user_by_email('robby2@mail.com')
+
+        unread_count = get_unread_notification_count(user)
+
+        # Subscribers are resolved with one query, then notified with one bulk insert and one counter update
+        with count_queries(db.engine) as statements:
+            future = queue_subscribed_alumni_notifications('Fan-out listing posted!', company2.id)
+        assert future.result() == 'Fan-out listing posted!'
+        assert len(statements) == 3
+
+        notifications = Notification.query.filter_by(message='Fan-out listing posted!').all()
+        assert [n.alumnus_id for n in notifications] == [user.id]
+        assert notifications[0].reviewed_by_user is False
+
+        # The unread counter follows new and reviewed notifications, and agrees with a full recount
+        client = current_app.test_client()
+        headers = {'Authorization': f"Bearer {create_access_token(identity=user.login_email)}"}
+        response = client.get('/check_alumnus_unread_notifications', headers=headers)
+        assert response.get_json() == {'has_new_notifications': True, 'unread_count': unread_count + 1}
+
+        mark_notification_as_reviewed(notifications[0].id)
+        assert get_unread_notification_count(user) == unread_count
+        assert recount_unread_notifications() == 0
+
+    def test_subscribe_notification_pages(self):
+        company2 = get_user_by_email('company10@mail.com')
+        alumnus = get_user_by_email('robby2@mail.com')
+        mark_notifications_as_reviewed(company2, [n.id for n in get_unread_notifications_by_account(company2)])
+        for n in range(3):
+            notify_company_account(f'Paged notification {n}', company2.id)
+
+        first_page = get_unread_notifications_by_account(company2, limit=2)
+        assert [n.message for n in first_page] == ['Paged notification 2', 'Paged notification 1']
+        second_page = get_unread_notifications_by_account(company2, True, 2, get_next_cursor(first_page, 2))
+        assert [n['message'] for n in second_page] == ['Paged notification 0']
+
+        # Only the account's own notifications are marked
+        assert mark_notifications_as_reviewed(alumnus, [second_page[0]['id']]) == 0
+        assert mark_notifications_as_reviewed(company2, [second_page[0]['id']]) == 1
+
+        # Everything up to the newest notification on the page is marked in one request
+        client = current_app.test_client()
+        headers = {'Authorization': f"Bearer {create_access_token(identity=company2.login_email)}"}
+        response = client.post('/update/company/notification_status', headers=headers, json={
+            'through': encode_cursor(first_page[0].created_at, first_page[0].id)
+        })
+        assert response.get_json() == {'success': True, 'updated': 2}
+        assert get_unread_notification_count(company2) == 0
+        assert recount_unread_notifications() == 0
+
+    def test_subscribe_notification_retention(self):
+        company2 = get_user_by_email('company10@mail.com')
+
+        def add_old_reviewed_notifications(*messages):
+            for message in messages:
+                notify_company_account(message, company2.id)
+            ids = [n.id for n in get_unread_notifications_by_account(company2)]
+            mark_notifications_as_reviewed(company2, ids)
+            db.session.execute(
+                update(Notification).where(Notification.id.in_(ids))
+                .values(created_at=datetime.utcnow() - timedelta(days=100))
+            )
+            db.session.commit()
+
+        # Duplicates collapse into one digest, across batches and across runs
+        add_old_reviewed_notifications('Listing republished', 'Listing republished', 'Listing republished', 'Other')
+        assert archive_reviewed_notifications(older_than_days=30, batch_size=2) == 4
+        add_old_reviewed_notifications('Listing republished')
+        assert archive_reviewed_notifications(older_than_days=30) == 1
+        assert archive_reviewed_notifications(older_than_days=30) == 0
+
+        digest = NotificationArchiveEntry.query.filter_by(
+            recipient_type='company', recipient_id=company2.id, message='Listing republished'
+        ).one()
+        assert digest.occurrences == 4
+        assert Notification.query.filter_by(company_id=company2.id, message='Listing republished').count() == 0
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'archive.jsonl')
+            add_old_reviewed_notifications('Archived to a file', 'Archived to a file')
+            assert archive_reviewed_notifications(older_than_days=30, path=path) == 2
+            with open(path) as archive_file:
+                entries = [json.loads(line) for line in archive_file]
+        assert [(e['message'], e['occurrences']) for e in entries] == [('Archived to a file', 2)]
+        assert recount_unread_notifications() == 0
+
+    def test_subscribe_notification_stream(self):
+        company2 = get_user_by_email('company10@mail.com')
+
+        # Committing a notification wakes its recipient's open streams
+        subscription = get_pubsub().subscribe(get_notification_channel(CompanyAccount, company2.id))
+        try:
+            notify_company_account('Streamed notification', company2.id)
+            assert subscription.wait(0)
+        finally:
+            subscription.close()
+        notification = Notification.query.filter_by(message='Streamed notification').one()
+
+        # Reconnecting clients get everything after their Last-Event-ID replayed
+        client = current_app.test_client()
+        headers = {
+            'Authorization': f"Bearer {create_access_token(identity=company2.login_email)}",
+            'Last-Event-ID': str(notification.id - 1)
+        }
+        current_app.config['NOTIFICATION_STREAM_MAX_SECONDS'] = 0
+        try:
+            response = client.get('/company_notifications/stream', headers=headers)
+        finally:
+            current_app.config['NOTIFICATION_STREAM_MAX_SECONDS'] = 300
+
+        assert response.mimetype == 'text/event-stream'
+        events = response.get_data(as_text=True).split('\n\n')
+        assert events[0] == 'retry: 5000'
+        assert events[1].startswith(f'id: {notification.id}\nevent: notification\ndata: ')
+        assert json.loads(events[1].split('data: ', 1)[1])['message'] == 'Streamed notification'
+
+        # New connections only receive notifications created after they connected
+        assert list(stream_notification_events(company2, max_seconds=0)) == ['retry: 5000\n\n']
+
+    def test_subscribe_publish_digests(self):
+        company2 = get_user_by_email('company10@mail.com')
+        user = get_user_by_email('robby2@mail.com')
+        Admin = get_user_by_email('bob2@mail.com')
+        first = add_job_listing(company2.id, 'Digest listing A', 'Full-time', 'Digest', 5000, False, 'Arima')
+        second = add_job_listing(company2.id, 'Digest listing B', 'Full-time', 'Digest', 5000, False, 'Arima')
+        client = current_app.test_client()
+        headers = {'Authorization': f"Bearer {create_access_token(identity=Admin.login_email)}"}
+        unread = get_unread_notification_count(user)
+
+        # Subscribers' events are buffered once each; the company still hears about every event right away
+        RecordingSMTP.sent_messages.clear()
+        current_app.config['NOTIFICATION_DIGEST_WINDOW_SECONDS'] = 60
+        try:
+            assert client.post(f'/publish_job/{first.id}', headers=headers).status_code == 302
+            assert client.post(f'/publish_job/{second.id}', headers=headers).status_code == 302
+            assert client.post(f'/delete_listing/{first.id}', headers=headers).status_code == 302
+        finally:
+            current_app.config['NOTIFICATION_DIGEST_WINDOW_SECONDS'] = 0
+
+        assert {msg['To'] for msg in RecordingSMTP.sent_messages} == {'company10@mail.com'}
+        assert PendingListingEvent.query.count() == 3
+        assert get_unread_notification_count(user) == unread
+
+        # One notification and one email per subscriber, covering every event
+        RecordingSMTP.sent_messages.clear()
+        assert flush_listing_digests() == len(get_subscribed_alumni_by_company_id(company2.id))
+        assert flush_listing_digests() == 0
+        assert PendingListingEvent.query.count() == 0
+        assert get_unread_notification_count(user) == unread + 1
+        assert get_unread_notifications_by_account(user)[0].message.startswith('3 updates from companies you follow:')
+
+        email = next(msg for msg in RecordingSMTP.sent_messages if msg['To'] == 'robby2@mail.com')
+        assert email['Subject'] == '3 Job Listing Updates From Companies You Follow'
+        body = email.get_body(('plain',)).get_content()
+        assert body.index('New listing: Digest listing A') < body.index('Deleted: Digest listing A')
+        assert 'New listing: Digest listing B' in body
+        assert recount_unread_notifications() == 0
+
+    def test_subscribe_publish_emails(self):
+        company2 = get_user_by_email('company10@mail.com')
+        Admin = get_user_by_email('bob2@mail.com')
+        job = add_job_listing(company2.id, 'Emailed listing', 'Full-time', 'Outbox', 5000, False, 'Arima')
+        client = current_app.test_client()
+        headers = {'Authorization': f"Bearer {create_access_token(identity=Admin.login_email)}"}
+
+        # The company and its subscriber are emailed through the outbox; refused recipients are retried later
+        RecordingSMTP.sent_messages.clear()
+        RecordingSMTP.rejected_recipients.add('robby2@mail.com')
+        try:
+            assert client.post(f'/publish_job/{job.id}', headers=headers).status_code == 302
+        finally:
+            RecordingSMTP.rejected_recipients.clear()
+
+        assert [msg['To'] for msg in RecordingSMTP.sent_messages] == ['company10@mail.com']
+        assert 'now live on the job board' in RecordingSMTP.sent_messages[0].get_body(('plain',)).get_content()
+        retry = EmailOutboxMessage.query.filter_by(recipient_email='robby2@mail.com', status='PENDING').one()
+        assert retry.attempts == 1 and retry.subject == 'New Job Listing: Emailed listing'
+
+        # Templates rendered once per event are filled in exactly as a per-recipient render would be
+        user = get_user_by_email('robby2@mail.com')
+        with current_app.test_request_context():
+            assert retry.html_content == render_template(
+                'emails/job_published.html.j2', recipient_name=f"{user.first_name} {user.last_name}",
+                is_company=False, job_title=job.title, company_name=company2.registered_name,
+                job_location=job.job_site_address, job_url=url_for('alumnus_views.view_listing_page', id=job.id, _external=True)
+            )
+
+        # Not due yet, until the backoff has passed
+        assert dispatch_email_outbox() == 0
+        retry.next_attempt_at = retry.created_at
+        db.session.commit()
+        assert dispatch_email_outbox() == 1
+        assert RecordingSMTP.sent_messages[-1]['To'] == 'robby2@mail.com'
+
+        assert client.post(f'/delete_listing/{job.id}', headers=headers).status_code == 302
+        assert [msg['Subject'] for msg in RecordingSMTP.sent_messages[-2:]] == [
+            'Your Listing Has Been Deleted: Emailed listing', 'Job Listing Deleted: Emailed listing'
+        ]
+
+        # A message that cannot be built fails alone, and the rest of its batch is still sent
+        broken = EmailOutboxMessage('robby2@mail.com', 'Broken\r\nBcc: everyone@mail.com', 'Body')
+        valid = EmailOutboxMessage('robby2@mail.com', 'Valid', 'Body')
+        db.session.add_all([broken, valid])
+        db.session.commit()
+        assert dispatch_email_outbox() == 1
+        assert (broken.status, broken.attempts, valid.status) == ('PENDING', 1, 'SENT')
+
+        # Re-claiming an abandoned delivery counts as an attempt, up to EMAIL_MAX_ATTEMPTS
+        broken.status, broken.claimed_at = 'SENDING', datetime.utcnow() - timedelta(days=1)
+        broken.attempts = current_app.config['EMAIL_MAX_ATTEMPTS'] - 1
+        db.session.commit()
+        assert dispatch_email_outbox() == 0
+        db.session.refresh(broken)
+        assert (broken.status, broken.attempts) == ('FAILED', current_app.config['EMAIL_MAX_ATTEMPTS'])
+
     def test_sva_delete_subscription_invalid(self):
         company2ID = 9
         userID = 9
@@ -373,6 +908,397 @@ class UserIntegrationTests(unittest.TestCase):
         assert delete_job_listing(listing.id,Admin.id) == True
 
 
+    def test_profile_image_pipeline(self):
+        alumnus = get_user_by_email('robby2@mail.com')
+        original_photo = alumnus.profile_photo_file_path
+        client = current_app.test_client()
+        headers = {'Authorization': f"Bearer {create_access_token(identity=alumnus.login_email)}"}
+        # A 1x1 PNG
+        png = base64.b64decode(
+            'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=='
+        )
+
+        static_folder = current_app.static_folder
+        with tempfile.TemporaryDirectory() as directory:
+            current_app.static_folder = directory
+            try:
+                response = client.post(f'/update_profile_photo/{alumnus.id}', headers=headers, data={
+                    'profile_pic': (io.BytesIO(png), 'me.png')
+                })
+                assert response.status_code == 302
+
+                # Stored under a content-hashed name, with a thumbnail when Pillow is available
+                path = get_user_by_email('robby2@mail.com').profile_photo_file_path
+                assert re.match(r'^profile-images/[0-9a-f]{16}(-original\.png|\.webp)$', path)
+                assert os.path.exists(os.path.join(directory, *get_thumbnail_path(path).split('/')))
+
+                response = client.get(f'/static/{path}')
+                assert response.status_code == 200
+                assert response.cache_control.immutable and response.cache_control.max_age == 31536000
+                assert 'immutable' not in client.get('/static/profile-images/anonymous-profile.png').headers.get(
+                    'Cache-Control', ''
+                )
+                response.close()
+
+                with pytest.raises(ValueError):
+                    save_profile_image(FileStorage(io.BytesIO(b'<svg onload="alert(1)"/>'), filename='logo.svg'))
+            finally:
+                current_app.static_folder = static_folder
+                update_alumnus_account_profile_photo(alumnus.id, original_photo)
+
+        assert get_thumbnail_path('profile-images/0123456789abcdef.webp') == 'profile-images/0123456789abcdef-thumb.webp'
+        assert get_thumbnail_path('profile-images/c_logo.jpg') == 'profile-images/c_logo.jpg'
+
+    def test_request_profiling(self):
+        alumnus = get_user_by_email('robby2@mail.com')
+        client = current_app.test_client()
+        headers = {'Authorization': f"Bearer {create_access_token(identity=alumnus.login_email)}"}
+        assert get_statement_shape("SELECT * FROM t WHERE id IN (?, ?, ?) AND name = 'x''s'\n LIMIT 5") == \
+            "SELECT * FROM t WHERE id IN (?) AND name = ? LIMIT ?"
+
+        config = current_app.config
+        original = {key: config[key] for key in ('REQUEST_PROFILING_SERVER_TIMING', 'SLOW_REQUEST_MS', 'REQUEST_PROFILER')}
+        profiles = tempfile.mkdtemp()
+        try:
+            config.update(REQUEST_PROFILING_SERVER_TIMING=True, SLOW_REQUEST_MS=0, REQUEST_PROFILER='header',
+                          REQUEST_PROFILER_DIR=profiles)
+
+            # Every request is timed, and the slow ones are logged as JSON
+            with self.assertLogs(PROFILING_LOGGER, 'WARNING') as logs, count_queries(db.engine) as statements:
+                response = client.get('/app', headers=headers)
+            assert response.status_code == 200 and not os.listdir(profiles)
+            timing = response.headers['Server-Timing']
+            assert f'desc="{len(statements)} queries"' in timing and 'tpl;dur=' in timing
+            record = json.loads(logs.records[-1].getMessage())
+            assert record['event'] == 'slow_request' and record['endpoint'] == 'index_views.index_page'
+            assert record['status'] == 200 and record['query_count'] == len(statements) and record['template_ms'] > 0
+
+            # Profiler reports are written for requests that ask for them
+            client.get('/app', headers={**headers, 'X-Profile': '1'})
+            assert [name for name in os.listdir(profiles) if name.endswith(('.prof', '.html'))]
+
+            # The same statement run again and again is flagged, even in a fast request
+            config['SLOW_REQUEST_MS'] = 60000
+            with current_app.test_request_context('/probe'):
+                current_app.preprocess_request()
+                # A failed statement is not timed, and leaves nothing behind on its connection
+                with pytest.raises(SQLAlchemyError):
+                    db.session.execute(text('SELECT * FROM no_such_table'))
+                assert not [key for key in db.session.connection().info if 'profiling' in str(key)]
+                db.session.rollback()
+                for listing_id in range(1, 7):
+                    db.session.execute(select(JobListing.title).where(JobListing.id == listing_id))
+                assert get_request_profile().query_count == 6
+                with self.assertLogs(PROFILING_LOGGER, 'WARNING') as logs:
+                    current_app.process_response(current_app.response_class('probe'))
+            record = json.loads(logs.records[-1].getMessage())
+            assert record['event'] == 'repeated_statements' and list(record['repeated_statements'].values()) == [6]
+        finally:
+            config.update(original)
+            config['REQUEST_PROFILER_DIR'] = None
+            shutil.rmtree(profiles)
+
+    def test_resume_storage(self):
+        alumnus = get_user_by_email('robby2@mail.com')
+        company = get_user_by_email('company10@mail.com')
+        Admin = get_user_by_email('bob2@mail.com')
+        jobs = [
+            add_job_listing(company.id, f'Resume listing {n}', 'Full-time', 'Resumes', 5000, False, 'Arima')
+            for n in range(2)
+        ]
+        client = current_app.test_client()
+        headers = {'Authorization': f"Bearer {create_access_token(identity=alumnus.login_email)}"}
+        content = b'%PDF-1.4 the same resume every time'
+        content_hash = hashlib.sha256(content).hexdigest()
+
+        static_folder = current_app.static_folder
+        with tempfile.TemporaryDirectory() as directory:
+            current_app.static_folder = directory
+            try:
+                # The same file uploaded twice, under different names, is stored once
+                for job, filename in zip(jobs, ['resume.pdf', 'my CV.PDF']):
+                    response = client.post(f'/apply_to_listing/{job.id}', headers=headers, data={
+                        'work-experience': '2', 'resume': (io.BytesIO(content), filename)
+                    })
+                    assert response.status_code == 302
+
+                path = f'uploads/resumes/{content_hash[:2]}/{content_hash}.pdf'
+                assert {a.resume_file_path for a in JobApplication.query.filter_by(alumnus_id=alumnus.id)
+                        if a.job_listing_id in (jobs[0].id, jobs[1].id)} == {path}
+                assert db.session.get(ResumeBlob, content_hash).ref_count == 2
+                assert os.listdir(os.path.join(directory, 'uploads', 'resumes', content_hash[:2])) == [f'{content_hash}.pdf']
+
+                with pytest.raises(ValueError):
+                    store_resume(FileStorage(io.BytesIO(b''), filename='empty.pdf'))
+
+                # Files are only collected once no application uses them
+                delete_job_listing(jobs[0].id, Admin.id)
+                assert db.session.get(ResumeBlob, content_hash).ref_count == 1
+                assert collect_unused_resumes(grace_seconds=0) == 0
+                delete_job_listing(jobs[1].id, Admin.id)
+                assert collect_unused_resumes(grace_seconds=0) == 1
+                assert db.session.get(ResumeBlob, content_hash) is None
+                assert not os.path.exists(os.path.join(directory, *path.split('/')))
+            finally:
+                current_app.static_folder = static_folder
+
+    def test_search_response_cache(self):
+        with shared_response_cache() as cache:
+            company = get_user_by_email('company10@mail.com')
+            Admin = get_user_by_email('bob2@mail.com')
+            job = add_job_listing(company.id, 'Cacheable listing', 'Full-time', 'Cached', 5000, False, 'Arima')
+            approve_job_listing(job.id)
+            client = current_app.test_client()
+
+            def search():
+                response = client.get('/api/search_listings?search=Cacheable')
+                assert response.status_code == 200
+                return response.headers['X-Cache'], [listing['title'] for listing in response.get_json()]
+
+            assert search() == ('MISS', ['Cacheable listing'])
+            assert search() == ('HIT', ['Cacheable listing'])
+            assert client.get('/api/search_listings?search=Cacheable&limit=5').headers['X-Cache'] == 'MISS'
+
+            # Listing and company changes invalidate the cached searches
+            update_job_listing(job.id, title='Cacheable renamed listing')
+            assert search() == ('MISS', ['Cacheable renamed listing'])
+            original_name = company.registered_name
+            update_company_registered_name(company.id, 'Cacheable Company')
+            response = client.get('/api/search_listings?search=Cacheable')
+            assert response.headers['X-Cache'] == 'MISS' and response.get_json()[0]['company_name'] == 'Cacheable Company'
+            update_company_registered_name(company.id, original_name)
+
+            # An invalidation by another worker, through the shared backend, reaches this one
+            other_worker = ResponseCache(300, 16, SQLiteCacheBackend(cache.shared.path, 16))
+            key = cache.make_key([LISTINGS_NAMESPACE], 'search')
+            other_worker.invalidate([LISTINGS_NAMESPACE])
+            assert cache.make_key([LISTINGS_NAMESPACE], 'search') != key
+
+            delete_job_listing(job.id, Admin.id)
+            assert search() == ('MISS', [])
+
+    def test_static_asset_fingerprinting(self):
+        client = current_app.test_client()
+        with current_app.test_request_context():
+            style_url = url_for('static', filename='style.css')
+            photo_url = url_for('static', filename='profile-images/anonymous-profile.png')
+        assert re.match(r'^/static/style\.[0-9a-f]{16}\.css$', style_url)
+        # User uploads are not part of the manifest
+        assert photo_url == '/static/profile-images/anonymous-profile.png'
+
+        response = client.get(style_url)
+        assert response.status_code == 200
+        assert response.cache_control.immutable and response.cache_control.max_age == 31536000
+        assert response.headers.get('ETag') and 'Accept-Encoding' in response.vary
+        with open(os.path.join(current_app.static_folder, 'style.css'), 'rb') as style_file:
+            content = style_file.read()
+        assert response.data == content
+        response.close()
+
+        # Served precompressed, and revalidated without a body
+        response = client.get(style_url, headers={'Accept-Encoding': 'gzip'})
+        assert response.content_encoding == 'gzip'
+        assert gzip.decompress(response.data) == content
+        response = client.get(style_url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+        assert response.status_code == 304 and not response.data
+
+        # The original path still works, with the default revalidation
+        response = client.get('/static/style.css')
+        assert response.status_code == 200 and not response.cache_control.immutable
+        response.close()
+
+    def test_template_fragment_cache(self):
+        company = get_user_by_email('company10@mail.com')
+        Admin = get_user_by_email('bob2@mail.com')
+        job = add_job_listing(company.id, 'Fragment listing', 'Full-time', 'Fragments', 5000, False, 'Arima')
+        assert current_app.jinja_env.fragment_cache is not None and not current_app.jinja_env.auto_reload
+        template = (
+            "{% cache 'test_job_card', job.id, job.datetime_last_modified, "
+            "company_generations([job]).get(job.company_id) %}"
+            "{{ job.title }} at {{ job.company.registered_name }}{% endcache %}"
+        )
+
+        def render(listing):
+            with current_app.test_request_context():
+                return render_template_string(template, job=listing)
+
+        same_key = SimpleNamespace(
+            id=job.id, datetime_last_modified=job.datetime_last_modified, company_id=job.company_id,
+            title='Never rendered', company=company
+        )
+        with shared_response_cache():
+            assert render(job) == f'Fragment listing at {company.registered_name}'
+            # Rendered from the cache while the key is the same
+            assert render(same_key) == f'Fragment listing at {company.registered_name}'
+
+            # Updating the listing, or its company, changes the key
+            job = update_job_listing(job.id, title='Updated fragment listing')
+            assert render(job) == f'Updated fragment listing at {company.registered_name}'
+            original_name = company.registered_name
+            update_company_registered_name(company.id, 'Fragment Company')
+            assert render(job) == 'Updated fragment listing at Fragment Company'
+            update_company_registered_name(company.id, original_name)
+
+        # Without generations shared by every worker (the memory backend), company fragments are always rendered
+        assert render(job) == f'Updated fragment listing at {company.registered_name}'
+        same_key.title = 'Rendered again'
+        assert render(same_key) == f'Rendered again at {company.registered_name}'
+
+        delete_job_listing(job.id, Admin.id)
+
+    def test_search_listings_by_term(self):
+        company = get_user_by_email('company10@mail.com')
+        title_match = add_job_listing(
+            company.id,
+            'Python Developer',
+            'Full-time',
+            'Build internal tools',
+            9000,
+            False,
+            'Curepe'
+        )
+        description_match = add_job_listing(
+            company.id,
+            'Data Analyst',
+            'Full-time',
+            'Some python scripting required',
+            9000,
+            False,
+            'Curepe'
+        )
+
+        results = filter_query_by_search_term(JobListing.query, 'pyth').all()
+        assert [job.id for job in results] == [title_match.id, description_match.id]
+
+        # Company names are searchable too
+        results = filter_query_by_search_term(JobListing.query, 'company10 develop').all()
+        assert [job.id for job in results] == [title_match.id]
+
+        # A term without words is matched literally instead of matching everything
+        assert filter_query_by_search_term(JobListing.query, '!!!').all() == []
+        assert filter_query_by_search_term(JobListing.query, '   ').count() == JobListing.query.count()
+
+        Admin = get_user_by_email('bob2@mail.com')
+        delete_job_listing(title_match.id, Admin.id)
+        delete_job_listing(description_match.id, Admin.id)
+        assert filter_query_by_search_term(JobListing.query, 'python').all() == []
+
+
+    def test_search_listings_in_memory_index(self):
+        company = get_user_by_email('company10@mail.com')
+        developer = add_job_listing(
+            company.id,
+            'Software Developer',
+            'Full-time',
+            'Maintain the job board',
+            9000,
+            False,
+            'Curepe'
+        )
+        analyst = add_job_listing(
+            company.id,
+            'Data Analyst',
+            'Part-time',
+            'Build developer dashboards',
+            7000,
+            False,
+            'Curepe'
+        )
+
+        index = ListingSearchIndex()
+        index.build([developer, analyst])
+
+        # Substring and typo-tolerant matches, with title matches ranked first
+        assert [doc['id'] for doc in index.search('velop')] == [developer.id, analyst.id]
+        assert [doc['id'] for doc in index.search('devloper')] == [developer.id, analyst.id]
+        assert [doc['id'] for doc in index.search('developer', position_type='Part-time')] == [analyst.id]
+        assert index.search('developer', min_salary=8000, max_salary=10000)[0]['company_name'] == company.registered_name
+
+        assert index.search('!!!') == []
+        assert len(index.search('')) == 2
+
+        index.remove(developer.id)
+        assert [doc['id'] for doc in index.search('velop')] == [analyst.id]
+
+        # Indexed results show a company's current name, even when another worker changed it; with
+        # generations shared by every worker, company changes also make the index inconsistent
+        approve_job_listing(analyst.id)
+        refresh_listing_search_index()
+        # Single-field updates reach this worker's index at once, without a rebuild
+        update_job_listing_title(analyst.id, 'Data Scientist')
+        assert [doc['title'] for doc in listing_search_index.search('scientist')] == ['Data Scientist']
+        assert listing_search_index.is_consistent()
+        original_name = company.registered_name
+        db.session.execute(
+            update(CompanyAccount).where(CompanyAccount.id == company.id).values(registered_name='Renamed elsewhere')
+        )
+        db.session.commit()
+        assert listing_search_index.check_consistency(0)
+        response = current_app.test_client().get('/api/search_listings?search=dashboards')
+        assert [job['company_name'] for job in response.get_json()] == ['Renamed elsewhere']
+        with shared_response_cache():
+            refresh_listing_search_index()
+            assert listing_search_index.is_consistent()
+            update_company_registered_name(company.id, original_name)
+            assert not listing_search_index.is_consistent()
+        # The database search rebuilds the index on the background worker pool (inline under TESTING)
+        listing_search_index.is_warm = False
+        assert current_app.test_client().get('/api/search_listings?search=dashboard').status_code == 200
+        assert listing_search_index.is_warm and listing_search_index.is_consistent()
+        assert queue_listing_search_index_refresh()
+
+        Admin = get_user_by_email('bob2@mail.com')
+        delete_job_listing(developer.id, Admin.id)
+        delete_job_listing(analyst.id, Admin.id)
+
+
+    def test_paginate_approved_listings(self):
+        company = get_user_by_email('company10@mail.com')
+        jobs = [
+            add_job_listing(company.id, f'Paged listing {n}', 'Full-time', 'Paged', 5000, False, 'Arima')
+            for n in range(3)
+        ]
+        for job in jobs:
+            toggle_listing_approval(job.id, "APPROVED")
+
+        # Newest first, and the next page picks up exactly where the previous one ended
+        first_page = get_approved_listings(limit=2)
+        assert [job.id for job in first_page] == [jobs[2].id, jobs[1].id]
+
+        second_page = get_approved_listings(True, limit=2, after=get_next_cursor(first_page, 2))
+        assert second_page[0]['id'] == jobs[0].id
+
+        with pytest.raises(ValueError):
+            get_approved_listings(limit=2, after='not-a-cursor')
+
+        # Searches by term are paged through too, from the in-memory index or the database
+        client = current_app.test_client()
+
+        def search_all(term):
+            pages, query = [], {'search': term, 'limit': 2}
+            while True:
+                response = client.get('/api/search_listings', query_string=query)
+                assert response.status_code == 200
+                pages.append([job['id'] for job in response.get_json()])
+                if 'X-Next-Cursor' not in response.headers:
+                    return pages
+                query['after'] = response.headers['X-Next-Cursor']
+
+        expected = sorted(job.id for job in jobs)
+        pages = search_all('Paged')
+        assert len(pages[0]) == 2 and sorted(sum(pages, [])) == expected
+        current_app.config['LISTING_SEARCH_INDEX_ENABLED'] = False
+        try:
+            pages = search_all('paged listing')
+            assert len(pages[0]) == 2 and sorted(sum(pages, [])) == expected
+        finally:
+            current_app.config['LISTING_SEARCH_INDEX_ENABLED'] = True
+        assert client.get('/api/search_listings?search=Paged&after=not-a-cursor').status_code == 400
+
+        Admin = get_user_by_email('bob2@mail.com')
+        for job in jobs:
+            delete_job_listing(job.id, Admin.id)
+
 
     # def test_zz_apply(self):
     #     company2 = get_user_by_email('company10@mail.com')
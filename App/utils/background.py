@@ -0,0 +1,100 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from flask import Flask, current_app
+
+from App.database import db
+
+"""
+====== BACKGROUND TASKS ======
+
+Work that does not need to finish before a response is sent (e.g. notifying thousands of
+subscribers) is handed to a small per-worker thread pool (BACKGROUND_WORKERS threads):
+    - each task runs inside its own application context, so it gets its own database session;
+    - a failed task is rolled back and logged, never raised into the request that queued it;
+    - tasks run synchronously, in the caller's context, when TESTING or BACKGROUND_TASKS_SYNCHRONOUS is set;
+    - periodic tasks (e.g. archiving old notifications) are queued by a timer per worker, and are not
+      scheduled at all under TESTING or BACKGROUND_TASKS_SYNCHRONOUS.
+"""
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="background")
+        return _executor
+
+
+def _run_in_app_context(app: Flask, func: Callable, *args, **kwargs):
+    with app.app_context():
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            db.session.rollback()
+            app.logger.exception("Background task %s failed", getattr(func, "__name__", func))
+            raise
+        finally:
+            db.session.remove()
+
+
+def submit_background_task(func: Callable, *args, **kwargs) -> Future:
+    """
+    Runs a function off the request path on the background worker pool.
+
+    Args:
+        func (Callable): The function to run. It is called with the given arguments, which should be
+            plain values (e.g. IDs) rather than ORM instances bound to the caller's session.
+
+    Returns:
+        Future: The task's future, whose result is the function's return value.
+    """
+    app = current_app._get_current_object()
+
+    if app.testing or app.config.get("BACKGROUND_TASKS_SYNCHRONOUS"):
+        future = Future()
+        try:
+            future.set_result(func(*args, **kwargs))
+        except Exception as e:
+            db.session.rollback()
+            app.logger.exception("Background task %s failed", getattr(func, "__name__", func))
+            future.set_exception(e)
+        return future
+
+    executor = _get_executor(app.config.get("BACKGROUND_WORKERS", 4))
+    return executor.submit(_run_in_app_context, app, func, *args, **kwargs)
+
+
+def schedule_periodic_task(app: Flask, interval_seconds: float, func: Callable, *args, **kwargs) -> None:
+    """
+    Queues a function on the background worker pool every `interval_seconds`, first after one interval.
+    Every worker process runs its own schedule, so the function must be safe to run concurrently.
+
+    Args:
+        app (Flask): The application.
+        interval_seconds (float): Seconds between runs. 0 (or less) disables the schedule.
+        func (Callable): The function to run, with the given arguments.
+    """
+    if not interval_seconds or interval_seconds <= 0:
+        return
+    if app.testing or app.config.get("BACKGROUND_TASKS_SYNCHRONOUS"):
+        return
+
+    def run_and_reschedule():
+        try:
+            with app.app_context():
+                submit_background_task(func, *args, **kwargs)
+        finally:
+            _start_timer()
+
+    def _start_timer():
+        timer = threading.Timer(interval_seconds, run_and_reschedule)
+        timer.name = f"schedule-{getattr(func, '__name__', 'task')}"
+        timer.daemon = True
+        timer.start()
+
+    _start_timer()
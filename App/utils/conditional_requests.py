@@ -0,0 +1,79 @@
+import hashlib
+from functools import wraps
+from typing import Callable, Optional
+
+from flask import current_app, request, session
+from flask_jwt_extended import get_jwt
+
+"""
+====== CONDITIONAL REQUESTS ======
+
+Pages and APIs that are requested again and again while they rarely change (a listing's page, a company's
+listings, searches) answer revalidations with 304 Not Modified instead of querying and rendering again:
+    - a view's validators (see App/controllers/listing_validators.py) are computed with one cheap aggregate
+      query, before the view runs, and hashed into a weak ETag together with the user's identity;
+    - a request whose If-None-Match holds that ETag gets an empty 304, and the view never runs;
+    - otherwise the view runs, and a successful response carries the ETag, the Last-Modified date (when
+      known) and `Cache-Control: private, no-cache`, so browsers keep it but revalidate it every time;
+    - requests with flashed messages waiting to be shown are neither answered with a 304 nor validated.
+
+The 304 decision rests on the ETag alone: a deleted listing changes the ETag (through the listings' count)
+but not the latest modification date, so If-Modified-Since is not trusted to answer it.
+"""
+
+
+def _get_request_identity() -> Optional[str]:
+    try:
+        claims = get_jwt()
+    except RuntimeError:
+        # The view does not require (nor verify) a token
+        return None
+    return f"{claims.get('role')}:{claims.get('sub')}"
+
+
+def conditional_view(get_validators: Callable) -> Callable:
+    """
+    Answers a GET view's revalidations with 304 Not Modified while its validators are unchanged. Place it
+    below `jwt_required` on authenticated views, and above `cached_response`.
+
+    Args:
+        get_validators (Callable): Called with the view's arguments, returns the ETag's parts and the
+            Last-Modified date (or None), or None when the response cannot be validated.
+
+    Returns:
+        Callable: The decorator.
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # A page showing flashed messages is shown once: neither answered with a 304, which would leave
+            # the messages pending, nor validated later, which would show them again from the browser's copy
+            if (request.method != "GET" or not current_app.config.get("CONDITIONAL_REQUESTS", True)
+                    or "_flashes" in session):
+                return view(*args, **kwargs)
+
+            validators = get_validators(*args, **kwargs)
+            if validators is None:
+                return view(*args, **kwargs)
+
+            parts, last_modified = validators
+            etag = hashlib.sha256(repr((request.endpoint, _get_request_identity(), parts)).encode()).hexdigest()[:32]
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            # Weak: the same content may be served compressed or not
+            response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+
+        return wrapper
+
+    return decorator
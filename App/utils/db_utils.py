@@ -1,9 +1,156 @@
+import base64
+import binascii
+import json
 import re
-from typing import List, Union
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+from flask import Response, current_app, stream_with_context
+from sqlalchemy import and_, event, or_
 from sqlalchemy.orm import Query
 
+# Rows fetched from the database at a time when serializing a query's results
+JSON_PROJECTION_BATCH_SIZE = 1000
 
-def get_records_by_filter(filter_func, jsonify_results: bool = False) -> Union[List[object], List[dict]]:
+
+def encode_cursor(datetime_created: datetime, id: int) -> str:
+    """
+    Encodes the position of a record as an opaque pagination cursor.
+
+    Args:
+        datetime_created (datetime): When the record was created.
+        id (int): The record's ID.
+
+    Returns:
+        str: A URL-safe cursor pointing just after the record.
+    """
+    position = f"{datetime_created.isoformat()}|{id}"
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decodes a pagination cursor created by `encode_cursor`.
+
+    Args:
+        cursor (str): The cursor to decode.
+
+    Returns:
+        Tuple[datetime, int]: The creation time and ID of the record the cursor points after.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        datetime_created, id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(datetime_created), int(id)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError(f"Invalid pagination cursor: {cursor}")
+
+
+def encode_rank_cursor(offset: int) -> str:
+    """
+    Encodes the position of a page of ranked results (e.g. a search by term) as an opaque pagination
+    cursor. Ranked results are not ordered by creation time, so their pages are counted instead.
+
+    Args:
+        offset (int): How many ranked results come before the page.
+
+    Returns:
+        str: A URL-safe cursor pointing at the page.
+    """
+    return base64.urlsafe_b64encode(f"rank|{offset}".encode()).decode()
+
+
+def decode_rank_cursor(cursor: str) -> int:
+    """
+    Decodes a pagination cursor created by `encode_rank_cursor`.
+
+    Args:
+        cursor (str): The cursor to decode.
+
+    Returns:
+        int: How many ranked results come before the page.
+
+    Raises:
+        ValueError: If the cursor is malformed, or is not a ranked results cursor.
+    """
+    try:
+        kind, offset = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        offset = int(offset)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError(f"Invalid pagination cursor: {cursor}")
+    if kind != "rank" or offset < 0:
+        raise ValueError(f"Invalid pagination cursor: {cursor}")
+    return offset
+
+
+def get_next_cursor(records: list, limit: Optional[int]) -> Optional[str]:
+    """
+    Gets the cursor of the page following a page of records.
+
+    Args:
+        records (list): The current page, as model objects or JSON dictionaries.
+        limit (int, optional): The page size that was requested.
+
+    Returns:
+        Optional[str]: The cursor of the next page, or None if this is the last page.
+    """
+    if not limit or len(records) < limit:
+        return None
+
+    last = records[-1]
+    if isinstance(last, dict):
+        return encode_cursor(datetime.fromisoformat(last[_get_created_attribute(last)]), last["id"])
+    return encode_cursor(getattr(last, _get_created_attribute(last)), last.id)
+
+
+def _get_created_attribute(model_or_record) -> str:
+    # Most models record their creation time as `datetime_created`, notifications as `created_at`
+    if isinstance(model_or_record, dict):
+        return "datetime_created" if "datetime_created" in model_or_record else "created_at"
+    return "datetime_created" if hasattr(model_or_record, "datetime_created") else "created_at"
+
+
+def paginate_by_keyset(query: Query, limit: Optional[int] = None, after: Optional[str] = None) -> Query:
+    """
+    Orders a query newest first by (datetime_created, id) and restricts it to one page
+    (`created_at` takes the place of `datetime_created` for models such as notifications).
+
+    Unlike OFFSET pagination, the database seeks straight to the cursor, so every page
+    costs the same regardless of how deep into the results it is.
+
+    Args:
+        query (Query): A query over a model with `datetime_created` and `id` columns.
+        limit (int, optional): The maximum number of records to return.
+        after (str, optional): The cursor returned with the previous page.
+
+    Returns:
+        Query: The paginated query.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    model = query.column_descriptions[0]["entity"]
+    created_column = getattr(model, _get_created_attribute(model))
+    query = query.order_by(created_column.desc(), model.id.desc())
+
+    if after:
+        datetime_created, id = decode_cursor(after)
+        query = query.filter(or_(
+            created_column < datetime_created,
+            and_(created_column == datetime_created, model.id < id)
+        ))
+
+    return query.limit(limit) if limit else query
+
+
+def get_records_by_filter(
+        filter_func,
+        jsonify_results: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[str] = None
+) -> Union[List[object], List[dict]]:
     """
     Generic function to search and retrieve records based on a custom filter function.
 
@@ -12,18 +159,168 @@ def get_records_by_filter(filter_func, jsonify_results: bool = False) -> Union[L
         jsonify_results (bool, optional):
             If True, returns the results as JSON-serializable dictionaries.
             Defaults to False, otherwise returns raw model objects.
+        limit (int, optional): If given, returns at most this many records, newest first.
+        after (str, optional): If given, returns the records after this pagination cursor (see `get_next_cursor`).
 
     Returns:
         Union[List[object], List[dict]]: 
             - If `jsonify_results` is False, returns a list of model objects (e.g., JobListing instances).
             - If `jsonify_results` is True, returns a list of dictionaries (JSON format).
+
+    Raises:
+        ValueError: If the pagination cursor is malformed.
     """
     # Apply the filter function and execute the query
     records = filter_func()
 
+    if limit or after:
+        records = paginate_by_keyset(records, limit, after)
+
+    if isinstance(records, Query):
+        if jsonify_results and get_json_projection(records) is not None:
+            return list(iter_json_records(records))
+        records = records.all()
+
     return [record.__json__() for record in records] if jsonify_results else records
 
 
+def get_json_projection(query: Query) -> Optional[Tuple[str, ...]]:
+    """
+    Gets the columns a query's model is serialized from, if the model declares them.
+
+    Models whose `__json__` is a plain copy of some of their columns (datetimes in ISO format) list those
+    columns, in order, as `__json_projection__`; their query results can then be serialized from the
+    selected columns alone (see `iter_json_records`).
+
+    Args:
+        query (Query): A query over a model.
+
+    Returns:
+        Optional[Tuple[str, ...]]: The column attribute names, or None if the model has no projection.
+    """
+    descriptions = query.column_descriptions
+    if len(descriptions) != 1 or descriptions[0]["type"] is not descriptions[0]["entity"]:
+        return None
+    return getattr(descriptions[0]["entity"], "__json_projection__", None)
+
+
+def iter_json_records(query: Query, batch_size: int = JSON_PROJECTION_BATCH_SIZE) -> Iterator[dict]:
+    """
+    Serializes a query's results like the model's `__json__`, straight from the projected columns: no
+    model object is loaded (nor kept in the session's identity map), and rows are fetched in batches.
+
+    Args:
+        query (Query): A query over a model with a `__json_projection__`.
+        batch_size (int, optional): Rows fetched from the database at a time.
+
+    Yields:
+        dict: Each record, as returned by the model's `__json__`.
+
+    Raises:
+        ValueError: If the query's model has no `__json_projection__`.
+    """
+    projection = get_json_projection(query)
+    if projection is None:
+        raise ValueError("The query's model does not declare a __json_projection__.")
+
+    model = query.column_descriptions[0]["entity"]
+    columns = [getattr(model, name) for name in projection]
+    rows = query.enable_eagerloads(False).with_entities(*columns).yield_per(batch_size)
+
+    for row in rows:
+        yield {
+            name: value.isoformat() if isinstance(value, datetime) else value
+            for name, value in zip(projection, row)
+        }
+
+
+def iter_json_array(records: Iterable[dict], records_per_chunk: int = 100) -> Iterator[str]:
+    """
+    Encodes records as a JSON array, a few records at a time, so that large results can be written
+    (or streamed) without building the whole document in memory.
+
+    Args:
+        records (Iterable[dict]): JSON-serializable records, e.g. from `iter_json_records`.
+        records_per_chunk (int, optional): Records encoded per chunk.
+
+    Yields:
+        str: Consecutive chunks of the JSON array.
+    """
+    chunk = ["["]
+    separator = ""
+    for record in records:
+        chunk.append(separator + json.dumps(record))
+        separator = ","
+        if len(chunk) >= records_per_chunk:
+            yield "".join(chunk)
+            chunk = []
+
+    chunk.append("]")
+    yield "".join(chunk)
+
+
+def stream_json_array(records: Iterable[dict]) -> Response:
+    """
+    Builds a response sending records as a JSON array while they are read, e.g. from
+    `iter_json_records(query)`, so that memory use does not grow with the number of records and the
+    first bytes leave before the last row is fetched.
+
+    Args:
+        records (Iterable[dict]): JSON-serializable records, consumed lazily.
+
+    Returns:
+        Response: The streamed `application/json` response.
+    """
+    return current_app.response_class(
+        stream_with_context(iter_json_array(records)),
+        mimetype="application/json",
+        headers={"X-Accel-Buffering": "no"}
+    )
+
+
+def get_pagination_args(args, default_limit: int, max_limit: int) -> Tuple[int, Optional[str]]:
+    """
+    Reads the `limit` and `after` pagination parameters from a request's query string.
+
+    Args:
+        args (MultiDict): The request's query string arguments.
+        default_limit (int): The page size used when none (or an invalid one) is requested.
+        max_limit (int): The largest page size a client may request.
+
+    Returns:
+        Tuple[int, Optional[str]]: The page size and the cursor to start after, if any.
+    """
+    limit = args.get("limit", type=int)
+    if not limit or limit < 1:
+        limit = default_limit
+
+    return min(limit, max_limit), args.get("after") or None
+
+
+@contextmanager
+def count_queries(engine) -> Iterator[List[str]]:
+    """
+    Records every SQL statement executed on an engine within the block (e.g. to assert that a
+    view loads in a constant number of queries).
+
+    Args:
+        engine (Engine): The engine to watch, e.g. `db.engine`.
+
+    Yields:
+        List[str]: The statements executed so far; its length is the query count.
+    """
+    statements = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record_statement)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record_statement)
+
+
 # Email checking function courtesy https://www.geeksforgeeks.org/check-if-email-address-valid-or-not-in-python/
 def validate_email(email: str) -> bool:
     """
@@ -1,14 +1,13 @@
-import os
-import smtplib
-from email.message import EmailMessage
-from flask import render_template, url_for
-from typing import Union
+from flask import current_app, render_template, url_for
+from markupsafe import escape
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
 from App.models import (
     AlumnusAccount,
     CompanyAccount,
     JobListing
 )
+from App.utils.email_outbox import queue_email, queued_emails
 
 LISTING_PAGE_ROUTE = 'alumnus_views.view_listing_page'
 
@@ -19,7 +18,8 @@ LISTING_PAGE_ROUTE = 'alumnus_views.view_listing_page'
 
 def send_email(recipient_email: str, subject: str, template_name: str, **kwargs) -> bool:
     """
-    Sends an email with both plain text and HTML content using Jinja2 templates.
+    Renders an email with both plain text and HTML content using Jinja2 templates and queues it
+    in the outbox, from which the background sender delivers it (see App/utils/email_outbox.py).
 
     Args:
         recipient_email (str): Recipient's email address.
@@ -28,18 +28,9 @@ def send_email(recipient_email: str, subject: str, template_name: str, **kwargs)
         **kwargs: Any additional variables passed into the templates.
 
     Returns:
-        bool: True if email sent successfully, False otherwise.
+        bool: True if the email was queued successfully, False otherwise.
     """
     try:
-        # Load credentials from environment
-        sender_email = os.getenv("GMAIL_SENDER_ADDRESS")
-        sender_password = os.getenv("GMAIL_APPLICATION_PASSWORD")
-
-        if not sender_email or not sender_password:
-            raise EnvironmentError(
-                "Missing GMAIL_SENDER_ADDRESS or GMAIL_APPLICATION_PASSWORD in environment."
-            )
-
         # Render email content from templates
         html_content = render_template(
             f'emails/{template_name}.html.j2', **kwargs
@@ -48,92 +39,292 @@ def send_email(recipient_email: str, subject: str, template_name: str, **kwargs)
             f'emails/{template_name}.txt.j2', **kwargs
         )
 
-        # Create email message object
-        msg = EmailMessage()
-        msg['Subject'] = subject
-        msg['From'] = sender_email
-        msg['To'] = recipient_email
-        msg.set_content(text_content)           # Fallback text
-        msg.add_alternative(html_content, subtype='html')  # HTML part
-
-        # Send using Gmail SMTP
-        with smtplib.SMTP('smtp.gmail.com', 587) as smtp:
-            smtp.starttls()
-            smtp.login(sender_email, sender_password)
-            smtp.send_message(msg)
-
-        print(f"Email sent to {recipient_email}")
+        queue_email(recipient_email, subject, text_content, html_content)
         return True
 
     except Exception as e:
-        print(f"Failed to send email to {recipient_email}: {e}")
+        current_app.logger.error(f"Failed to queue email to {recipient_email}: {e}")
         return False
 
 
 """
-====== HELPERS FOR VARIOUS TEMPLATES ======
+====== PER-EVENT RENDERING ======
 """
 
+# Stands in for `recipient_name` while a template is rendered once for every recipient
+_RECIPIENT_NAME_PLACEHOLDER = "\x00recipient_name\x00"
 
-def send_job_published_email(
-        recipient: Union[CompanyAccount, AlumnusAccount],
+
+class PreparedEmail:
+    """
+    An email whose templates are rendered once and then filled in for each recipient.
+
+    The templates are rendered with a placeholder for `recipient_name` and split around it, so filling
+    in a recipient joins the pre-rendered parts instead of rendering both templates again. Templates
+    that transform the name (e.g. with a filter) are rendered per recipient instead.
+
+    Args:
+        template_name (str): Base filename of the email templates (without extension).
+        subject (str): Subject of the email.
+        **kwargs: The variables shared by every recipient, passed into the templates.
+    """
+
+    def __init__(self, template_name: str, subject: str, **kwargs) -> None:
+        self.template_name = template_name
+        self.subject = subject
+        self._context = kwargs
+        self._text_parts = self._render_parts(f'emails/{template_name}.txt.j2')
+        self._html_parts = self._render_parts(f'emails/{template_name}.html.j2')
+
+    def _render_parts(self, template_path: str) -> Optional[Tuple[List[str], Callable]]:
+        content = render_template(template_path, recipient_name=_RECIPIENT_NAME_PLACEHOLDER, **self._context)
+        parts = content.split(_RECIPIENT_NAME_PLACEHOLDER)
+        if any("\x00" in part for part in parts):
+            return None
+
+        autoescape = current_app.jinja_env.autoescape
+        if callable(autoescape):
+            autoescape = autoescape(template_path)
+        return parts, (escape if autoescape else str)
+
+    def _fill(self, rendered: Optional[Tuple[List[str], Callable]], template_path: str, recipient_name: str) -> str:
+        if rendered is None:
+            return render_template(template_path, recipient_name=recipient_name, **self._context)
+
+        parts, escape_name = rendered
+        return escape_name(recipient_name).join(parts)
+
+    def render(self, recipient_name: str) -> Tuple[str, str]:
+        """
+        Fills in the email for one recipient.
+
+        Args:
+            recipient_name (str): The recipient's name.
+
+        Returns:
+            Tuple[str, str]: The plain text and HTML content.
+        """
+        return (
+            self._fill(self._text_parts, f'emails/{self.template_name}.txt.j2', recipient_name),
+            self._fill(self._html_parts, f'emails/{self.template_name}.html.j2', recipient_name)
+        )
+
+    def queue(self, recipient_email: str, recipient_name: str) -> bool:
+        """
+        Fills in the email for one recipient and queues it in the outbox.
+
+        Args:
+            recipient_email (str): Recipient's email address.
+            recipient_name (str): The recipient's name.
+
+        Returns:
+            bool: True if the email was queued successfully, False otherwise.
+        """
+        try:
+            text_content, html_content = self.render(recipient_name)
+            queue_email(recipient_email, self.subject, text_content, html_content)
+            return True
+
+        except Exception as e:
+            current_app.logger.error(f"Failed to queue email to {recipient_email}: {e}")
+            return False
+
+
+"""
+====== LISTING EVENTS ======
+"""
+
+# Listing event -> (template, subject for the posting company, subject for subscribed alumni)
+LISTING_EVENT_EMAILS = {
+    "published": ("job_published", "Your Job Listing Is Live: {title}", "New Job Listing: {title}"),
+    "unpublished": ("job_unpublished", "Your Job Listing Was Unpublished: {title}", "Job Listing Unpublished: {title}"),
+    "deleted": ("job_deleted", "Your Listing Has Been Deleted: {title}", "Job Listing Deleted: {title}")
+}
+
+
+def _get_recipient_name(recipient: Union[CompanyAccount, AlumnusAccount]) -> str:
+    if isinstance(recipient, CompanyAccount):
+        return recipient.registered_name
+
+    if isinstance(recipient, AlumnusAccount):
+        return f"{recipient.first_name} {recipient.last_name}"
+
+    raise ValueError(
+        "Recipient must be a CompanyAccount or AlumnusAccount.")
+
+
+def send_listing_event_emails(
+        event: str,
+        recipients: Iterable[Union[CompanyAccount, AlumnusAccount]],
         listing: JobListing,
         posting_company: CompanyAccount
-):
+) -> int:
     """
-    Sends an email notification when a job listing is published.
+    Queues a listing event's email for each recipient, written to the outbox in one batch.
 
-    Depending on the recipient type, this function customizes the message:
-    - To the company that posted the job (CompanyAccount), confirming their listing is live.
-    - To subscribed alumni (AlumnusAccount), informing them of the new opportunity.
+    Each template is rendered once per event and type of recipient (the posting company, or subscribed
+    alumni); the listing URL is built once. Only the recipient's name is filled in per recipient.
 
     Args:
-        recipient (Union[CompanyAccount, AlumnusAccount]): The email recipient.
-        listing (JobListing): The job listing that was published.
-        posting_company (CompanyAccount): The company responsible for posting the job.
+        event (str): The listing event. See LISTING_EVENT_EMAILS.
+        recipients (Iterable[Union[CompanyAccount, AlumnusAccount]]): The email recipients.
+        listing (JobListing): The job listing the event happened to.
+        posting_company (CompanyAccount): The company that posted the job.
 
     Returns:
-        bool: True if the email was sent successfully, False otherwise.
+        int: The number of emails queued.
 
     Raises:
-        ValueError: If the recipient is not an instance of CompanyAccount or AlumnusAccount.
+        ValueError: If the event is unknown or a recipient is not a CompanyAccount or AlumnusAccount.
     """
-    try:
-        recipient_name = None
-        subject = None
-
-        if isinstance(recipient, CompanyAccount):
-            recipient_name = recipient.registered_name
-            subject = f"Your Job Listing Is Live: {listing.title}"
-
-        elif isinstance(recipient, AlumnusAccount):
-            recipient_name = f"{recipient.first_name} {recipient.last_name}"
-            subject = f"New Job Listing: {listing.title}"
-        else:
-            raise ValueError(
-                "Recipient must be a CompanyAccount or AlumnusAccount.")
-
-        job_url = url_for(
+    if event not in LISTING_EVENT_EMAILS:
+        raise ValueError(f"Unknown listing event '{event}'.")
+
+    template_name, company_subject, alumnus_subject = LISTING_EVENT_EMAILS[event]
+    shared_context = {
+        "job_title": listing.title,
+        "company_name": posting_company.registered_name,
+        "job_location": listing.job_site_address,
+        "job_url": url_for(
             LISTING_PAGE_ROUTE,
             id=listing.id,
             _external=True
         )
+    }
+
+    prepared_emails: Dict[bool, PreparedEmail] = {}
+    queued = 0
+    with queued_emails():
+        for recipient in recipients:
+            recipient_name = _get_recipient_name(recipient)
+            is_company = isinstance(recipient, CompanyAccount)
 
-        return send_email(
-            recipient_email=recipient.login_email,
-            template_name="job_published",
-            subject=subject,
-            recipient_name=recipient_name,
-            job_title=listing.title,
-            company_name=posting_company.registered_name,
-            job_location=listing.job_site_address,
-            job_url=job_url
+            email = prepared_emails.get(is_company)
+            if email is None:
+                subject = (company_subject if is_company else alumnus_subject).format(title=listing.title)
+                email = prepared_emails[is_company] = PreparedEmail(
+                    template_name, subject, is_company=is_company, **shared_context
+                )
+
+            if email.queue(recipient.login_email, recipient_name):
+                queued += 1
+
+    return queued
+
+
+"""
+====== LISTING DIGESTS ======
+"""
+
+# Listing event -> how the event is listed in a digest email
+LISTING_DIGEST_LABELS = {
+    "published": "New listing",
+    "unpublished": "Temporarily unpublished",
+    "deleted": "Deleted"
+}
+
+
+def _prepare_digest_email(events: Sequence) -> PreparedEmail:
+    if len(events) == 1:
+        event = events[0]
+        template_name, _, alumnus_subject = LISTING_EVENT_EMAILS[event.event]
+        return PreparedEmail(
+            template_name,
+            alumnus_subject.format(title=event.job_title),
+            is_company=False,
+            job_title=event.job_title,
+            company_name=event.company_name,
+            job_location=event.job_location,
+            job_url=event.job_url
         )
+
+    return PreparedEmail(
+        "listing_digest",
+        f"{len(events)} Job Listing Updates From Companies You Follow",
+        events=[
+            {
+                "label": LISTING_DIGEST_LABELS[event.event],
+                "event": event.event,
+                "job_title": event.job_title,
+                "company_name": event.company_name,
+                "job_location": event.job_location,
+                "job_url": event.job_url
+            }
+            for event in events
+        ]
+    )
+
+
+def send_listing_digest_emails(digests: Iterable[Tuple[AlumnusAccount, Sequence]]) -> int:
+    """
+    Queues one email per subscriber covering every listing event in their digest, written to the outbox
+    in one batch. A digest of a single event is sent as that event's usual email.
+
+    Subscribers whose digests hold the same events share one rendering of the templates.
+
+    Args:
+        digests (Iterable[Tuple[AlumnusAccount, Sequence]]): Each subscriber with their digest's events, in
+            the order they happened. Events have the attributes of a PendingListingEvent.
+
+    Returns:
+        int: The number of emails queued.
+    """
+    prepared_emails: Dict[Tuple[int, ...], PreparedEmail] = {}
+    queued = 0
+    with queued_emails():
+        for recipient, events in digests:
+            key = tuple(event.id for event in events)
+            email = prepared_emails.get(key)
+            if email is None:
+                email = prepared_emails[key] = _prepare_digest_email(events)
+
+            if email.queue(recipient.login_email, _get_recipient_name(recipient)):
+                queued += 1
+
+    return queued
+
+
+"""
+====== HELPERS FOR VARIOUS TEMPLATES ======
+"""
+
+
+def _send_listing_event_email(
+        event: str,
+        recipient: Union[CompanyAccount, AlumnusAccount],
+        listing: JobListing,
+        posting_company: CompanyAccount
+) -> bool:
+    try:
+        return send_listing_event_emails(event, [recipient], listing, posting_company) == 1
     except Exception as e:
-        print(f"[Email Helper Error] {e}")
+        current_app.logger.error(f"[Email Helper Error] {e}")
         return False
 
 
+def send_job_published_email(
+        recipient: Union[CompanyAccount, AlumnusAccount],
+        listing: JobListing,
+        posting_company: CompanyAccount
+) -> bool:
+    """
+    Sends an email notification when a job listing is published.
+
+    Depending on the recipient type, this function customizes the message:
+    - To the company that posted the job (CompanyAccount), confirming their listing is live.
+    - To subscribed alumni (AlumnusAccount), informing them of the new opportunity.
+
+    Args:
+        recipient (Union[CompanyAccount, AlumnusAccount]): The email recipient.
+        listing (JobListing): The job listing that was published.
+        posting_company (CompanyAccount): The company responsible for posting the job.
+
+    Returns:
+        bool: True if the email was queued successfully, False otherwise.
+    """
+    return _send_listing_event_email("published", recipient, listing, posting_company)
+
+
 def send_job_unpublished_email(
     recipient: Union[CompanyAccount, AlumnusAccount],
     listing: JobListing,
@@ -152,43 +343,9 @@ def send_job_unpublished_email(
         posting_company (CompanyAccount): The company that posted the job.
 
     Returns:
-        bool: True if the email was sent successfully, False otherwise.
-
-    Raises:
-        ValueError: If the recipient is not an instance of CompanyAccount or AlumnusAccount.
+        bool: True if the email was queued successfully, False otherwise.
     """
-    recipient_name = None
-    subject = None
-    try:
-        if isinstance(recipient, CompanyAccount):
-            recipient_name = recipient.registered_name
-            subject = f"Your Job Listing Was Unpublished: {listing.title}"
-        elif isinstance(recipient, AlumnusAccount):
-            recipient_name = f"{recipient.first_name} {recipient.last_name}"
-            subject = f"Job Listing Unpublished: {listing.title}"
-        else:
-            raise ValueError(
-                "Recipient must be a CompanyAccount or AlumnusAccount.")
-
-        job_url = url_for(
-            LISTING_PAGE_ROUTE,
-            listing_id=listing.id,
-            _external=True
-        )
-
-        return send_email(
-            recipient_email=recipient.login_email,
-            template_name="job_unpublished",
-            subject=subject,
-            recipient_name=recipient_name,
-            job_title=listing.title,
-            company_name=posting_company.registered_name,
-            job_location=listing.job_site_address,
-            job_url=job_url
-        )
-    except Exception as e:
-        print(f"[Email Helper Error] {e}")
-        return False
+    return _send_listing_event_email("unpublished", recipient, listing, posting_company)
 
 
 def send_job_deleted_email(
@@ -209,40 +366,6 @@ def send_job_deleted_email(
         posting_company (CompanyAccount): The company that posted the job.
 
     Returns:
-        bool: True if the email was sent successfully, False otherwise.
-
-    Raises:
-        ValueError: If the recipient is not an instance of CompanyAccount or AlumnusAccount.
+        bool: True if the email was queued successfully, False otherwise.
     """
-    recipient_name = None
-    subject = None
-    try:
-        if isinstance(recipient, CompanyAccount):
-            recipient_name = recipient.registered_name
-            subject = f"Your Listing Has Been Deleted: {listing.title}"
-        elif isinstance(recipient, AlumnusAccount):
-            recipient_name = f"{recipient.first_name} {recipient.last_name}"
-            subject = f"Job Listing Deleted: {listing.title}"
-        else:
-            raise ValueError(
-                "Recipient must be a CompanyAccount or AlumnusAccount.")
-
-        job_url = url_for(
-            LISTING_PAGE_ROUTE,
-            id=listing.id,
-            _external=True
-        )
-
-        return send_email(
-            recipient_email=recipient.login_email,
-            template_name="job_deleted",
-            subject=subject,
-            recipient_name=recipient_name,
-            job_title=listing.title,
-            company_name=posting_company.registered_name,
-            job_location=listing.job_site_address,
-            job_url=job_url
-        )
-    except Exception as e:
-        print(f"[Email Helper Error] {e}")
-        return False
+    return _send_listing_event_email("deleted", recipient, listing, posting_company)
@@ -0,0 +1,549 @@
+import os
+import smtplib
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Callable, Iterator, List, Optional
+
+from flask import Flask, current_app, g
+from sqlalchemy import and_, case, func, insert, or_, select, update
+
+from App.database import db
+from App.models import EmailOutboxMessage
+from App.utils.background import schedule_periodic_task, submit_background_task
+
+"""
+====== EMAIL OUTBOX ======
+
+Emails are rendered during the request but only written to the `email_outbox` table; a background
+sender delivers them afterwards, so a request never waits on SMTP:
+    - senders claim batches of due messages with a conditional UPDATE, so several workers (or the
+      `flask email dispatch` command) never deliver the same message twice;
+    - each batch is sent over one pooled SMTP connection (EMAIL_SMTP_POOL_SIZE), instead of a new
+      connection, STARTTLS handshake and login per recipient;
+    - sending is throttled to EMAIL_MAX_PER_MINUTE per worker, and failed messages are retried with
+      exponential backoff until EMAIL_MAX_ATTEMPTS is reached;
+    - every worker also wakes its sender at start-up and every EMAIL_DISPATCH_INTERVAL_SECONDS, so
+      messages outlive restarts and crashed workers, not only the next email queued;
+    - under TESTING (or EMAIL_BACKEND = "recording") messages are recorded by `RecordingSMTP`
+      instead of being sent.
+"""
+
+# Errors that reject a single message but leave the SMTP connection usable
+_MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+# Pooled connections idle for longer than this are checked with NOOP before being reused
+_SMTP_IDLE_CHECK_SECONDS = 30
+
+
+"""
+====== SMTP CONNECTIONS ======
+"""
+
+
+class RecordingSMTP:
+    """
+    A local stand-in for `smtplib.SMTP` that records messages instead of sending them.
+
+    Attributes:
+        sent_messages (List[EmailMessage]): Every message "sent" by any instance, oldest first.
+        rejected_recipients (Set[str]): Addresses to refuse, e.g. to exercise retries in tests.
+    """
+
+    sent_messages: List[EmailMessage] = []
+    rejected_recipients = set()
+
+    def send_message(self, msg: EmailMessage) -> dict:
+        if msg["To"] in self.rejected_recipients:
+            raise smtplib.SMTPRecipientsRefused({msg["To"]: (550, b"Recipient rejected")})
+        self.sent_messages.append(msg)
+        return {}
+
+    def noop(self) -> tuple:
+        return 250, b"OK"
+
+    def quit(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class SMTPConnectionPool:
+    """
+    A thread-safe pool of logged-in SMTP connections.
+
+    Args:
+        connect (Callable): Opens a new, logged-in connection.
+        max_size (int): How many idle connections to keep open.
+    """
+
+    def __init__(self, connect: Callable, max_size: int) -> None:
+        self._connect = connect
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._idle = []
+
+    def _acquire(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                smtp, released_at = self._idle.pop()
+
+            if time.monotonic() - released_at < _SMTP_IDLE_CHECK_SECONDS:
+                return smtp
+            try:
+                if smtp.noop()[0] == 250:
+                    return smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._discard(smtp)
+
+        return self._connect()
+
+    def _release(self, smtp) -> None:
+        with self._lock:
+            if len(self._idle) < self._max_size:
+                self._idle.append((smtp, time.monotonic()))
+                return
+        self._discard(smtp)
+
+    @staticmethod
+    def _discard(smtp) -> None:
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrows a connection, returning it to the pool afterwards (or closing it if the block raised).
+        """
+        smtp = self._acquire()
+        try:
+            yield smtp
+        except BaseException:
+            self._discard(smtp)
+            raise
+        self._release(smtp)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for smtp, _ in idle:
+            self._discard(smtp)
+
+
+def get_sender_address() -> str:
+    """
+    Gets the From address: EMAIL_SENDER_ADDRESS, else the Gmail account the emails are sent with.
+    """
+    return (current_app.config.get("EMAIL_SENDER_ADDRESS")
+            or os.getenv("GMAIL_SENDER_ADDRESS")
+            or "no-reply@localhost")
+
+
+def _uses_recording_backend(app: Flask) -> bool:
+    return app.testing or app.config.get("EMAIL_BACKEND") == "recording"
+
+
+def _connect_smtp(config: dict) -> smtplib.SMTP:
+    sender_email = os.getenv("GMAIL_SENDER_ADDRESS")
+    sender_password = os.getenv("GMAIL_APPLICATION_PASSWORD")
+    if not sender_email or not sender_password:
+        raise EnvironmentError(
+            "Missing GMAIL_SENDER_ADDRESS or GMAIL_APPLICATION_PASSWORD in environment."
+        )
+
+    smtp = smtplib.SMTP(config["EMAIL_SMTP_HOST"], config["EMAIL_SMTP_PORT"], timeout=config["EMAIL_SMTP_TIMEOUT"])
+    try:
+        if config["EMAIL_SMTP_USE_TLS"]:
+            smtp.starttls()
+        smtp.login(sender_email, sender_password)
+    except BaseException:
+        smtp.close()
+        raise
+    return smtp
+
+
+_pool_lock = threading.Lock()
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    """
+    Gets the application's SMTP connection pool, creating it on first use.
+    """
+    app = current_app._get_current_object()
+    with _pool_lock:
+        pool = app.extensions.get("email_smtp_pool")
+        if pool is None:
+            config = dict(app.config)
+            connect = RecordingSMTP if _uses_recording_backend(app) else (lambda: _connect_smtp(config))
+            pool = app.extensions["email_smtp_pool"] = SMTPConnectionPool(
+                connect, app.config.get("EMAIL_SMTP_POOL_SIZE", 2)
+            )
+        return pool
+
+
+"""
+====== THROTTLING ======
+"""
+
+
+class SendThrottle:
+    """
+    A thread-safe sliding one-minute window limiting how many emails a worker sends.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sent_at = deque()
+
+    def wait(self, max_per_minute: Optional[int]) -> None:
+        """
+        Blocks until another email may be sent, then counts it.
+
+        Args:
+            max_per_minute (Optional[int]): The limit (None or 0 disables throttling).
+        """
+        if not max_per_minute:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._sent_at and self._sent_at[0] <= now - 60:
+                    self._sent_at.popleft()
+
+                if len(self._sent_at) < max_per_minute:
+                    self._sent_at.append(now)
+                    return
+                delay = self._sent_at[0] + 60 - now
+            time.sleep(delay)
+
+
+# One throttle per worker process
+send_throttle = SendThrottle()
+
+
+"""
+====== QUEUEING ======
+"""
+
+
+def queue_email(recipient_email: str, subject: str, text_content: str, html_content: str = None) -> None:
+    """
+    Adds a rendered email to the outbox and wakes the background sender. Inside `queued_emails()`
+    the email is held back and written together with the rest of the block's emails instead.
+
+    Args:
+        recipient_email (str): Recipient's email address.
+        subject (str): Subject of the email.
+        text_content (str): The plain text body.
+        html_content (str, optional): The HTML body.
+
+    Raises:
+        SQLAlchemyError: For any database-related issues.
+    """
+    row = {
+        "recipient_email": recipient_email,
+        "subject": subject,
+        "text_content": text_content,
+        "html_content": html_content
+    }
+
+    batch = g.get("_queued_emails")
+    if batch is not None:
+        batch.append(row)
+    else:
+        _add_to_outbox([row])
+
+
+@contextmanager
+def queued_emails() -> Iterator[List[dict]]:
+    """
+    Collects every email queued within the block and writes them to the outbox with one bulk insert
+    (and one commit) when the block exits without an error.
+
+    Yields:
+        List[dict]: The emails queued so far.
+    """
+    outer_batch = g.get("_queued_emails")
+    if outer_batch is not None:
+        # Nested blocks join the outermost batch
+        yield outer_batch
+        return
+
+    g._queued_emails = batch = []
+    try:
+        yield batch
+    finally:
+        g.pop("_queued_emails", None)
+
+    if batch:
+        _add_to_outbox(batch)
+
+
+def _add_to_outbox(rows: List[dict]) -> None:
+    try:
+        db.session.execute(insert(EmailOutboxMessage), rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    queue_email_dispatch()
+
+
+"""
+====== DELIVERY ======
+"""
+
+
+def _build_email_message(message: EmailOutboxMessage, sender_email: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg['Subject'] = message.subject
+    msg['From'] = sender_email
+    msg['To'] = message.recipient_email
+    msg.set_content(message.text_content)           # Fallback text
+    if message.html_content:
+        msg.add_alternative(message.html_content, subtype='html')  # HTML part
+    return msg
+
+
+def _abandoned_condition(now: datetime, claim_timeout_seconds: float):
+    # Messages claimed by a sender that has since died (or failed without recording it)
+    return and_(
+        EmailOutboxMessage.status == "SENDING",
+        EmailOutboxMessage.claimed_at < now - timedelta(seconds=claim_timeout_seconds)
+    )
+
+
+def _claimable_condition(now: datetime, claim_timeout_seconds: float):
+    # Due messages, plus abandoned ones
+    return or_(
+        and_(EmailOutboxMessage.status == "PENDING", EmailOutboxMessage.next_attempt_at <= now),
+        _abandoned_condition(now, claim_timeout_seconds)
+    )
+
+
+def _fail_abandoned_messages(now: datetime, claim_timeout_seconds: float, max_attempts: int) -> None:
+    # An abandoned delivery counts as an attempt, so a message that keeps breaking its sender gives up
+    db.session.execute(
+        update(EmailOutboxMessage)
+        .where(_abandoned_condition(now, claim_timeout_seconds), EmailOutboxMessage.attempts + 1 >= max_attempts)
+        .values(
+            status="FAILED", attempts=EmailOutboxMessage.attempts + 1, claim_token=None,
+            last_error="Delivery was abandoned (sender timed out)"
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _claim_batch(batch_size: int, claim_timeout_seconds: float, max_attempts: int) -> List[EmailOutboxMessage]:
+    now = datetime.utcnow()
+    _fail_abandoned_messages(now, claim_timeout_seconds, max_attempts)
+    claimable = _claimable_condition(now, claim_timeout_seconds)
+
+    ids = db.session.scalars(
+        select(EmailOutboxMessage.id).where(claimable)
+        .order_by(EmailOutboxMessage.next_attempt_at, EmailOutboxMessage.id)
+        .limit(batch_size)
+    ).all()
+    if not ids:
+        db.session.commit()
+        return []
+
+    # Re-checking the condition in the UPDATE leaves messages another sender claimed first alone
+    claim_token = uuid.uuid4().hex
+    db.session.execute(
+        update(EmailOutboxMessage)
+        .where(EmailOutboxMessage.id.in_(ids), claimable)
+        .values(
+            status="SENDING", claim_token=claim_token, claimed_at=now,
+            attempts=EmailOutboxMessage.attempts + case((EmailOutboxMessage.status == "SENDING", 1), else_=0)
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+    return db.session.scalars(
+        select(EmailOutboxMessage).where(EmailOutboxMessage.claim_token == claim_token)
+        .order_by(EmailOutboxMessage.id)
+    ).all()
+
+
+def _mark_sent(message: EmailOutboxMessage) -> None:
+    message.status = "SENT"
+    message.sent_at = datetime.utcnow()
+    message.claim_token = None
+    message.last_error = None
+
+
+def _mark_failed(message: EmailOutboxMessage, error: Exception, config: dict) -> None:
+    message.attempts += 1
+    message.claim_token = None
+    message.last_error = str(error)[:1000]
+
+    if message.attempts >= config.get("EMAIL_MAX_ATTEMPTS", 5):
+        message.status = "FAILED"
+        return
+
+    backoff_seconds = min(
+        config.get("EMAIL_RETRY_BACKOFF_SECONDS", 30) * 2 ** (message.attempts - 1),
+        config.get("EMAIL_RETRY_MAX_BACKOFF_SECONDS", 3600)
+    )
+    message.status = "PENDING"
+    message.next_attempt_at = datetime.utcnow() + timedelta(seconds=backoff_seconds)
+
+
+def _deliver_batch(messages: List[EmailOutboxMessage], pool: SMTPConnectionPool, config: dict) -> int:
+    sender_email = get_sender_address()
+    remaining = list(messages)
+    sent = 0
+
+    try:
+        with pool.connection() as smtp:
+            while remaining:
+                message = remaining[0]
+                send_throttle.wait(config.get("EMAIL_MAX_PER_MINUTE"))
+                try:
+                    smtp.send_message(_build_email_message(message, sender_email))
+                except _MESSAGE_ERRORS as e:
+                    _mark_failed(message, e, config)
+                except (smtplib.SMTPException, OSError):
+                    # Handled below, for the rest of the batch too
+                    raise
+                except Exception as e:
+                    # E.g. a header the message cannot be built with: only this message fails
+                    current_app.logger.warning("Could not send outbox message %s: %s", message.id, e)
+                    _mark_failed(message, e, config)
+                else:
+                    _mark_sent(message)
+                    sent += 1
+                remaining.pop(0)
+
+    except (smtplib.SMTPException, OSError) as e:
+        # The connection could not be opened or was lost: the rest of the batch is retried later
+        current_app.logger.warning("SMTP delivery failed: %s", e)
+        for message in remaining:
+            _mark_failed(message, e, config)
+
+    db.session.commit()
+    return sent
+
+
+def dispatch_email_outbox(max_batches: Optional[int] = None) -> int:
+    """
+    Delivers due outbox messages, batch by batch, until none are left.
+
+    Args:
+        max_batches (int, optional): Stop after this many batches. Defaults to no limit.
+
+    Returns:
+        int: The number of emails sent.
+    """
+    config = current_app.config
+    pool = get_smtp_pool()
+    sent = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        messages = _claim_batch(
+            config.get("EMAIL_BATCH_SIZE", 50), config.get("EMAIL_CLAIM_TIMEOUT_SECONDS", 600),
+            config.get("EMAIL_MAX_ATTEMPTS", 5)
+        )
+        if not messages:
+            break
+
+        sent += _deliver_batch(messages, pool, config)
+        batches += 1
+
+    return sent
+
+
+"""
+====== BACKGROUND SENDER ======
+"""
+
+_dispatch_lock = threading.Lock()
+_dispatch_requested = threading.Event()
+_retry_timer_lock = threading.Lock()
+_retry_timer: Optional[threading.Timer] = None
+
+
+def _dispatch_in_background() -> int:
+    # One sender per worker; a sender that is already running picks up newly queued messages
+    sent = 0
+    while True:
+        if not _dispatch_lock.acquire(blocking=False):
+            return sent
+        try:
+            _dispatch_requested.clear()
+            sent += dispatch_email_outbox()
+        finally:
+            _dispatch_lock.release()
+
+        if not _dispatch_requested.is_set():
+            break
+
+    _schedule_retry_dispatch(current_app._get_current_object())
+    return sent
+
+
+def _schedule_retry_dispatch(app: Flask) -> None:
+    global _retry_timer
+
+    if app.testing or app.config.get("BACKGROUND_TASKS_SYNCHRONOUS"):
+        return
+
+    next_attempt_at = db.session.scalar(
+        select(func.min(EmailOutboxMessage.next_attempt_at)).where(EmailOutboxMessage.status == "PENDING")
+    )
+    if next_attempt_at is None:
+        return
+
+    def wake_sender():
+        with app.app_context():
+            queue_email_dispatch()
+
+    with _retry_timer_lock:
+        if _retry_timer is not None:
+            _retry_timer.cancel()
+        _retry_timer = threading.Timer(max((next_attempt_at - datetime.utcnow()).total_seconds(), 0), wake_sender)
+        _retry_timer.daemon = True
+        _retry_timer.start()
+
+
+def queue_email_dispatch():
+    """
+    Wakes the background sender to deliver queued emails.
+
+    Returns:
+        Future: The sender task's future, whose result is the number of emails it sent.
+    """
+    _dispatch_requested.set()
+    return submit_background_task(_dispatch_in_background)
+
+
+def schedule_email_dispatch(app: Flask) -> None:
+    """
+    Wakes the background sender at start-up, then every EMAIL_DISPATCH_INTERVAL_SECONDS. Messages queued
+    or due for a retry before a restart, or left claimed by a worker that died (once EMAIL_CLAIM_TIMEOUT_SECONDS
+    has passed), are then delivered without waiting for another email to be queued.
+
+    Args:
+        app (Flask): The application.
+    """
+    if app.testing or app.config.get("BACKGROUND_TASKS_SYNCHRONOUS"):
+        return
+
+    with app.app_context():
+        queue_email_dispatch()
+    schedule_periodic_task(app, app.config.get("EMAIL_DISPATCH_INTERVAL_SECONDS", 0), queue_email_dispatch)
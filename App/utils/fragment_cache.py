@@ -0,0 +1,109 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from flask import Flask
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+from App.utils.metrics import record_cache_lookup
+from App.utils.response_cache import MemoryCacheBackend, get_cache_generation, get_cache_generations, get_company_namespace
+
+"""
+====== TEMPLATE FRAGMENT CACHE ======
+
+Parts of a template that render the same for every user (job cards, company lists) are rendered once and
+kept, rendered, in this worker's LRU (FRAGMENT_CACHE_MAX_ENTRIES):
+
+    {% set generations = company_generations(jobs) %}
+    {% for job in jobs %}
+        {% cache "job_card", job.id, job.datetime_last_modified, generations.get(job.company_id) %}
+            ...
+        {% endcache %}
+    {% endfor %}
+
+    - the values after the tag form the key, and must change whenever the fragment would: a listing's
+      `datetime_last_modified` changes with every update, and `cache_generation` gives a namespace's
+      generation (see App/utils/response_cache.py), which every committed change to a company bumps.
+      `company_generations` gets the generations of every company in a list of job listings in one lookup;
+    - a fragment whose key holds None is always rendered: generations are None unless they are shared by
+      every worker (RESPONSE_CACHE_BACKEND = "sqlite"), as this worker would not see other workers' changes;
+    - fragments also expire after FRAGMENT_CACHE_TTL seconds. The cache is off (fragments are always
+      rendered) when FRAGMENT_CACHE_TTL is 0 or templates are reloaded on change (TEMPLATES_AUTO_RELOAD).
+"""
+
+
+class FragmentCacheExtension(Extension):
+    """
+    Adds the `{% cache key, ... %} ... {% endcache %}` tag. Renders the body as-is until
+    `environment.fragment_cache` is set.
+    """
+
+    tags = {"cache"}
+
+    def __init__(self, environment) -> None:
+        super().__init__(environment)
+        environment.extend(fragment_cache=None, fragment_cache_ttl=0)
+
+    def parse(self, parser) -> nodes.Node:
+        lineno = next(parser.stream).lineno
+        key_parts = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            key_parts.append(parser.parse_expression())
+
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method("_render_cached", [nodes.List(key_parts)]), [], [], body
+        ).set_lineno(lineno)
+
+    def _render_cached(self, key_parts: List[Any], caller: Callable[[], str]) -> str:
+        cache: Optional[MemoryCacheBackend] = self.environment.fragment_cache
+        if cache is None or any(part is None for part in key_parts):
+            return caller()
+
+        key = repr(tuple(key_parts))
+        fragment = cache.get(key)
+        record_cache_lookup("fragment", fragment is not None)
+        if fragment is None:
+            fragment = caller()
+            cache.set(key, fragment, self.environment.fragment_cache_ttl)
+        return fragment
+
+
+def get_company_generations(job_listings: Iterable[Any]) -> Dict[int, int]:
+    """
+    Gets the generations of the companies of several job listings, in one lookup.
+
+    Args:
+        job_listings (Iterable): The job listings (anything with a `company_id`).
+
+    Returns:
+        dict: The generation of each listing's company, by company ID. Empty if generations are not
+            shared by every worker, so that every lookup in it gives None.
+    """
+    company_ids = {listing.company_id for listing in job_listings}
+    generations = get_cache_generations(get_company_namespace(company_id) for company_id in company_ids)
+    if generations is None:
+        return {}
+    return {company_id: generations[get_company_namespace(company_id)] for company_id in company_ids}
+
+
+def register_fragment_cache(app: Flask) -> None:
+    """
+    Adds the `{% cache %}` tag and the `cache_generation`/`company_generations`/`company_namespace`
+    template globals, and sets
+    up the fragment cache from FRAGMENT_CACHE_TTL and FRAGMENT_CACHE_MAX_ENTRIES.
+
+    Args:
+        app (Flask): The application.
+    """
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.add_template_global(get_cache_generation, "cache_generation")
+    app.add_template_global(get_company_generations, "company_generations")
+    app.add_template_global(get_company_namespace, "company_namespace")
+
+    ttl_seconds = app.config.get("FRAGMENT_CACHE_TTL", 0)
+    # Reloaded templates (TEMPLATES_AUTO_RELOAD, on by default in debug mode) would not show in cached fragments
+    if ttl_seconds <= 0 or app.jinja_env.auto_reload:
+        return
+
+    app.jinja_env.fragment_cache = MemoryCacheBackend(app.config.get("FRAGMENT_CACHE_MAX_ENTRIES", 2048))
+    app.jinja_env.fragment_cache_ttl = ttl_seconds
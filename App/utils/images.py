@@ -0,0 +1,140 @@
+import hashlib
+import io
+import os
+import re
+import tempfile
+from typing import Optional, Tuple
+
+from flask import current_app
+from flask_uploads import IMAGES
+from werkzeug.datastructures import FileStorage
+from werkzeug.utils import secure_filename
+
+"""
+====== PROFILE IMAGES ======
+
+Profile photos are processed once, at upload time, instead of serving the raw upload everywhere:
+    - with Pillow installed, the photo is oriented, shrunk to fit PROFILE_IMAGE_MAX_SIZE and re-encoded
+      as PROFILE_IMAGE_FORMAT (WebP by default), and a square PROFILE_IMAGE_THUMBNAIL_SIZE thumbnail is
+      made for job cards and lists; without Pillow the original file is kept and is its own thumbnail;
+    - files are named after a hash of the upload and the processing settings, so a URL never changes
+      meaning and is served with immutable cache headers (see App/utils/static_files.py);
+    - the `thumbnail` template filter maps a stored photo path to its thumbnail's path.
+"""
+
+PROFILE_IMAGE_FOLDER = "profile-images"
+
+# Extensions accepted when Pillow is not installed (SVG is excluded: it can carry scripts)
+PROFILE_IMAGE_EXTENSIONS = frozenset(extension for extension in IMAGES if extension != "svg")
+
+_PROCESSED_IMAGE_PATH = re.compile(rf"^({PROFILE_IMAGE_FOLDER}/[0-9a-f]{{16}})(\.[a-z0-9]+)$")
+
+
+def _write_static_file(path: str, data: bytes) -> None:
+    absolute_path = os.path.join(current_app.static_folder, *path.split("/"))
+    if os.path.exists(absolute_path):
+        # Content-addressed: an existing file already holds exactly this content
+        return
+
+    folder = os.path.dirname(absolute_path)
+    os.makedirs(folder, exist_ok=True)
+    descriptor, temp_path = tempfile.mkstemp(prefix=".upload-", dir=folder)
+    try:
+        with os.fdopen(descriptor, "wb") as temp_file:
+            temp_file.write(data)
+        os.replace(temp_path, absolute_path)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+
+def _process_with_pillow(data: bytes, config) -> Optional[Tuple[bytes, bytes, str]]:
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return None
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f"The file is not a supported image: {e}")
+
+    image = ImageOps.exif_transpose(image)
+    image_format = config.get("PROFILE_IMAGE_FORMAT", "WEBP").upper()
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha and image_format != "JPEG" else "RGB")
+
+    def encode(resized) -> bytes:
+        output = io.BytesIO()
+        resized.save(output, format=image_format, quality=config.get("PROFILE_IMAGE_QUALITY", 80), optimize=True)
+        return output.getvalue()
+
+    max_size = config.get("PROFILE_IMAGE_MAX_SIZE", 512)
+    thumbnail_size = config.get("PROFILE_IMAGE_THUMBNAIL_SIZE", 128)
+
+    display = image.copy()
+    display.thumbnail((max_size, max_size), Image.LANCZOS)
+    thumbnail = ImageOps.fit(image, (thumbnail_size, thumbnail_size), Image.LANCZOS)
+    return encode(display), encode(thumbnail), f".{image_format.lower()}"
+
+
+def save_profile_image(upload: FileStorage) -> str:
+    """
+    Processes an uploaded profile photo and stores it, with its thumbnail, under content-hashed names.
+
+    Args:
+        upload (FileStorage): The uploaded image.
+
+    Returns:
+        str: The photo's path, relative to the static folder (for `profile_photo_file_path`).
+
+    Raises:
+        ValueError: If the file is empty, too large or not a supported image.
+    """
+    config = current_app.config
+    max_bytes = config.get("PROFILE_IMAGE_MAX_UPLOAD_BYTES", 10 * 1024 * 1024)
+    data = upload.stream.read(max_bytes + 1)
+    if not data:
+        raise ValueError("The image file is empty.")
+    if len(data) > max_bytes:
+        raise ValueError(f"Images cannot be larger than {max_bytes // (1024 * 1024)} MB.")
+
+    # The settings are part of the name, so changing them never serves stale images under the same URL
+    settings = "|".join(str(config.get(key)) for key in (
+        "PROFILE_IMAGE_FORMAT", "PROFILE_IMAGE_QUALITY", "PROFILE_IMAGE_MAX_SIZE", "PROFILE_IMAGE_THUMBNAIL_SIZE"
+    ))
+    name = hashlib.sha256(data + settings.encode()).hexdigest()[:16]
+
+    processed = _process_with_pillow(data, config)
+    if processed is None:
+        extension = os.path.splitext(secure_filename(upload.filename or ""))[1].lower()
+        if extension.lstrip(".") not in PROFILE_IMAGE_EXTENSIONS:
+            raise ValueError(f"Unsupported image type '{extension}'.")
+
+        path = f"{PROFILE_IMAGE_FOLDER}/{name}-original{extension}"
+        _write_static_file(path, data)
+        return path
+
+    display, thumbnail, extension = processed
+    path = f"{PROFILE_IMAGE_FOLDER}/{name}{extension}"
+    _write_static_file(f"{PROFILE_IMAGE_FOLDER}/{name}-thumb{extension}", thumbnail)
+    _write_static_file(path, display)
+    return path
+
+
+def get_thumbnail_path(path: Optional[str]) -> Optional[str]:
+    """
+    Gets the thumbnail of a stored profile photo (the `thumbnail` template filter).
+
+    Args:
+        path (str): The photo's path, relative to the static folder.
+
+    Returns:
+        Optional[str]: The thumbnail's path, or the photo's own path if it has no thumbnail (e.g. photos
+            uploaded before processing, or without Pillow).
+    """
+    match = _PROCESSED_IMAGE_PATH.match(path or "")
+    if match is None:
+        return path
+    return f"{match.group(1)}-thumb{match.group(2)}"
@@ -0,0 +1,355 @@
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+
+from App.database import db
+from App.models import JobListing
+from App.utils.response_cache import COMPANIES_NAMESPACE, get_cache_generation
+
+"""
+====== IN-MEMORY LISTING SEARCH INDEX ======
+
+Each worker process keeps an inverted index over the approved job listings so that
+search-as-you-type requests can be answered without touching the database:
+    - token postings map every word to the listings containing it (with a per-field weight);
+    - trigram postings map every trigram to the words containing it, which allows
+      substring matches ("velop" -> "developer") and typo-tolerant matches ("devloper").
+
+The index is built at start-up, updated incrementally by the job listing controllers and
+periodically compared against the database: the approved listings' count, IDs and latest modification,
+and the generation of the companies namespace (see App/utils/response_cache.py), as listings are
+also indexed by their company's name. While it is cold (not built yet, or found to be inconsistent)
+callers are expected to fall back to the SQL search path.
+"""
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# How much a match in each field contributes to a listing's score
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "company_name": 2.0,
+    "position_type": 1.0,
+    "description": 1.0
+}
+
+EXACT_MATCH_SCORE = 3.0
+SUBSTRING_MATCH_SCORE = 2.0
+FUZZY_MATCH_SCORE = 1.0
+
+# Minimum trigram similarity for a word to count as a typo of the query word
+FUZZY_SIMILARITY_THRESHOLD = 0.4
+
+
+def _tokenize(value: Optional[str]) -> List[str]:
+    return TOKEN_PATTERN.findall(value.lower()) if value else []
+
+
+def _trigrams(token: str) -> Set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ListingSearchIndex:
+    """
+    A thread-safe inverted index with token and trigram postings over approved job listings.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._documents: Dict[int, dict] = {}
+        self._document_tokens: Dict[int, Set[str]] = {}
+        self._token_postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._trigram_postings: Dict[str, Set[str]] = defaultdict(set)
+        self._companies_generation: Optional[int] = None
+        self._last_consistency_check = 0.0
+        self.is_warm = False
+
+    def build(self, listings: Iterable[JobListing], companies_generation: Optional[int] = None) -> None:
+        """
+        Replaces the contents of the index with the given (approved) job listings and marks it warm.
+
+        Args:
+            listings (Iterable[JobListing]): The job listings to index.
+            companies_generation (int, optional): The generation of the companies namespace, read before
+                the listings (and their companies) were loaded.
+        """
+        with self._lock:
+            self._documents.clear()
+            self._document_tokens.clear()
+            self._token_postings.clear()
+            self._trigram_postings.clear()
+
+            for listing in listings:
+                self._add(listing)
+
+            self._companies_generation = companies_generation
+            self._last_consistency_check = time.monotonic()
+            self.is_warm = True
+
+    def add(self, listing: JobListing) -> None:
+        """
+        Adds or replaces a job listing in the index.
+
+        Args:
+            listing (JobListing): The job listing to index.
+        """
+        with self._lock:
+            self._remove(listing.id)
+            self._add(listing)
+
+    def remove(self, listing_id: int) -> None:
+        """
+        Removes a job listing from the index, if present.
+
+        Args:
+            listing_id (int): The ID of the job listing to remove.
+        """
+        with self._lock:
+            self._remove(listing_id)
+
+    def sync(self, listing: JobListing) -> None:
+        """
+        Adds the job listing if it is approved, otherwise removes it from the index.
+
+        Args:
+            listing (JobListing): The job listing whose approval status may have changed.
+        """
+        if listing.admin_approval_status == "APPROVED":
+            self.add(listing)
+        else:
+            self.remove(listing.id)
+
+    def _add(self, listing: JobListing) -> None:
+        company = listing.company
+        self._documents[listing.id] = {
+            "id": listing.id,
+            "company_id": listing.company_id,
+            "title": listing.title,
+            "position_type": listing.position_type,
+            "job_site_address": listing.job_site_address,
+            "monthly_salary_ttd": listing.monthly_salary_ttd,
+            "company_name": company.registered_name if company else None,
+            "company_logo": company.profile_photo_file_path if company else None,
+            "datetime_created": listing.datetime_created,
+            "datetime_last_modified": listing.datetime_last_modified
+        }
+
+        fields = {
+            "title": listing.title,
+            "company_name": company.registered_name if company else None,
+            "position_type": listing.position_type,
+            "description": listing.description
+        }
+
+        tokens = set()
+        for field, value in fields.items():
+            for token in _tokenize(value):
+                postings = self._token_postings[token]
+                postings[listing.id] = max(postings.get(listing.id, 0.0), FIELD_WEIGHTS[field])
+                tokens.add(token)
+
+                for trigram in _trigrams(token):
+                    self._trigram_postings[trigram].add(token)
+
+        self._document_tokens[listing.id] = tokens
+
+    def _remove(self, listing_id: int) -> None:
+        if listing_id not in self._documents:
+            return
+
+        del self._documents[listing_id]
+        for token in self._document_tokens.pop(listing_id, ()):
+            postings = self._token_postings.get(token)
+            if postings is None:
+                continue
+
+            postings.pop(listing_id, None)
+            if not postings:
+                # Drop the word from the vocabulary once no listing uses it
+                del self._token_postings[token]
+                for trigram in _trigrams(token):
+                    words = self._trigram_postings.get(trigram)
+                    if words is not None:
+                        words.discard(token)
+                        if not words:
+                            del self._trigram_postings[trigram]
+
+    def fingerprint(self) -> Tuple[int, int, Optional[datetime]]:
+        """
+        Summarises the indexed listings as (count, sum of IDs, latest modification time).
+        """
+        with self._lock:
+            documents = list(self._documents.values())
+
+        return (
+            len(documents),
+            sum(document["id"] for document in documents),
+            max((document["datetime_last_modified"] for document in documents), default=None)
+        )
+
+    def is_consistent(self) -> bool:
+        """
+        Compares the index against the approved job listings in the database using one aggregate query,
+        and against the generation of the companies namespace, which changes whenever a company does.
+
+        Returns:
+            bool: True if the index matches the database, False otherwise.
+        """
+        count, id_sum, last_modified = db.session.query(
+            func.count(JobListing.id),
+            func.coalesce(func.sum(JobListing.id), 0),
+            func.max(JobListing.datetime_last_modified)
+        ).filter(JobListing.admin_approval_status == "APPROVED").one()
+
+        return (
+            self.fingerprint() == (count, id_sum, last_modified)
+            and self._companies_generation == get_cache_generation(COMPANIES_NAMESPACE)
+        )
+
+    def check_consistency(self, interval_seconds: float) -> bool:
+        """
+        Runs the consistency check at most once per interval, marking the index cold if it has
+        drifted from the database (e.g. because another worker approved or deleted a listing).
+
+        Args:
+            interval_seconds (float): The minimum number of seconds between two checks.
+
+        Returns:
+            bool: Whether the index is warm after the check.
+        """
+        now = time.monotonic()
+        if not self.is_warm or now - self._last_consistency_check < interval_seconds:
+            return self.is_warm
+
+        self._last_consistency_check = now
+        if not self.is_consistent():
+            self.is_warm = False
+
+        return self.is_warm
+
+    def _match_token(self, query_token: str) -> Dict[int, float]:
+        """
+        Scores every listing matching a single query word, preferring exact, then substring,
+        then typo-tolerant (trigram similarity) matches.
+        """
+        scores: Dict[int, float] = {}
+
+        def add_matches(token: str, match_score: float) -> None:
+            for listing_id, field_weight in self._token_postings.get(token, {}).items():
+                scores[listing_id] = max(scores.get(listing_id, 0.0), match_score * field_weight)
+
+        add_matches(query_token, EXACT_MATCH_SCORE)
+
+        query_trigrams = _trigrams(query_token)
+        candidate_counts: Dict[str, int] = defaultdict(int)
+        for trigram in query_trigrams:
+            for token in self._trigram_postings.get(trigram, ()):
+                candidate_counts[token] += 1
+
+        for token, shared in candidate_counts.items():
+            if token == query_token:
+                continue
+
+            if query_token in token:
+                add_matches(token, SUBSTRING_MATCH_SCORE)
+                continue
+
+            similarity = shared / len(query_trigrams | _trigrams(token))
+            if similarity >= FUZZY_SIMILARITY_THRESHOLD:
+                add_matches(token, FUZZY_MATCH_SCORE * similarity)
+
+        return scores
+
+    def search(
+            self,
+            search_term: str = "",
+            position_type: Optional[str] = None,
+            job_site_address: Optional[str] = None,
+            min_salary: Optional[int] = None,
+            max_salary: Optional[int] = None,
+            company_id: Optional[int] = None,
+            limit: Optional[int] = None,
+            after: Optional[Tuple[datetime, int]] = None,
+            offset: int = 0
+    ) -> List[dict]:
+        """
+        Searches the indexed listings.
+
+        Every word of the search term must match the listing; a term without words is matched literally
+        against titles and company names. Results are ordered by relevance, or newest first (by creation
+        time, then ID) when no search term is given.
+
+        Args:
+            search_term (str, optional): The raw search term entered by the user.
+            position_type (str, optional): Exact position type to filter by.
+            job_site_address (str, optional): Exact job site address to filter by.
+            min_salary (int, optional): Minimum monthly salary (in TTD), used together with max_salary.
+            max_salary (int, optional): Maximum monthly salary (in TTD), used together with min_salary.
+            company_id (int, optional): ID of the company whose listings to search.
+            limit (int, optional): The maximum number of listings to return.
+            after (Tuple[datetime, int], optional):
+                Only return listings created before this (datetime_created, id) position.
+                Only meaningful without a search term, as ranked results are not ordered by position.
+            offset (int, optional): The number of ranked results to skip, to page through a search by term.
+
+        Returns:
+            List[dict]: The matching listing documents.
+        """
+        query_tokens = _tokenize(search_term)
+
+        with self._lock:
+            if query_tokens:
+                scores: Optional[Dict[int, float]] = None
+                for query_token in query_tokens:
+                    token_scores = self._match_token(query_token)
+                    if scores is None:
+                        scores = token_scores
+                    else:
+                        scores = {
+                            listing_id: score + token_scores[listing_id]
+                            for listing_id, score in scores.items() if listing_id in token_scores
+                        }
+                    if not scores:
+                        return []
+            elif search_term.strip():
+                # A term without words ("!!!") is matched literally, as by the SQL search
+                needle = search_term.strip().lower()
+                scores = {
+                    listing_id: 0.0 for listing_id, document in self._documents.items()
+                    if needle in (document["title"] or "").lower() or needle in (document["company_name"] or "").lower()
+                }
+            else:
+                scores = {listing_id: 0.0 for listing_id in self._documents}
+
+            documents = [self._documents[listing_id] for listing_id in scores]
+
+        if position_type:
+            documents = [d for d in documents if d["position_type"] == position_type]
+
+        if job_site_address:
+            documents = [d for d in documents if d["job_site_address"] == job_site_address]
+
+        if min_salary is not None and max_salary is not None:
+            documents = [
+                d for d in documents if min_salary <= d["monthly_salary_ttd"] <= max_salary
+            ]
+
+        if company_id is not None:
+            documents = [d for d in documents if d["company_id"] == company_id]
+
+        if after is not None:
+            documents = [d for d in documents if (d["datetime_created"], d["id"]) < after]
+
+        documents.sort(
+            key=lambda d: (scores[d["id"]], d["datetime_created"], d["id"]), reverse=True
+        )
+        return documents[offset:offset + limit] if limit else documents[offset:]
+
+
+# One index per worker process
+listing_search_index = ListingSearchIndex()
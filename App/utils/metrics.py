@@ -0,0 +1,192 @@
+import hmac
+import os
+import time
+from typing import Optional
+
+from flask import Flask, Response, current_app, g, request
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from App.database import db
+from App.models import EmailOutboxMessage, PendingListingEvent
+from App.utils.profiling import get_request_profile
+
+"""
+====== METRICS ======
+
+With the optional `prometheus_client` package installed, `/metrics` exposes, in Prometheus' text format:
+    - http_request_duration_seconds: a latency histogram per method, endpoint and status;
+    - db_queries_total and db_query_seconds_total per endpoint (from the request profile, see
+      App/utils/profiling.py), db_pool_checkout_duration_seconds (how long connections are held out of the
+      pool, checkout to checkin) and db_pool_connections_in_use;
+    - cache_lookups_total per cache ("response", "fragment") and result ("hit", "miss"), for hit ratios;
+    - email_outbox_messages per status and pending_listing_events (the notification digest queue), counted
+      in the database when scraped.
+
+Under gunicorn every worker has its own counters: with PROMETHEUS_MULTIPROC_DIR set (see gunicorn_config.py),
+workers write them to files there and a scrape, served by any worker, adds up every worker's values.
+Without `prometheus_client` nothing is recorded and `/metrics` is not served. With METRICS_TOKEN set, scrapes
+must send it as a bearer token.
+"""
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_CHECKOUT_START_KEY = "metrics_checkout_start"
+
+# The process' metrics, once `prometheus_client` is found (see `_get_metrics`)
+_metrics = None
+
+
+class _Metrics:
+
+    def __init__(self) -> None:
+        from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+
+        # Not the global registry, so that creating several applications (e.g. in tests) registers them once
+        self.registry = CollectorRegistry(auto_describe=True)
+        self.request_duration = Histogram(
+            "http_request_duration_seconds", "Request latency.", ["method", "endpoint", "status"],
+            buckets=LATENCY_BUCKETS, registry=self.registry
+        )
+        self.queries = Counter(
+            "db_queries", "SQL statements executed by requests.", ["endpoint"], registry=self.registry
+        )
+        self.query_seconds = Counter(
+            "db_query_seconds", "Time requests spent executing SQL statements.", ["endpoint"],
+            registry=self.registry
+        )
+        self.pool_checkout_duration = Histogram(
+            "db_pool_checkout_duration_seconds", "How long connections are checked out of the pool.",
+            buckets=LATENCY_BUCKETS, registry=self.registry
+        )
+        self.pool_connections_in_use = Gauge(
+            "db_pool_connections_in_use", "Connections checked out of the pool.",
+            multiprocess_mode="livesum", registry=self.registry
+        )
+        self.cache_lookups = Counter(
+            "cache_lookups", "Cache lookups.", ["cache", "result"], registry=self.registry
+        )
+
+
+def _get_metrics() -> Optional[_Metrics]:
+    global _metrics
+    if _metrics is None:
+        try:
+            _metrics = _Metrics()
+        except ImportError:
+            return None
+    return _metrics
+
+
+class QueueDepthCollector:
+    """
+    Counts the messages waiting in the database-backed queues when metrics are scraped.
+    """
+
+    def collect(self):
+        from prometheus_client.core import GaugeMetricFamily
+
+        try:
+            outbox = db.session.execute(
+                select(EmailOutboxMessage.status, func.count()).group_by(EmailOutboxMessage.status)
+            ).all()
+            pending_events = db.session.scalar(select(func.count()).select_from(PendingListingEvent))
+        except SQLAlchemyError:
+            db.session.rollback()
+            return
+
+        messages = GaugeMetricFamily("email_outbox_messages", "Emails in the outbox.", labels=["status"])
+        for status, count in outbox:
+            messages.add_metric([status], count)
+        yield messages
+        yield GaugeMetricFamily(
+            "pending_listing_events", "Listing events waiting for the next notification digest.", value=pending_events
+        )
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """
+    Counts a cache lookup, if metrics are enabled.
+
+    Args:
+        cache (str): The cache's name, e.g. "response".
+        hit (bool): Whether the value was found.
+    """
+    if _metrics is not None:
+        _metrics.cache_lookups.labels(cache, "hit" if hit else "miss").inc()
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+    connection_record.info[_CHECKOUT_START_KEY] = time.perf_counter()
+    _metrics.pool_connections_in_use.inc()
+
+
+def _on_checkin(dbapi_connection, connection_record) -> None:
+    start = connection_record.info.pop(_CHECKOUT_START_KEY, None)
+    if start is not None:
+        _metrics.pool_checkout_duration.observe(time.perf_counter() - start)
+        _metrics.pool_connections_in_use.dec()
+
+
+def _get_scrape_registry():
+    from prometheus_client import CollectorRegistry, multiprocess
+
+    registry = CollectorRegistry()
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry.register(_metrics.registry)
+    registry.register(QueueDepthCollector())
+    return registry
+
+
+def _serve_metrics() -> Response:
+    from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+    token = current_app.config.get("METRICS_TOKEN")
+    if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return current_app.response_class("Unauthorized", status=401)
+    return current_app.response_class(generate_latest(_get_scrape_registry()), mimetype=CONTENT_TYPE_LATEST)
+
+
+def register_metrics(app: Flask) -> None:
+    """
+    Records request, database and cache metrics, and serves them at `/metrics`. Does nothing when
+    METRICS_ENABLED is False or `prometheus_client` is not installed.
+
+    Args:
+        app (Flask): The application.
+    """
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+    metrics = _get_metrics()
+    if metrics is None:
+        app.logger.info("prometheus_client is not installed: /metrics is not served")
+        return
+
+    with app.app_context():
+        engine = db.engine
+    if not event.contains(engine, "checkout", _on_checkout):
+        event.listen(engine, "checkout", _on_checkout)
+        event.listen(engine, "checkin", _on_checkin)
+    app.add_url_rule("/metrics", "metrics", _serve_metrics)
+
+    @app.before_request
+    def _start_request_timer() -> None:
+        g.metrics_request_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request_metrics(response: Response) -> Response:
+        start = g.pop("metrics_request_start", None)
+        if start is None:
+            return response
+
+        endpoint = request.endpoint or "unmatched"
+        metrics.request_duration.labels(request.method, endpoint, str(response.status_code)).observe(
+            time.perf_counter() - start
+        )
+        profile = get_request_profile()
+        if profile is not None and profile.query_count:
+            metrics.queries.labels(endpoint).inc(profile.query_count)
+            metrics.query_seconds.labels(endpoint).inc(profile.query_ms / 1000)
+        return response
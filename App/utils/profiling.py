@@ -0,0 +1,246 @@
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional
+
+from flask import Flask, Response, current_app, g, has_request_context, request
+from jinja2 import Template
+from sqlalchemy import event
+
+from App.database import db
+
+"""
+====== REQUEST PROFILING ======
+
+Every request records where its time went, so slow pages can be explained instead of guessed at:
+    - wall time, the number of SQL statements and the time spent in them (from the engine's cursor events),
+      and the time spent rendering templates;
+    - statements are reduced to their shape (literals and bound parameter lists collapsed), and a shape run
+      REQUEST_PROFILING_N_PLUS_ONE_THRESHOLD times or more is flagged as a likely N+1 query;
+    - requests slower than SLOW_REQUEST_MS, or with a flagged statement, are logged as one JSON object on
+      the "App.profiling" logger;
+    - with REQUEST_PROFILING_SERVER_TIMING, responses carry the timings in a Server-Timing header (shown
+      by browsers' developer tools);
+    - with REQUEST_PROFILER = "always" every request, and with "header" requests sent with an
+      `X-Profile: 1` header, are profiled with pyinstrument (an HTML report) if installed, cProfile (a
+      `.prof` file, for `python -m pstats` or snakeviz) otherwise; reports go to REQUEST_PROFILER_DIR.
+      Off ("off") by default, as profiling slows requests down several times.
+
+Times cover the view and the rendering of its response, not the sending of streamed responses.
+"""
+
+PROFILING_LOGGER = "App.profiling"
+PROFILE_HEADER = "X-Profile"
+
+_PROFILE_ATTRIBUTE = "_request_profile"
+_QUERY_START_ATTR = "_request_profiling_query_start"
+
+_PARAMETER_LIST = re.compile(r"\(\s*(\?|%\(\w+\)s|%s|:\w+)(\s*,\s*(\?|%\(\w+\)s|%s|:\w+))*\s*\)")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class RequestProfile:
+    """
+    What a request spent its time on.
+
+    Attributes:
+        method (str): The request's method.
+        path (str): The request's path.
+        endpoint (Optional[str]): The matched endpoint.
+        status (Optional[int]): The response's status code.
+        duration_ms (float): The request's wall time.
+        query_count (int): The number of SQL statements executed.
+        query_ms (float): The time spent executing them.
+        template_ms (float): The time spent rendering templates.
+        statement_shapes (Counter): Statement shapes mapped to how many times they were executed.
+    """
+
+    method: str
+    path: str
+    endpoint: Optional[str] = None
+    status: Optional[int] = None
+    duration_ms: float = 0.0
+    query_count: int = 0
+    query_ms: float = 0.0
+    template_ms: float = 0.0
+    statement_shapes: Counter = field(default_factory=Counter)
+
+    def get_repeated_statements(self, threshold: int) -> Dict[str, int]:
+        """
+        Gets the statement shapes executed at least `threshold` times, likely N+1 queries.
+
+        Args:
+            threshold (int): The smallest number of executions flagged.
+
+        Returns:
+            Dict[str, int]: The repeated shapes mapped to their execution counts, most repeated first.
+        """
+        return {shape: count for shape, count in self.statement_shapes.most_common() if count >= threshold}
+
+    def to_log_record(self, threshold: int) -> Dict[str, Any]:
+        record = asdict(self)
+        del record["statement_shapes"]
+        for key in ("duration_ms", "query_ms", "template_ms"):
+            record[key] = round(record[key], 2)
+        record["repeated_statements"] = self.get_repeated_statements(threshold)
+        return record
+
+
+def get_statement_shape(statement: str) -> str:
+    """
+    Reduces an SQL statement to its shape: the same query with other parameters has the same shape.
+
+    Args:
+        statement (str): The SQL statement, as sent to the database.
+
+    Returns:
+        str: The statement's shape.
+    """
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PARAMETER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def get_request_profile() -> Optional[RequestProfile]:
+    """
+    Gets the current request's profile, or None outside of a profiled request.
+    """
+    if not has_request_context():
+        return None
+    return g.get(_PROFILE_ATTRIBUTE)
+
+
+class ProfiledTemplate(Template):
+    """
+    Adds the time spent rendering a template to the current request's profile.
+    """
+
+    def render(self, *args, **kwargs) -> str:
+        profile = get_request_profile()
+        if profile is None:
+            return super().render(*args, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            profile.template_ms += (time.perf_counter() - start) * 1000
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    # Kept on the statement's execution context, which is dropped with it even when the statement fails
+    if context is not None:
+        setattr(context, _QUERY_START_ATTR, time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    start = getattr(context, _QUERY_START_ATTR, None)
+    profile = get_request_profile()
+    if profile is None or start is None:
+        return
+
+    profile.query_count += 1
+    profile.query_ms += (time.perf_counter() - start) * 1000
+    profile.statement_shapes[get_statement_shape(statement)] += 1
+
+
+def _is_profiler_requested(app: Flask) -> bool:
+    mode = app.config.get("REQUEST_PROFILER", "off")
+    return mode == "always" or (mode == "header" and request.headers.get(PROFILE_HEADER) == "1")
+
+
+def _start_profiler():
+    try:
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+    except ImportError:
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another request of this process is being profiled (one profiler at a time, on Python 3.12+)
+            return None
+    return profiler
+
+
+def _write_profiler_report(app: Flask, profiler, profile: RequestProfile) -> str:
+    folder = app.config.get("REQUEST_PROFILER_DIR") or os.path.join(app.instance_path, "profiles")
+    os.makedirs(folder, exist_ok=True)
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{profile.method}-{profile.endpoint or 'unmatched'}-{os.getpid()}"
+
+    if hasattr(profiler, "output_html"):
+        # pyinstrument
+        profiler.stop()
+        path = os.path.join(folder, f"{name}.html")
+        with open(path, "w", encoding="utf-8") as report:
+            report.write(profiler.output_html())
+    else:
+        profiler.disable()
+        path = os.path.join(folder, f"{name}.prof")
+        profiler.dump_stats(path)
+    return path
+
+
+def _get_server_timing(profile: RequestProfile) -> str:
+    return ", ".join([
+        f'db;dur={profile.query_ms:.2f};desc="{profile.query_count} queries"',
+        f"tpl;dur={profile.template_ms:.2f}",
+        f"total;dur={profile.duration_ms:.2f}"
+    ])
+
+
+def register_request_profiling(app: Flask) -> None:
+    """
+    Profiles every request (see above). Does nothing when REQUEST_PROFILING is False.
+
+    Args:
+        app (Flask): The application.
+    """
+    if not app.config.get("REQUEST_PROFILING", True):
+        return
+
+    with app.app_context():
+        engine = db.engine
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    app.jinja_env.template_class = ProfiledTemplate
+
+    @app.before_request
+    def _start_request_profile() -> None:
+        setattr(g, _PROFILE_ATTRIBUTE, RequestProfile(request.method, request.path, request.endpoint))
+        g.request_profile_start = time.perf_counter()
+        g.request_profiler = _start_profiler() if _is_profiler_requested(app) else None
+
+    @app.after_request
+    def _finish_request_profile(response: Response) -> Response:
+        profile: Optional[RequestProfile] = g.pop(_PROFILE_ATTRIBUTE, None)
+        if profile is None:
+            return response
+
+        profile.status = response.status_code
+        profile.duration_ms = (time.perf_counter() - g.pop("request_profile_start")) * 1000
+        profiler = g.pop("request_profiler", None)
+        if profiler is not None:
+            report_path = _write_profiler_report(app, profiler, profile)
+            current_app.logger.info("Profile of %s %s written to %s", profile.method, profile.path, report_path)
+
+        threshold = app.config.get("REQUEST_PROFILING_N_PLUS_ONE_THRESHOLD", 5)
+        is_slow = profile.duration_ms >= app.config.get("SLOW_REQUEST_MS", 500)
+        if is_slow or profile.get_repeated_statements(threshold):
+            record = {"event": "slow_request" if is_slow else "repeated_statements", **profile.to_log_record(threshold)}
+            logging.getLogger(PROFILING_LOGGER).warning(json.dumps(record))
+
+        if app.config.get("REQUEST_PROFILING_SERVER_TIMING", False):
+            response.headers["Server-Timing"] = _get_server_timing(profile)
+        return response
@@ -0,0 +1,137 @@
+import threading
+from typing import Dict, Iterable, Optional, Set
+
+from flask import current_app
+
+"""
+====== PUB/SUB ======
+
+A minimal publish/subscribe layer for waking up long-lived responses (e.g. notification streams).
+Messages are bare signals on a named channel and carry no payload: subscribers re-read whatever
+changed from the database, so a missed or duplicated signal is harmless.
+    - `LocalPubSub` delivers signals within one worker process. It is the stand-in used when
+      PUBSUB_REDIS_URL is not set; other workers then notice changes by polling.
+    - `RedisPubSub` relays signals between every worker through Redis (requires the `redis` package).
+
+Threads block on `threading.Event`, which gevent's monkey patching turns into a cooperative wait, so
+subscriptions work with both the gevent and sync gunicorn workers.
+"""
+
+
+class Subscription:
+    """
+    A subscription to one channel. Signals received while nobody is waiting are kept until the next `wait`.
+    """
+
+    def __init__(self, pubsub: "LocalPubSub", channel: str) -> None:
+        self.channel = channel
+        self._pubsub = pubsub
+        self._signalled = threading.Event()
+
+    def notify(self) -> None:
+        self._signalled.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits for a signal on the channel.
+
+        Args:
+            timeout (float, optional): How many seconds to wait for. Defaults to waiting indefinitely.
+
+        Returns:
+            bool: True if the channel was signalled, False if the wait timed out.
+        """
+        signalled = self._signalled.wait(timeout)
+        self._signalled.clear()
+        return signalled
+
+    def close(self) -> None:
+        self._pubsub.unsubscribe(self)
+
+
+class LocalPubSub:
+    """
+    An in-process pub/sub: signals reach subscribers in the same worker process only.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+
+    def subscribe(self, channel: str) -> Subscription:
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.channel]
+
+    def publish(self, channels: Iterable[str]) -> None:
+        """
+        Signals every subscriber of the given channels.
+
+        Args:
+            channels (Iterable[str]): The channels to signal.
+        """
+        with self._lock:
+            subscriptions = [
+                subscription for channel in channels
+                for subscription in self._subscriptions.get(channel, ())
+            ]
+        for subscription in subscriptions:
+            subscription.notify()
+
+
+class RedisPubSub(LocalPubSub):
+    """
+    A pub/sub shared by every worker through Redis. Each worker keeps one Redis subscription, on a
+    background thread, and relays the signals it receives to its local subscribers.
+
+    Args:
+        url (str): The Redis URL.
+        prefix (str, optional): Prefix of the Redis channels used.
+    """
+
+    def __init__(self, url: str, prefix: str = "job-board:") -> None:
+        import redis
+
+        super().__init__()
+        self._prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._redis_pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._redis_pubsub.psubscribe(f"{prefix}*")
+        self._listener = threading.Thread(target=self._listen, name="pubsub-listener", daemon=True)
+        self._listener.start()
+
+    def _listen(self) -> None:
+        for message in self._redis_pubsub.listen():
+            channel = message["channel"].decode()
+            super().publish([channel[len(self._prefix):]])
+
+    def publish(self, channels: Iterable[str]) -> None:
+        pipeline = self._client.pipeline(transaction=False)
+        for channel in channels:
+            pipeline.publish(f"{self._prefix}{channel}", b"")
+        pipeline.execute()
+
+
+_pubsub_lock = threading.Lock()
+
+
+def get_pubsub() -> LocalPubSub:
+    """
+    Gets the application's pub/sub, creating it on first use (see PUBSUB_REDIS_URL).
+    """
+    app = current_app._get_current_object()
+    with _pubsub_lock:
+        pubsub = app.extensions.get("pubsub")
+        if pubsub is None:
+            redis_url = app.config.get("PUBSUB_REDIS_URL")
+            pubsub = app.extensions["pubsub"] = RedisPubSub(redis_url) if redis_url else LocalPubSub()
+        return pubsub
@@ -0,0 +1,418 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+from flask import Flask, Response, current_app, has_app_context, request
+from flask_jwt_extended import get_jwt
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from App.models import CompanyAccount, JobListing
+from App.utils.metrics import record_cache_lookup
+
+"""
+====== RESPONSE CACHE ======
+
+Responses that are the same for every user of a role (e.g. listing searches) are cached, keyed by route,
+query arguments and role:
+    - every worker keeps the responses it served last in an in-process LRU (RESPONSE_CACHE_MAX_ENTRIES);
+    - with RESPONSE_CACHE_BACKEND = "sqlite", workers also share responses through a local SQLite file
+      (RESPONSE_CACHE_PATH, in the instance folder by default), a stand-in for Redis or memcached;
+    - cached data is grouped in namespaces ("listings", "companies"), each with a generation counter
+      that is part of every key. Committing a change to a job listing or company account bumps the
+      generations of its namespaces, so every worker stops using the older entries at once (they are
+      evicted as they age); entries also expire after RESPONSE_CACHE_TTL seconds (0 disables the cache);
+    - every company also has a namespace of its own (`get_company_namespace`), whose generation versions
+      the cached template fragments showing it (see App/utils/fragment_cache.py);
+    - generations are only handed out to other caches (`get_cache_generations`) when they are shared by every
+      worker (RESPONSE_CACHE_BACKEND = "sqlite"): a worker's own counters never see the other workers'
+      commits, so, without a shared backend, data versioned by them is not cached or validated at all.
+"""
+
+LISTINGS_NAMESPACE = "listings"
+COMPANIES_NAMESPACE = "companies"
+
+# Namespaces whose cached data is stale once a model is added, changed or deleted. Companies are part of
+# the listings namespace, as job cards show the company's name and logo.
+INVALIDATED_NAMESPACES = {
+    JobListing: (LISTINGS_NAMESPACE,),
+    CompanyAccount: (LISTINGS_NAMESPACE, COMPANIES_NAMESPACE)
+}
+
+
+
+def get_company_namespace(company_id: int) -> str:
+    return f"{COMPANIES_NAMESPACE}:{company_id}"
+
+
+# Writes to the shared backend between two evictions of its oldest entries
+SQLITE_PRUNE_INTERVAL = 64
+
+
+class MemoryCacheBackend:
+    """
+    A thread-safe in-process LRU cache, with per-namespace generations.
+
+    Args:
+        max_entries (int): The number of entries kept; the least recently used are evicted first.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def get_generations(self, namespaces: Sequence[str]) -> Dict[str, int]:
+        with self._lock:
+            return {namespace: self._generations.get(namespace, 0) for namespace in namespaces}
+
+    def bump_generations(self, namespaces: Iterable[str]) -> None:
+        with self._lock:
+            for namespace in namespaces:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """
+    A cache shared by every worker on the host through an SQLite file, with per-namespace generations.
+    The oldest entries are evicted first once it holds more than `max_entries`.
+
+    Args:
+        path (str): The SQLite file.
+        max_entries (int): The number of entries kept.
+    """
+
+    def __init__(self, path: str, max_entries: int) -> None:
+        self.path = path
+        self._max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+
+        connection = self._connect()
+        with connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_response_cache_expires_at ON response_cache (expires_at)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache_generations "
+                "(namespace TEXT PRIMARY KEY, generation INTEGER NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread (or greenlet, under gevent)
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.path, timeout=5)
+        return connection
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._connect().execute(
+            "SELECT value FROM response_cache WHERE key = ? AND expires_at >= ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl_seconds)
+            )
+
+            self._writes += 1
+            if self._writes % SQLITE_PRUNE_INTERVAL == 0:
+                connection.execute("DELETE FROM response_cache WHERE expires_at < ?", (time.time(),))
+                connection.execute(
+                    "DELETE FROM response_cache WHERE key IN (SELECT key FROM response_cache "
+                    "ORDER BY expires_at LIMIT max(0, (SELECT count(*) FROM response_cache) - ?))",
+                    (self._max_entries,)
+                )
+
+    def get_generations(self, namespaces: Sequence[str]) -> Dict[str, int]:
+        placeholders = ", ".join("?" for _ in namespaces)
+        generations = dict(self._connect().execute(
+            f"SELECT namespace, generation FROM response_cache_generations WHERE namespace IN ({placeholders})",
+            tuple(namespaces)
+        ).fetchall())
+        return {namespace: generations.get(namespace, 0) for namespace in namespaces}
+
+    def bump_generations(self, namespaces: Iterable[str]) -> None:
+        connection = self._connect()
+        with connection:
+            connection.executemany(
+                "INSERT INTO response_cache_generations (namespace, generation) VALUES (?, 1) "
+                "ON CONFLICT (namespace) DO UPDATE SET generation = generation + 1",
+                [(namespace,) for namespace in namespaces]
+            )
+
+
+class ResponseCache:
+    """
+    A two-tier cache: this worker's LRU, in front of an optional backend shared by every worker. When
+    there is a shared backend, generations are read from it, so that invalidations reach every worker.
+
+    Args:
+        ttl_seconds (float): How long entries may be used for.
+        max_entries (int): The size of this worker's LRU.
+        shared (SQLiteCacheBackend, optional): The shared backend.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int, shared: Optional[SQLiteCacheBackend] = None) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.local = MemoryCacheBackend(max_entries)
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def generations(self) -> Union[MemoryCacheBackend, SQLiteCacheBackend]:
+        """
+        Where generations are kept: the shared backend if there is one, else this worker's LRU.
+        """
+        return self.shared if self.shared is not None else self.local
+
+    def make_key(self, namespaces: Sequence[str], *parts: str) -> str:
+        """
+        Builds a key valid until one of the namespaces is invalidated. Call it before computing the
+        value, so that a value computed from data changed meanwhile is stored under an outdated key.
+
+        Args:
+            namespaces (Sequence[str]): The namespaces the value depends on.
+            *parts (str): What identifies the value within them.
+
+        Returns:
+            str: The key.
+        """
+        generations = self.generations.get_generations(namespaces)
+        digest = hashlib.sha256("\0".join(parts).encode()).hexdigest()
+        return ",".join(f"{namespace}.{generations[namespace]}" for namespace in namespaces) + ":" + digest
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value, self.ttl_seconds)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        record_cache_lookup("response", value is not None)
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self.local.set(key, value, self.ttl_seconds)
+        if self.shared is not None:
+            self.shared.set(key, value, self.ttl_seconds)
+
+    def invalidate(self, namespaces: Iterable[str]) -> None:
+        """
+        Makes every entry of the namespaces stale, in every worker.
+
+        Args:
+            namespaces (Iterable[str]): The namespaces to invalidate.
+        """
+        self.generations.bump_generations(namespaces)
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Gets the application's response cache, or None if it is disabled.
+    """
+    return current_app.extensions.get("response_cache")
+
+
+def get_cache_generations(namespaces: Iterable[str]) -> Optional[Dict[str, int]]:
+    """
+    Gets the generations of several namespaces at once. A namespace's generation changes whenever data in
+    the namespace is committed, by any worker.
+
+    Args:
+        namespaces (Iterable[str]): The namespaces (e.g. COMPANIES_NAMESPACE, or `get_company_namespace(id)`).
+
+    Returns:
+        dict, optional: The generation of each namespace, or None if generations are not shared by every
+            worker (the response cache is disabled or has no shared backend).
+    """
+    cache = get_response_cache() if has_app_context() else None
+    if cache is None or cache.shared is None:
+        return None
+    return cache.shared.get_generations(list(dict.fromkeys(namespaces)))
+
+
+def get_cache_generation(namespace: str) -> Optional[int]:
+    """
+    Gets a namespace's generation (see `get_cache_generations`).
+
+    Args:
+        namespace (str): The namespace.
+
+    Returns:
+        int, optional: The generation, or None if generations are not shared by every worker.
+    """
+    generations = get_cache_generations([namespace])
+    return generations[namespace] if generations is not None else None
+
+
+def register_response_cache(app: Flask) -> None:
+    """
+    Sets up the response cache from RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_BACKEND
+    and RESPONSE_CACHE_PATH.
+
+    Args:
+        app (Flask): The application.
+    """
+    ttl_seconds = app.config.get("RESPONSE_CACHE_TTL", 0)
+    if ttl_seconds <= 0:
+        return
+
+    max_entries = app.config.get("RESPONSE_CACHE_MAX_ENTRIES", 1024)
+    shared = None
+    if app.config.get("RESPONSE_CACHE_BACKEND", "memory") == "sqlite":
+        path = app.config.get("RESPONSE_CACHE_PATH") or os.path.join(app.instance_path, "response-cache.db")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        shared = SQLiteCacheBackend(path, max_entries)
+
+    cache = app.extensions["response_cache"] = ResponseCache(ttl_seconds, max_entries, shared)
+    # The database may have changed while no worker was running (e.g. `flask init`)
+    cache.invalidate({namespace for namespaces in INVALIDATED_NAMESPACES.values() for namespace in namespaces})
+
+
+"""
+====== INVALIDATION ======
+"""
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_invalidated_namespaces(session, flush_context) -> None:
+    namespaces = {
+        namespace
+        for instance in list(session.new) + list(session.dirty) + list(session.deleted)
+        for model, model_namespaces in INVALIDATED_NAMESPACES.items() if isinstance(instance, model)
+        for namespace in model_namespaces
+    }
+    namespaces.update(
+        get_company_namespace(instance.id)
+        for instance in list(session.dirty) + list(session.deleted)
+        if isinstance(instance, CompanyAccount) and instance.id is not None
+    )
+    if namespaces:
+        session.info.setdefault("_invalidated_namespaces", set()).update(namespaces)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_namespaces(session) -> None:
+    namespaces = session.info.pop("_invalidated_namespaces", None)
+    if namespaces and has_app_context():
+        cache = get_response_cache()
+        if cache is not None:
+            cache.invalidate(namespaces)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidated_namespaces(session) -> None:
+    session.info.pop("_invalidated_namespaces", None)
+
+
+"""
+====== CACHED VIEWS ======
+"""
+
+
+def _get_request_role() -> str:
+    try:
+        return get_jwt().get("role") or "anonymous"
+    except RuntimeError:
+        # The view does not require (nor verify) a token
+        return "anonymous"
+
+
+def _dump_response(response: Response) -> bytes:
+    headers = [(name, value) for name, value in response.headers.items() if name.lower() != "set-cookie"]
+    return json.dumps({"status": response.status_code, "headers": headers}).encode() + b"\n" + response.get_data()
+
+
+def _load_response(value: bytes) -> Response:
+    metadata, body = value.split(b"\n", 1)
+    metadata = json.loads(metadata)
+    return current_app.response_class(body, status=metadata["status"], headers=metadata["headers"])
+
+
+def cached_response(*namespaces: str) -> Callable:
+    """
+    Caches a GET view's successful responses by route, query arguments and role. Place it below
+    `jwt_required` on authenticated views. The response must not depend on anything else about the user.
+
+    Args:
+        *namespaces (str): The namespaces the response depends on (e.g. LISTINGS_NAMESPACE).
+
+    Returns:
+        Callable: The decorator.
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = get_response_cache()
+            if cache is None or request.method != "GET":
+                return view(*args, **kwargs)
+
+            key = cache.make_key(
+                namespaces,
+                request.endpoint or "",
+                _get_request_role(),
+                json.dumps(kwargs, sort_keys=True, default=str),
+                json.dumps(sorted(request.args.items(multi=True)))
+            )
+            value = cache.get(key)
+            if value is not None:
+                response = _load_response(value)
+                response.headers["X-Cache"] = "HIT"
+                return response
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                cache.set(key, _dump_response(response))
+            response.headers["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
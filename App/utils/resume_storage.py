@@ -0,0 +1,300 @@
+import hashlib
+import os
+import tempfile
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import IO, Dict, List, Optional, Tuple
+
+from flask import Request, current_app
+from sqlalchemy import delete, event, func, inspect, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+from werkzeug.datastructures import FileStorage
+from werkzeug.utils import secure_filename
+
+from App.database import db
+from App.models import JobApplication, ResumeBlob
+
+"""
+====== RESUME STORAGE ======
+
+Resumes are stored once per distinct file, under the SHA-256 of their content
+(RESUME_UPLOAD_FOLDER/<first two hex digits>/<hash><extension>, inside the static folder):
+    - uploads are hashed while Werkzeug parses the request body into its temporary file (see
+      `HashingRequest`), so a file that is already stored is never written again;
+    - new files are streamed into a temporary file next to their destination and moved into place;
+    - every blob counts the job applications using it, kept up to date by a flush hook, and
+      `flask resume gc` removes the blobs no application uses (sparing uploads from the last
+      RESUME_GC_GRACE_SECONDS, which may be about to be used).
+"""
+
+# Bytes copied per read when streaming an upload to disk
+RESUME_COPY_CHUNK_SIZE = 64 * 1024
+
+# Longest file extension kept from an upload's filename (e.g. ".docx")
+RESUME_MAX_EXTENSION_LENGTH = 10
+
+
+class HashingStream:
+    """
+    Wraps the temporary file an upload is parsed into, hashing the upload as it is written.
+
+    Args:
+        stream (IO[bytes]): The temporary file.
+    """
+
+    def __init__(self, stream: IO[bytes]) -> None:
+        self._stream = stream
+        self._sha256 = hashlib.sha256()
+        self.size = 0
+
+    @property
+    def content_hash(self) -> str:
+        return self._sha256.hexdigest()
+
+    def write(self, data: bytes) -> int:
+        self._sha256.update(data)
+        self.size += len(data)
+        return self._stream.write(data)
+
+    def __iter__(self):
+        return iter(self._stream)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class HashingRequest(Request):
+    """
+    The application's request class: uploaded files are hashed as the request body is parsed.
+    """
+
+    def _get_file_stream(
+            self,
+            total_content_length: Optional[int],
+            content_type: Optional[str],
+            filename: Optional[str] = None,
+            content_length: Optional[int] = None
+    ) -> IO[bytes]:
+        return HashingStream(super()._get_file_stream(total_content_length, content_type, filename, content_length))
+
+
+def _get_absolute_path(path: str) -> str:
+    return os.path.join(current_app.static_folder, *path.split("/"))
+
+
+def _spool_to_storage(stream: IO[bytes]) -> Tuple[str, int, str]:
+    # A temporary file next to the blobs, so that it can be moved into place atomically
+    folder = _get_absolute_path(current_app.config.get("RESUME_UPLOAD_FOLDER", "uploads/resumes"))
+    os.makedirs(folder, exist_ok=True)
+
+    sha256 = hashlib.sha256()
+    size = 0
+    descriptor, temp_path = tempfile.mkstemp(prefix=".upload-", dir=folder)
+    try:
+        with os.fdopen(descriptor, "wb") as temp_file:
+            for chunk in iter(lambda: stream.read(RESUME_COPY_CHUNK_SIZE), b""):
+                sha256.update(chunk)
+                size += len(chunk)
+                temp_file.write(chunk)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+    return sha256.hexdigest(), size, temp_path
+
+
+def store_resume(upload: FileStorage) -> str:
+    """
+    Stores an uploaded resume under the SHA-256 of its content, unless the same file is already stored.
+
+    Args:
+        upload (FileStorage): The uploaded file.
+
+    Returns:
+        str: The stored file's path, relative to the static folder (for `JobApplication.resume_file_path`).
+
+    Raises:
+        ValueError: If the file is empty.
+        SQLAlchemyError: For any database-related issues.
+    """
+    extension = os.path.splitext(secure_filename(upload.filename or ""))[1].lower()
+    if len(extension) > RESUME_MAX_EXTENSION_LENGTH:
+        extension = ""
+
+    stream = upload.stream
+    temp_path = None
+    if isinstance(stream, HashingStream) and stream.size:
+        content_hash, size = stream.content_hash, stream.size
+    else:
+        content_hash, size, temp_path = _spool_to_storage(stream)
+
+    try:
+        if not size:
+            raise ValueError("The resume file is empty.")
+
+        blob = db.session.get(ResumeBlob, content_hash)
+        if blob is None:
+            folder = current_app.config.get("RESUME_UPLOAD_FOLDER", "uploads/resumes")
+            path = f"{folder}/{content_hash[:2]}/{content_hash}{extension}"
+            if temp_path is None:
+                stream.seek(0)
+                temp_path = _spool_to_storage(stream)[2]
+
+            os.makedirs(os.path.dirname(_get_absolute_path(path)), exist_ok=True)
+            os.replace(temp_path, _get_absolute_path(path))
+            temp_path = None
+
+            blob = ResumeBlob(content_hash=content_hash, path=path, size=size)
+            db.session.add(blob)
+
+        blob.last_stored_at = datetime.utcnow()
+        db.session.commit()
+        return blob.path
+
+    except IntegrityError:
+        # Stored by a concurrent upload of the same file in the meantime (the file written is identical)
+        db.session.rollback()
+        return db.session.get(ResumeBlob, content_hash).path
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise SQLAlchemyError(f"A database error has occurred: {e}")
+
+    finally:
+        if temp_path is not None:
+            os.remove(temp_path)
+
+
+"""
+====== REFERENCE COUNTS ======
+"""
+
+
+@event.listens_for(Session, "after_flush")
+def _count_resume_references(session, flush_context) -> None:
+    deltas = Counter()
+
+    for application in session.new:
+        if isinstance(application, JobApplication):
+            deltas[application.resume_file_path] += 1
+
+    for application in session.dirty:
+        if isinstance(application, JobApplication):
+            history = inspect(application).attrs.resume_file_path.history
+            for path in history.deleted:
+                deltas[path] -= 1
+            for path in history.added:
+                deltas[path] += 1
+
+    for application in session.deleted:
+        # Only already loaded values: the row is gone, so expired attributes cannot be loaded
+        if isinstance(application, JobApplication):
+            deltas[inspect(application).dict.get("resume_file_path")] -= 1
+
+    # Applications using files stored before content addressing (or none) match no blob and are skipped
+    grouped: Dict[int, List[str]] = {}
+    for path, delta in deltas.items():
+        if path and delta:
+            grouped.setdefault(delta, []).append(path)
+
+    for delta, paths in grouped.items():
+        session.connection().execute(
+            update(ResumeBlob.__table__).where(ResumeBlob.__table__.c.path.in_(paths))
+            .values(ref_count=ResumeBlob.__table__.c.ref_count + delta)
+        )
+
+
+"""
+====== MAINTENANCE ======
+"""
+
+
+def collect_unused_resumes(grace_seconds: Optional[float] = None) -> int:
+    """
+    Recounts every blob's references from the job applications, then deletes the blobs (and files) that
+    no application uses.
+
+    Args:
+        grace_seconds (float, optional): Spare blobs uploaded within this many seconds, whose applications
+            may not be saved yet. Defaults to RESUME_GC_GRACE_SECONDS.
+
+    Returns:
+        int: The number of files deleted.
+
+    Raises:
+        SQLAlchemyError: For any database-related issues.
+    """
+    if grace_seconds is None:
+        grace_seconds = current_app.config.get("RESUME_GC_GRACE_SECONDS", 3600)
+    cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+    table = ResumeBlob.__table__
+
+    try:
+        references = (
+            select(func.count(JobApplication.id))
+            .where(JobApplication.resume_file_path == table.c.path)
+            .scalar_subquery()
+        )
+        db.session.execute(update(table).where(table.c.ref_count != references).values(ref_count=references))
+        paths = db.session.scalars(
+            delete(table).where(table.c.ref_count == 0, table.c.last_stored_at < cutoff).returning(table.c.path)
+        ).all()
+        db.session.commit()
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise SQLAlchemyError(f"A database error has occurred: {e}")
+
+    # Removed once the rows are gone, so that no committed blob ever points at a missing file
+    for path in paths:
+        try:
+            os.remove(_get_absolute_path(path))
+        except FileNotFoundError:
+            pass
+
+    return len(paths)
+
+
+def import_legacy_resumes() -> int:
+    """
+    Moves the resumes of applications made before content addressing into the blob storage, and points
+    the applications at their blobs. The original files are left in place.
+
+    Returns:
+        int: The number of applications updated.
+
+    Raises:
+        SQLAlchemyError: For any database-related issues.
+    """
+    legacy_paths = db.session.scalars(
+        select(JobApplication.resume_file_path).distinct()
+        .where(JobApplication.resume_file_path.not_in(select(ResumeBlob.path)))
+    ).all()
+
+    updated = 0
+    for legacy_path in legacy_paths:
+        absolute_path = _get_absolute_path(legacy_path)
+        if not os.path.isfile(absolute_path):
+            current_app.logger.warning("Resume %s is missing and was not imported", legacy_path)
+            continue
+
+        with open(absolute_path, "rb") as legacy_file:
+            try:
+                path = store_resume(FileStorage(legacy_file, filename=os.path.basename(legacy_path)))
+            except ValueError:
+                continue
+
+        try:
+            # Through the ORM, so that the flush hook counts the new references
+            applications = JobApplication.query.filter_by(resume_file_path=legacy_path).all()
+            for application in applications:
+                application.resume_file_path = path
+            db.session.commit()
+            updated += len(applications)
+
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise SQLAlchemyError(f"A database error has occurred: {e}")
+
+    return updated
@@ -0,0 +1,278 @@
+import re
+from typing import List
+
+from sqlalchemy import DDL, Float, Integer, event, text
+from sqlalchemy.orm import Query, joinedload
+
+from App.database import db
+from App.models import CompanyAccount, JobListing
+
+"""
+====== FULL-TEXT SEARCH INDEX ======
+
+Job listings are indexed on their title, description, position type and the
+registered name of the posting company:
+    - SQLite: an FTS5 virtual table whose rowid is the job listing's ID, ranked with bm25().
+    - PostgreSQL: a side table holding a weighted tsvector per listing with a GIN index, ranked with ts_rank().
+
+Any other dialect (or an SQLite build without FTS5) falls back to the original ILIKE search.
+"""
+
+SQLITE_INDEX_TABLE = "job_listings_fts"
+POSTGRES_INDEX_TABLE = "job_listing_search_documents"
+
+# Column weights for bm25(): title, description, position_type, company_name
+SQLITE_BM25_WEIGHTS = "10.0, 1.0, 2.0, 5.0"
+
+# Only word characters are passed through to the full-text query syntax
+SEARCH_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+# Caches whether the index exists, per database URL
+_index_availability = {}
+
+
+def _sqlite_supports_fts5(ddl, target, bind, **kw) -> bool:
+    compile_options = bind.exec_driver_sql("PRAGMA compile_options").scalars().all()
+    return "ENABLE_FTS5" in compile_options
+
+
+event.listen(
+    db.metadata,
+    "after_create",
+    DDL(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_INDEX_TABLE} USING fts5("
+        "title, description, position_type, company_name, tokenize='unicode61')"
+    ).execute_if(dialect="sqlite", callable_=_sqlite_supports_fts5)
+)
+event.listen(
+    db.metadata,
+    "after_create",
+    DDL(
+        f"CREATE TABLE IF NOT EXISTS {POSTGRES_INDEX_TABLE} ("
+        "job_listing_id INTEGER PRIMARY KEY REFERENCES job_listings(id) ON DELETE CASCADE, "
+        "document TSVECTOR NOT NULL); "
+        f"CREATE INDEX IF NOT EXISTS ix_{POSTGRES_INDEX_TABLE}_document "
+        f"ON {POSTGRES_INDEX_TABLE} USING GIN (document)"
+    ).execute_if(dialect="postgresql")
+)
+event.listen(
+    db.metadata,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {SQLITE_INDEX_TABLE}").execute_if(dialect="sqlite")
+)
+event.listen(
+    db.metadata,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {POSTGRES_INDEX_TABLE}").execute_if(dialect="postgresql")
+)
+
+
+def _dialect_name() -> str:
+    return db.session.get_bind().dialect.name
+
+
+def is_search_index_available() -> bool:
+    """
+    Checks whether the current database supports the full-text search index.
+
+    Returns:
+        bool: True if listings can be searched through the full-text index, False otherwise.
+    """
+    bind = db.session.get_bind()
+    database_url = str(bind.url)
+
+    if database_url not in _index_availability:
+        if bind.dialect.name == "sqlite":
+            _index_availability[database_url] = bool(db.session.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = :name"),
+                {"name": SQLITE_INDEX_TABLE}
+            ).scalar())
+        else:
+            _index_availability[database_url] = bind.dialect.name == "postgresql"
+
+    return _index_availability[database_url]
+
+
+def _get_search_tokens(search_term: str) -> List[str]:
+    return SEARCH_TOKEN_PATTERN.findall(search_term.lower())
+
+
+"""
+====== INDEX MAINTENANCE ======
+"""
+
+
+def index_job_listing(listing: JobListing) -> None:
+    """
+    Adds or replaces a job listing's search document within the current transaction.
+
+    Args:
+        listing (JobListing): The (flushed) job listing to index.
+    """
+    if not is_search_index_available():
+        return
+
+    params = {
+        "id": listing.id,
+        "title": listing.title or "",
+        "description": listing.description or "",
+        "position_type": listing.position_type or "",
+        "company_name": listing.company.registered_name if listing.company else ""
+    }
+
+    if _dialect_name() == "sqlite":
+        db.session.execute(
+            text(f"DELETE FROM {SQLITE_INDEX_TABLE} WHERE rowid = :id"),
+            {"id": listing.id}
+        )
+        db.session.execute(
+            text(
+                f"INSERT INTO {SQLITE_INDEX_TABLE} "
+                "(rowid, title, description, position_type, company_name) "
+                "VALUES (:id, :title, :description, :position_type, :company_name)"
+            ),
+            params
+        )
+    else:
+        db.session.execute(
+            text(
+                f"INSERT INTO {POSTGRES_INDEX_TABLE} (job_listing_id, document) VALUES (:id, "
+                "setweight(to_tsvector('english', :title), 'A') || "
+                "setweight(to_tsvector('english', :company_name), 'A') || "
+                "setweight(to_tsvector('english', :position_type), 'B') || "
+                "setweight(to_tsvector('english', :description), 'C')) "
+                "ON CONFLICT (job_listing_id) DO UPDATE SET document = EXCLUDED.document"
+            ),
+            params
+        )
+
+
+def remove_job_listing_from_index(listing_id: int) -> None:
+    """
+    Removes a job listing's search document within the current transaction.
+
+    Args:
+        listing_id (int): The ID of the job listing to remove.
+    """
+    if not is_search_index_available():
+        return
+
+    if _dialect_name() == "sqlite":
+        db.session.execute(
+            text(f"DELETE FROM {SQLITE_INDEX_TABLE} WHERE rowid = :id"),
+            {"id": listing_id}
+        )
+    else:
+        db.session.execute(
+            text(f"DELETE FROM {POSTGRES_INDEX_TABLE} WHERE job_listing_id = :id"),
+            {"id": listing_id}
+        )
+
+
+def reindex_company_job_listings(company: CompanyAccount) -> None:
+    """
+    Re-indexes every job listing of a company within the current transaction
+    (e.g. after the company's registered name changes).
+
+    Args:
+        company (CompanyAccount): The company whose job listings should be re-indexed.
+    """
+    if not is_search_index_available():
+        return
+
+    for listing in company.job_listings:
+        index_job_listing(listing)
+
+
+def rebuild_search_index() -> int:
+    """
+    Re-indexes every job listing from scratch and commits the result.
+
+    Returns:
+        int: The number of job listings indexed.
+    """
+    if not is_search_index_available():
+        return 0
+
+    table = SQLITE_INDEX_TABLE if _dialect_name() == "sqlite" else POSTGRES_INDEX_TABLE
+    db.session.execute(text(f"DELETE FROM {table}"))
+
+    listings = JobListing.query.options(joinedload(JobListing.company)).all()
+    for listing in listings:
+        index_job_listing(listing)
+
+    db.session.commit()
+    return len(listings)
+
+
+def ensure_search_index() -> None:
+    """
+    Backfills the search index when it is empty but job listings already exist
+    (e.g. the first start-up after the index was introduced on an existing database).
+    """
+    if not is_search_index_available():
+        return
+
+    table = SQLITE_INDEX_TABLE if _dialect_name() == "sqlite" else POSTGRES_INDEX_TABLE
+    index_is_empty = db.session.execute(
+        text(f"SELECT 1 FROM {table} LIMIT 1")).scalar() is None
+
+    if index_is_empty and db.session.query(JobListing.id).first():
+        rebuild_search_index()
+
+
+"""
+====== QUERYING ======
+"""
+
+
+def filter_query_by_search_term(query: Query, search_term: str) -> Query:
+    """
+    Restricts a JobListing query to listings matching the search term, ordered by relevance.
+
+    Every word in the search term must match (as a prefix) the title, description,
+    position type or company name of a listing. A term without words (e.g. "!!!"), or any term
+    when the full-text index is unavailable, is matched literally against titles and company names
+    (newest first).
+
+    Args:
+        query (Query): A query over JobListing.
+        search_term (str): The raw search term entered by the user.
+
+    Returns:
+        Query: The filtered and ranked query.
+    """
+    search_term = search_term.strip()
+    if not search_term:
+        return query
+
+    tokens = _get_search_tokens(search_term)
+    if not tokens or not is_search_index_available():
+        like_pattern = f"%{search_term}%"
+        return query.filter(
+            (JobListing.title.ilike(like_pattern)) |
+            (JobListing.company.has(
+                CompanyAccount.registered_name.ilike(like_pattern)))
+        ).order_by(JobListing.datetime_created.desc(), JobListing.id.desc())
+
+    if _dialect_name() == "sqlite":
+        match_expression = " AND ".join(f'"{token}"*' for token in tokens)
+        ranked_matches = text(
+            f"SELECT rowid AS job_listing_id, bm25({SQLITE_INDEX_TABLE}, {SQLITE_BM25_WEIGHTS}) AS rank "
+            f"FROM {SQLITE_INDEX_TABLE} WHERE {SQLITE_INDEX_TABLE} MATCH :match_expression"
+        ).bindparams(match_expression=match_expression)
+    else:
+        match_expression = " & ".join(f"{token}:*" for token in tokens)
+        ranked_matches = text(
+            "SELECT job_listing_id, -ts_rank(document, to_tsquery('english', :match_expression)) AS rank "
+            f"FROM {POSTGRES_INDEX_TABLE} WHERE document @@ to_tsquery('english', :match_expression)"
+        ).bindparams(match_expression=match_expression)
+
+    ranked_matches = ranked_matches.columns(
+        job_listing_id=Integer, rank=Float
+    ).subquery("ranked_matches")
+
+    return query.join(
+        ranked_matches, ranked_matches.c.job_listing_id == JobListing.id
+    ).order_by(ranked_matches.c.rank, JobListing.id.desc())
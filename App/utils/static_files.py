@@ -0,0 +1,217 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Pattern
+
+from flask import Flask, Response, current_app, request, send_from_directory
+
+"""
+====== STATIC FILE CACHING ======
+
+Static files whose names carry a hash of their content never change: a new version is a new file
+with a new URL. They are served with far-future, immutable cache headers (STATIC_IMMUTABLE_MAX_AGE),
+so browsers stop revalidating them; every other static file keeps Flask's default revalidation.
+
+The application's own assets (style sheets, scripts, images) get such names too, from an asset
+manifest built at startup (see `StaticAssetManifest`):
+    - `url_for('static', filename='style.css')` links to `style.<fingerprint>.css`, which is served
+      from style.css with the fingerprint as its ETag;
+    - compressible assets are gzip (and, with the `brotli` package, Brotli) compressed once, and served
+      compressed to clients that accept it;
+    - user uploads (STATIC_ASSET_EXCLUDED_FOLDERS) are left out, and fingerprinting is off in debug
+      mode (or when STATIC_ASSET_FINGERPRINTING is False) so that edited assets show up right away.
+"""
+
+# Static paths (relative to the static folder) of content-addressed files
+IMMUTABLE_STATIC_FILE_PATTERNS: List[Pattern] = [
+    # Processed profile images (see App/utils/images.py)
+    re.compile(r"^profile-images/[0-9a-f]{16}(-thumb|-original)?\.[a-z0-9]+$"),
+]
+
+
+# Only compressed copies this much smaller than the original are kept
+STATIC_ASSET_MIN_COMPRESSION_RATIO = 0.9
+
+_COMPRESSIBLE_MIMETYPES = {"application/javascript", "application/json", "image/svg+xml", "image/vnd.microsoft.icon"}
+
+
+@dataclass
+class StaticAsset:
+    """
+    An application asset in the manifest.
+
+    Attributes:
+        path (str): The asset's path, relative to the static folder.
+        fingerprinted_path (str): The path it is linked as (`<name>.<fingerprint><extension>`).
+        fingerprint (str): The first 16 hex digits of the SHA-256 of its content.
+        mimetype (str): The asset's mimetype.
+        encodings (Dict[str, bytes]): Content-Encoding mapped to the precompressed content.
+    """
+
+    path: str
+    fingerprinted_path: str
+    fingerprint: str
+    mimetype: str
+    encodings: Dict[str, bytes] = field(default_factory=dict)
+
+
+def _is_compressible(mimetype: str) -> bool:
+    return mimetype.startswith("text/") or mimetype in _COMPRESSIBLE_MIMETYPES
+
+
+def _compress(content: bytes) -> Dict[str, bytes]:
+    encodings = {"gzip": gzip.compress(content, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+        encodings["br"] = brotli.compress(content)
+    except ImportError:
+        pass
+
+    return {
+        encoding: compressed for encoding, compressed in encodings.items()
+        if len(compressed) < len(content) * STATIC_ASSET_MIN_COMPRESSION_RATIO
+    }
+
+
+class StaticAssetManifest:
+    """
+    Maps the application's static assets to fingerprinted paths, and holds their precompressed content.
+
+    Args:
+        static_folder (str): The static folder.
+        excluded_folders (List[str]): Folders (relative to the static folder) left out, e.g. user uploads.
+        max_precompressed_bytes (int): Larger assets are not precompressed.
+    """
+
+    def __init__(self, static_folder: str, excluded_folders: List[str], max_precompressed_bytes: int) -> None:
+        self._assets: Dict[str, StaticAsset] = {}
+        self._fingerprinted: Dict[str, StaticAsset] = {}
+        excluded = tuple(folder.strip("/") + "/" for folder in excluded_folders)
+
+        for root, folders, files in os.walk(static_folder):
+            folders[:] = [folder for folder in folders if not folder.startswith(".")]
+            for name in files:
+                path = os.path.relpath(os.path.join(root, name), static_folder).replace(os.sep, "/")
+                if name.startswith(".") or path.startswith(excluded):
+                    continue
+
+                with open(os.path.join(root, name), "rb") as asset_file:
+                    content = asset_file.read()
+
+                fingerprint = hashlib.sha256(content).hexdigest()[:16]
+                stem, extension = os.path.splitext(path)
+                mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                asset = StaticAsset(path, f"{stem}.{fingerprint}{extension}", fingerprint, mimetype)
+                if _is_compressible(mimetype) and len(content) <= max_precompressed_bytes:
+                    asset.encodings = _compress(content)
+
+                self._assets[path] = asset
+                self._fingerprinted[asset.fingerprinted_path] = asset
+
+    def __len__(self) -> int:
+        return len(self._assets)
+
+    def __iter__(self):
+        return iter(self._assets.values())
+
+    def get(self, path: str) -> Optional[StaticAsset]:
+        return self._assets.get(path)
+
+    def get_fingerprinted(self, fingerprinted_path: str) -> Optional[StaticAsset]:
+        return self._fingerprinted.get(fingerprinted_path)
+
+
+def get_static_asset_manifest() -> Optional[StaticAssetManifest]:
+    """
+    Gets the application's asset manifest, or None if fingerprinting is off.
+    """
+    return current_app.extensions.get("static_assets")
+
+
+def is_immutable_static_file(filename: str) -> bool:
+    """
+    Checks whether a static file is content-addressed, and therefore never changes.
+
+    Args:
+        filename (str): The file's path, relative to the static folder.
+
+    Returns:
+        bool: True if the file is content-addressed.
+    """
+    manifest = get_static_asset_manifest()
+    if manifest is not None and manifest.get_fingerprinted(filename) is not None:
+        return True
+    return any(pattern.match(filename) for pattern in IMMUTABLE_STATIC_FILE_PATTERNS)
+
+
+def _serve_static_file(filename: str) -> Response:
+    manifest = get_static_asset_manifest()
+    asset = manifest.get_fingerprinted(filename) if manifest is not None else None
+    if asset is None:
+        return current_app.send_static_file(filename)
+
+    # Preferred in the client's order of preference (quality), as long as it was precompressed
+    encoding = next(
+        (encoding for encoding, _ in request.accept_encodings if encoding in asset.encodings), None
+    )
+    if encoding is None:
+        response = send_from_directory(current_app.static_folder, asset.path, etag=asset.fingerprint)
+    else:
+        response = current_app.response_class(asset.encodings[encoding], mimetype=asset.mimetype)
+        response.content_encoding = encoding
+        response.set_etag(f"{asset.fingerprint}-{encoding}")
+        response.make_conditional(request)
+
+    if asset.encodings:
+        response.vary.add("Accept-Encoding")
+    return response
+
+
+def register_static_asset_manifest(app: Flask) -> None:
+    """
+    Builds the asset manifest, links `url_for('static', ...)` to fingerprinted paths and serves them.
+    Does nothing in debug mode or when STATIC_ASSET_FINGERPRINTING is False.
+
+    Args:
+        app (Flask): The application.
+    """
+    if app.debug or not app.config.get("STATIC_ASSET_FINGERPRINTING", True) or not app.static_folder:
+        return
+
+    manifest = app.extensions["static_assets"] = StaticAssetManifest(
+        app.static_folder,
+        app.config.get("STATIC_ASSET_EXCLUDED_FOLDERS", ["profile-images", "uploads"]),
+        app.config.get("STATIC_ASSET_MAX_PRECOMPRESSED_BYTES", 1048576)
+    )
+    app.view_functions["static"] = _serve_static_file
+
+    @app.url_defaults
+    def _link_fingerprinted_assets(endpoint: str, values: dict) -> None:
+        if endpoint == "static" and "filename" in values:
+            asset = manifest.get(values["filename"])
+            if asset is not None:
+                values["filename"] = asset.fingerprinted_path
+
+
+def register_static_cache_headers(app: Flask) -> None:
+    """
+    Serves content-addressed static files with far-future, immutable cache headers.
+
+    Args:
+        app (Flask): The application.
+    """
+
+    @app.after_request
+    def _cache_immutable_static_files(response: Response) -> Response:
+        if request.endpoint != "static" or response.status_code not in (200, 304):
+            return response
+
+        if is_immutable_static_file((request.view_args or {}).get("filename", "")):
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = app.config.get("STATIC_IMMUTABLE_MAX_AGE", 31536000)
+            response.cache_control.immutable = True
+        return response
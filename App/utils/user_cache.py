@@ -0,0 +1,98 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple, Type
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from App.database import db
+from App.models import BaseUserAccount
+
+"""
+====== AUTHENTICATED USER CACHE ======
+
+Access tokens carry the user's role and ID, so the user behind a request can be loaded by
+primary key. This module optionally keeps those users for a few seconds across requests
+(USER_CACHE_TTL, 0 disables it):
+    - entries are snapshots of the account's column values, never live instances, so they can
+      be shared between requests and threads and are re-attached with `Session.merge(load=False)`
+      without a query;
+    - any flush that updates or deletes an account drops its entry, wherever the change was made.
+"""
+
+
+class UserCache:
+    """
+    A thread-safe TTL cache of account snapshots keyed by (model, ID).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[Type[BaseUserAccount], int], Tuple[float, dict]] = {}
+
+    def get(self, model: Type[BaseUserAccount], id: int) -> Optional[BaseUserAccount]:
+        """
+        Gets a cached account, attached to the current session without querying the database.
+
+        Args:
+            model (Type[BaseUserAccount]): The account model.
+            id (int): The account's ID.
+
+        Returns:
+            Optional[BaseUserAccount]: The account, or None if it is not cached (or has expired).
+        """
+        with self._lock:
+            entry = self._entries.get((model, id))
+            if entry is None:
+                return None
+
+            expires_at, values = entry
+            if expires_at < time.monotonic():
+                del self._entries[(model, id)]
+                return None
+
+        user = model.__mapper__.class_manager.new_instance()
+        for key, value in values.items():
+            set_committed_value(user, key, value)
+        make_transient_to_detached(user)
+
+        return db.session.merge(user, load=False)
+
+    def set(self, user: BaseUserAccount, ttl_seconds: float) -> None:
+        """
+        Caches a snapshot of a (loaded) account.
+
+        Args:
+            user (BaseUserAccount): The account to cache.
+            ttl_seconds (float): How long the snapshot may be used for.
+        """
+        values = {attr.key: getattr(user, attr.key) for attr in inspect(type(user)).column_attrs}
+        with self._lock:
+            self._entries[(type(user), user.id)] = (time.monotonic() + ttl_seconds, values)
+
+    def invalidate(self, model: Type[BaseUserAccount], id: int) -> None:
+        """
+        Drops an account from the cache.
+
+        Args:
+            model (Type[BaseUserAccount]): The account model.
+            id (int): The account's ID.
+        """
+        with self._lock:
+            self._entries.pop((model, id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# One cache per worker process
+user_cache = UserCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed_accounts(session, flush_context) -> None:
+    for instance in list(session.dirty) + list(session.deleted):
+        if isinstance(instance, BaseUserAccount) and instance.id is not None:
+            user_cache.invalidate(type(instance), instance.id)
@@ -1,8 +1,6 @@
-import os
 from flask import Blueprint, current_app, flash, make_response, redirect, render_template, request, url_for, jsonify
 from flask_jwt_extended import current_user, jwt_required, unset_jwt_cookies
-from App.models import db, JobListing, AdminAccount
-from werkzeug.utils import secure_filename
+from App.models import db, JobApplication, JobListing, AdminAccount
 
 
 from App.controllers.admin_account import get_admin_account, update_admin_account
@@ -15,23 +13,24 @@ from App.controllers.job_listing import (
 
 from App.controllers.alumnus_account import get_alumnus_account
 from App.controllers.company_account import get_company_account
-from App.controllers.company_subscription import get_company_subscriptions_by_company_id
 from App.controllers.job_listing import (
     get_job_listing,
     delete_job_listing
 )
+from App.controllers.listing_digests import publish_listing_event_to_subscribers
+from App.controllers.notification_counts import get_unread_notification_count
+from App.controllers.notification_events import notification_stream_response
+from App.utils.db_utils import encode_cursor, get_next_cursor, get_pagination_args, iter_json_records, stream_json_array
 from App.controllers.notifications import (
+    get_unread_notifications_by_account,
     mark_notification_as_reviewed,
-    notify_company_account,
-    notify_subscribed_alumni
+    mark_notifications_as_reviewed,
+    notify_company_account
 )
 
 from App.models.notification import Notification
-from App.utils.email import (
-    send_job_published_email,
-    send_job_unpublished_email,
-    send_job_deleted_email
-)
+from App.utils.email import send_listing_event_emails
+from App.utils.images import save_profile_image
 
 admin_views = Blueprint(
     'admin_views',
@@ -67,19 +66,16 @@ def publish_job(job_id):
         f"Your job listing, {approved_listing.title} has been published!",
         company.id
     )
-    send_job_published_email(company, approved_listing, company)
+    # Emails are written to the outbox in one batch and delivered by the background sender
+    send_listing_event_emails("published", [company], approved_listing, company)
 
-    notify_subscribed_alumni(
-        f"{company.registered_name} posted a new listing, {approved_listing.title}!",
-        company.id
+    # Subscribers are notified right away, or in their next digest (see App/controllers/listing_digests.py)
+    publish_listing_event_to_subscribers(
+        "published",
+        approved_listing,
+        company,
+        f"{company.registered_name} posted a new listing, {approved_listing.title}!"
     )
-    for subscription in get_company_subscriptions_by_company_id(company.id):
-        alumnus_obj = get_alumnus_account(subscription.alumnus_id)
-        send_job_published_email(
-            alumnus_obj,
-            approved_listing,
-            company
-        )
 
     flash('Job published successfully!', 'success')
     return redirect(url_for(INDEX_PAGE_ROUTE))
@@ -107,23 +103,14 @@ def unpublish_job(job_id):
         f"Your job listing, {unapproved_listing.title} has been temporarily unpublished!",
         company.id
     )
-    send_job_unpublished_email(
-        company,
-        unapproved_listing,
-        company
-    )
+    send_listing_event_emails("unpublished", [company], unapproved_listing, company)
 
-    notify_subscribed_alumni(
-        f"The job listing {unapproved_listing.title} by company {company.registered_name} has been temporarily unpublished.",
-        company.id
+    publish_listing_event_to_subscribers(
+        "unpublished",
+        unapproved_listing,
+        company,
+        f"The job listing {unapproved_listing.title} by company {company.registered_name} has been temporarily unpublished."
     )
-    for subscription in get_company_subscriptions_by_company_id(company.id):
-        alumnus_obj = get_alumnus_account(subscription.alumnus_id)
-        send_job_unpublished_email(
-            alumnus_obj,
-            unapproved_listing,
-            company
-        )
 
     flash('Job unpublished successfully!', 'success')
     return redirect(url_for(INDEX_PAGE_ROUTE))
@@ -156,19 +143,14 @@ def delete_listing_action(job_id):
             f"Your job listing, {temp_listing_copy.title} has been deleted!",
             company.id
         )
-        send_job_deleted_email(company, temp_listing_copy, company)
+        send_listing_event_emails("deleted", [company], temp_listing_copy, company)
 
-        notify_subscribed_alumni(
-            f"{company.registered_name}'s listing, {temp_listing_copy.title} has been deleted!",
-            company.id
+        publish_listing_event_to_subscribers(
+            "deleted",
+            temp_listing_copy,
+            company,
+            f"{company.registered_name}'s listing, {temp_listing_copy.title} has been deleted!"
         )
-        for subscription in get_company_subscriptions_by_company_id(company.id):
-            alumnus_obj = get_alumnus_account(subscription.alumnus_id)
-            send_job_deleted_email(
-                alumnus_obj,
-                temp_listing_copy,
-                company
-            )
 
         flash('Job listing deleted!', 'success')
 
@@ -245,19 +227,9 @@ def update_profile_photo(id):
 
     if file:
         try:
-            # Ensure secure filename
-            filename = secure_filename(file.filename)
-
-            # Build absolute path to save
-            save_folder = os.path.join(current_app.root_path, 'static', 'profile-images')
-            os.makedirs(save_folder, exist_ok=True)
-
-            # Save file
-            file_path = os.path.join(save_folder, filename)
-            file.save(file_path)
-
-            # Save relative path in DB (for use with url_for('static', filename=...))
-            relative_path = f"profile-images/{filename}"
+            # Resized, re-encoded and stored under a content-hashed name (see App/utils/images.py).
+            # Relative to the static folder, for use with url_for('static', filename=...)
+            relative_path = save_profile_image(file)
 
             # Update database
             admin = get_admin_account(id)
@@ -301,11 +273,17 @@ def view_notifications_page():
 
     try:
         # Fetch notifications for the alumnus
-        notifications = current_user.notifications.filter_by(reviewed_by_user=False).all()
-        return render_template('admin_notifications.html', notifications=notifications, admin=current_user)
+        # Only the first page is rendered, the rest are loaded on demand
+        page_size = current_app.config.get('NOTIFICATION_PAGE_SIZE', 20)
+        notifications = get_unread_notifications_by_account(current_user, limit=page_size)
+        return render_template(
+            'admin_notifications.html', notifications=notifications, admin=current_user,
+            next_cursor=get_next_cursor(notifications, page_size),
+            mark_all_cursor=encode_cursor(notifications[0].created_at, notifications[0].id) if notifications else None
+        )
 
     except Exception as e:
-        print(f"[ERROR] Failed to retrieve admin notifications: {e}")
+        current_app.logger.exception("Failed to retrieve admin notifications: %s", e)
         flash('Error retrieving notifications.', 'unsuccessful')
         return redirect(url_for(INDEX_PAGE_ROUTE))
 
@@ -327,13 +305,103 @@ def check_notifications():
         flash('Unauthorized access', 'unsuccessful')
         return redirect(url_for('index_views.index_page'))
 
-    # Fetch unread notifications for the current user
-    unread_notifications = Notification.query.filter_by(
-    admin_id=current_user.id, reviewed_by_user=False).all()
+    # Read the account's unread counter rather than loading its unread notifications
+    unread_count = get_unread_notification_count(current_user)
+    return jsonify({'has_new_notifications': unread_count > 0, 'unread_count': unread_count})
+
+
+@admin_views.route('/admin_notifications/stream', methods=['GET'])
+@jwt_required()
+def stream_notifications():
+    """
+    Streams the current admin's new notifications as Server-Sent Events.
+    """
+    if not isinstance(current_user, AdminAccount):
+        return jsonify({'error': 'Unauthorized access'}), 403
+
+    return notification_stream_response(current_user)
+
+
+@admin_views.route('/admin_notifications/page', methods=['GET'])
+@jwt_required()
+def get_notifications_page():
+    """
+    Returns a page of the current admin's unread notifications as JSON, newest first.
+    The cursor of the next page (if any) is returned in the X-Next-Cursor header.
+    """
+    if not isinstance(current_user, AdminAccount):
+        return jsonify({'error': 'Unauthorized access'}), 403
+
+    limit, after = get_pagination_args(
+        request.args,
+        current_app.config.get('NOTIFICATION_PAGE_SIZE', 20),
+        current_app.config.get('NOTIFICATION_MAX_PAGE_SIZE', 100)
+    )
+    try:
+        notifications = get_unread_notifications_by_account(current_user, True, limit, after)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    response = jsonify(notifications)
+    next_cursor = get_next_cursor(notifications, limit)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+
+@admin_views.route('/update/admin/notification_status', methods=['POST'])
+@jwt_required()
+def bulk_notification_status():
+    """
+    Marks several of the current admin's notifications as read in one UPDATE, given either a list
+    of `ids` or a `through` cursor (the newest notification to mark) in the JSON body.
+    """
+    if not isinstance(current_user, AdminAccount):
+        return jsonify({'success': False, 'message': 'Unauthorized access'}), 403
+
+    data = request.get_json(silent=True) or {}
+    try:
+        updated = mark_notifications_as_reviewed(current_user, data.get('ids'), data.get('through'))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    return jsonify({'success': True, 'updated': updated}), 200
+
+"""
+====== EXPORTS ======
+"""
+
+@admin_views.route('/api/export/listings', methods=['GET'])
+@jwt_required()
+def export_listings():
+    """
+    Streams every job listing (only those with the approval `status` given, if any) as a JSON array.
+    """
+    if not isinstance(current_user, AdminAccount):
+        return jsonify({'error': 'Unauthorized access'}), 403
+
+    query = JobListing.query.order_by(JobListing.id)
+    status = request.args.get('status')
+    if status:
+        query = query.filter(JobListing.admin_approval_status == status.upper())
+    return stream_json_array(iter_json_records(query))
+
+
+@admin_views.route('/api/export/applications', methods=['GET'])
+@jwt_required()
+def export_applications():
+    """
+    Streams every job application (only those to the `job_listing_id` given, if any) as a JSON array.
+    """
+    if not isinstance(current_user, AdminAccount):
+        return jsonify({'error': 'Unauthorized access'}), 403
+
+    query = JobApplication.query.order_by(JobApplication.id)
+    job_listing_id = request.args.get('job_listing_id', type=int)
+    if job_listing_id is not None:
+        query = query.filter(JobApplication.job_listing_id == job_listing_id)
+    return stream_json_array(iter_json_records(query))
 
-    # Determine if there are new notifications
-    has_new_notifications = len(unread_notifications) > 0
-    return jsonify({'has_new_notifications': has_new_notifications})
 
 """
 ====== API TESTING ======
@@ -1,8 +1,12 @@
-import os
 from flask import Blueprint, current_app, flash,  jsonify, make_response, redirect, render_template, request, url_for
-from App.controllers.notifications import mark_notification_as_reviewed
+from App.controllers.notification_counts import get_unread_notification_count
+from App.controllers.notification_events import notification_stream_response
+from App.controllers.notifications import (
+    get_unread_notifications_by_account,
+    mark_notification_as_reviewed,
+    mark_notifications_as_reviewed
+)
 from App.models import db
-from werkzeug.utils import secure_filename
 
 from flask_jwt_extended import current_user, jwt_required, unset_jwt_cookies
 
@@ -20,10 +24,26 @@ from App.controllers.company_subscription import (
     add_company_subscription,
     get_company_subscription
 )
-from App.controllers.job_listing import get_job_listing, get_job_listing_by_similar_description, get_job_listings_by_company_id, get_job_listings_by_exact_position_type, get_job_listings_by_salary_range, get_job_listings_by_similar_position_type, get_job_listings_by_similar_title
+from App.controllers.job_listing import get_approved_job_listings_by_company_id, get_job_listing, get_job_listing_by_similar_description, get_job_listings_by_company_id, get_job_listings_by_exact_position_type, get_job_listings_by_salary_range, get_job_listings_by_similar_position_type, get_job_listings_by_similar_title, queue_listing_search_index_refresh
 from App.controllers.saved_job_listing import get_saved_job_listings_by_alumnus_id
 from App.controllers.company_account import get_company_account
+from App.controllers.listing_validators import (
+    get_company_listings_validators,
+    get_listing_page_validators,
+    get_listing_search_validators,
+    get_saved_listings_validators
+)
 from App.models.job_listing import JobListing
+from App.utils.conditional_requests import conditional_view
+from App.utils.db_utils import (
+    decode_cursor, decode_rank_cursor, encode_cursor, encode_rank_cursor, get_next_cursor, get_pagination_args,
+    paginate_by_keyset
+)
+from App.utils.images import get_thumbnail_path, save_profile_image
+from App.utils.listing_index import listing_search_index
+from App.utils.response_cache import LISTINGS_NAMESPACE, cached_response
+from App.utils.resume_storage import store_resume
+from App.utils.search_index import filter_query_by_search_term
 
 alumnus_views = Blueprint(
     'alumnus_views',
@@ -108,19 +128,9 @@ def update_profile_photo(id):
 
     if file:
         try:
-            # Ensure secure filename
-            filename = secure_filename(file.filename)
-
-            # Build absolute path to save
-            save_folder = os.path.join(current_app.root_path, 'static', 'profile-images')
-            os.makedirs(save_folder, exist_ok=True)
-
-            # Save file
-            file_path = os.path.join(save_folder, filename)
-            file.save(file_path)
-
-            # Save relative path in DB (for use with url_for('static', filename=...))
-            relative_path = f"profile-images/{filename}"
+            # Resized, re-encoded and stored under a content-hashed name (see App/utils/images.py).
+            # Relative to the static folder, for use with url_for('static', filename=...)
+            relative_path = save_profile_image(file)
 
             # Update database
             alumnus = get_alumnus_account(id)
@@ -221,10 +231,11 @@ def subscribe_action():
 
 @alumnus_views.route('/view_listing_alumnus/<id>', methods=["GET"])
 @jwt_required()
+@conditional_view(lambda id: get_listing_page_validators(id, current_user))
 def view_listing_page(id):
     user=current_user
     listing = get_job_listing(id)
-    saved_listings = get_saved_job_listings_by_alumnus_id(user.id)
+    saved_listings = get_saved_job_listings_by_alumnus_id(user.id, loading_profile="saved_listing_with_listing")
 
     try:
         return render_template('view-listing-alumnus.html', listing=listing, saved_listings=saved_listings, user=user)
@@ -238,6 +249,7 @@ def view_listing_page(id):
 
 @alumnus_views.route('/get_saved_listing', methods=['GET'])
 @jwt_required()
+@conditional_view(lambda: get_saved_listings_validators(current_user))
 def get_saved_job_listing():
     if not isinstance(current_user, AlumnusAccount):
         flash('Unauthorized access', 'unsuccessful')
@@ -308,18 +320,13 @@ def apply(job_listing_id):
    
     # Get form data
     work_experience = request.form.get("work-experience")
-    resume = request.files["resume"]
-
-    # Secure and save filename
-    filename = secure_filename(resume.filename)
-    static_folder = os.path.join(current_app.root_path, 'static')
-    resume_path = os.path.join(static_folder, 'uploads', 'resumes', filename)
-    file_path = os.path.join('uploads', 'resumes', filename)
-
-    # Save the file to the directory
-    resume.save(resume_path)  # This actually writes the file!
-    resume_path = resume_path.replace("\\", "/")
-    file_path = file_path.replace("\\", "/")
+
+    # Stored once per distinct file, under the SHA-256 of its content (see App/utils/resume_storage.py)
+    try:
+        file_path = store_resume(request.files["resume"])
+    except ValueError as e:
+        flash(str(e), "unsuccessful")
+        return redirect(url_for('index_views.index_page'))
     alumnus_id = current_user.id
 
     # Create a new JobApplication record
@@ -349,12 +356,18 @@ def view_notifications_page():
 
     try:
         # Fetch unread notifications for the alumnus
-        notifications = current_user.notifications.filter_by(reviewed_by_user=False).all()
-        return render_template('alumnus_notifications.html', notifications=notifications, alumnus=current_user)
+        # Only the first page is rendered, the rest are loaded on demand
+        page_size = current_app.config.get('NOTIFICATION_PAGE_SIZE', 20)
+        notifications = get_unread_notifications_by_account(current_user, limit=page_size)
+        return render_template(
+            'alumnus_notifications.html', notifications=notifications, alumnus=current_user,
+            next_cursor=get_next_cursor(notifications, page_size),
+            mark_all_cursor=encode_cursor(notifications[0].created_at, notifications[0].id) if notifications else None
+        )
 
     except Exception as e:
         flash('Error retrieving notifications', 'unsuccessful')
-        print(f'Error retrieving notifications: {e}')
+        current_app.logger.exception("Failed to retrieve alumnus notifications: %s", e)
         return redirect(url_for('index_views.index_page'))
 
 @alumnus_views.route('/update/alumnus/notification_status/<int:notification_id>', methods=['POST'])
@@ -377,32 +390,105 @@ def check_notifications():
         flash('Unauthorized access', 'unsuccessful')
         return redirect(url_for('index_views.index_page'))
 
-    # Fetch unread notifications for the current user
-    unread_notifications = Notification.query.filter_by(
-    alumnus_id=current_user.id, reviewed_by_user=False).all()
+    # Read the account's unread counter rather than loading its unread notifications
+    unread_count = get_unread_notification_count(current_user)
+    return jsonify({'has_new_notifications': unread_count > 0, 'unread_count': unread_count})
+
+
+@alumnus_views.route('/alumnus_notifications/stream', methods=['GET'])
+@jwt_required()
+def stream_notifications():
+    """
+    Streams the current alumnus's new notifications as Server-Sent Events.
+    """
+    if not isinstance(current_user, AlumnusAccount):
+        return jsonify({'error': 'Unauthorized access'}), 403
+
+    return notification_stream_response(current_user)
 
-    # Determine if there are new notifications
-    has_new_notifications = len(unread_notifications) > 0
-    return jsonify({'has_new_notifications': has_new_notifications})
+
+@alumnus_views.route('/alumnus_notifications/page', methods=['GET'])
+@jwt_required()
+def get_notifications_page():
+    """
+    Returns a page of the current alumnus's unread notifications as JSON, newest first.
+    The cursor of the next page (if any) is returned in the X-Next-Cursor header.
+    """
+    if not isinstance(current_user, AlumnusAccount):
+        return jsonify({'error': 'Unauthorized access'}), 403
+
+    limit, after = get_pagination_args(
+        request.args,
+        current_app.config.get('NOTIFICATION_PAGE_SIZE', 20),
+        current_app.config.get('NOTIFICATION_MAX_PAGE_SIZE', 100)
+    )
+    try:
+        notifications = get_unread_notifications_by_account(current_user, True, limit, after)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    response = jsonify(notifications)
+    next_cursor = get_next_cursor(notifications, limit)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+
+@alumnus_views.route('/update/alumnus/notification_status', methods=['POST'])
+@jwt_required()
+def bulk_notification_status():
+    """
+    Marks several of the current alumnus's notifications as read in one UPDATE, given either a list
+    of `ids` or a `through` cursor (the newest notification to mark) in the JSON body.
+    """
+    if not isinstance(current_user, AlumnusAccount):
+        return jsonify({'success': False, 'message': 'Unauthorized access'}), 403
+
+    data = request.get_json(silent=True) or {}
+    try:
+        updated = mark_notifications_as_reviewed(current_user, data.get('ids'), data.get('through'))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    return jsonify({'success': True, 'updated': updated}), 200
 
 @alumnus_views.route('/view_company_listings/<id>', methods=['GET'])
 @jwt_required()
+@conditional_view(lambda id: get_company_listings_validators(id, current_user))
 def view_company_listings(id):
     user=current_user
     company=get_company_account(id)
-    #Retrieve all listings of a company regardless of status
-    company_listings = get_job_listings_by_company_id(id)
-    #Used to filter only approved/published listings to the alumnus to render to the front end
-    approved_company_listings = [job for job in company_listings if job.admin_approval_status=="APPROVED"] 
+    #Only the first page of the approved/published listings is rendered, the rest are loaded while scrolling
+    page_size = current_app.config.get('LISTING_PAGE_SIZE', 20)
+    approved_company_listings = get_approved_job_listings_by_company_id(
+        id, limit=page_size, loading_profile="listing_card"
+    )
     #Retrieves the job listings saved by an alumnus, for rendering to front end
-    saved = get_saved_job_listings_by_alumnus_id(user.id)
-    return render_template('alumnus-company-listings.html', user=user, company_listings=approved_company_listings, saved=saved, company=company)
+    saved = get_saved_job_listings_by_alumnus_id(user.id, loading_profile="saved_listing_with_listing")
+    return render_template('alumnus-company-listings.html', user=user, company_listings=approved_company_listings, next_cursor=get_next_cursor(approved_company_listings, page_size), saved=saved, company=company)
 
-@alumnus_views.route('/search_listings', methods=['GET'])
-@jwt_required()
-def search_jobs():
+def search_approved_listings():
+    """
+    Searches the approved/published listings using the search bar term and filters in the request.
+
+    Answered from this worker's in-memory index when it is warm, otherwise from the database
+    (after which the index is rebuilt in the background for the following searches).
+
+    Results are returned one page (`limit`) at a time, and the next page starts `after` the cursor
+    returned with the previous one. Without a search term, listings are ordered newest first and
+    the cursor is the last listing's position; ranked searches are ordered by relevance and the
+    cursor counts the matches already returned.
+
+    Returns:
+        Tuple[List[dict], Optional[str]]:
+            The matching listings, in the format used by the front end to render job cards,
+            and the cursor of the next page (None if there is none).
+
+    Raises:
+        ValueError: If the pagination cursor is malformed.
+    """
     #input by the user in search bar
-    search_term = request.args.get('search','')
+    search_term = request.args.get('search','').strip()
     #chosen postion type
     position_type = request.args.get('position')
     #chosen address
@@ -410,25 +496,68 @@ def search_jobs():
     #Salary range
     min_salary = request.args.get('min_salary', type=int)
     max_salary = request.args.get('max_salary', type=int)
+    #Used by the company listings page
+    company_id = request.args.get('company_id', type=int)
+    #Page size and position
+    limit, after = get_pagination_args(
+        request.args,
+        current_app.config.get('LISTING_PAGE_SIZE', 20),
+        current_app.config.get('LISTING_MAX_PAGE_SIZE', 100)
+    )
+    #Ranked searches are paged by position in the ranking, other listings by keyset
+    offset = 0
+    if search_term:
+        offset = decode_rank_cursor(after) if after else 0
+        after = None
+
+    use_index = current_app.config.get('LISTING_SEARCH_INDEX_ENABLED') and listing_search_index.check_consistency(
+        current_app.config.get('LISTING_SEARCH_INDEX_CHECK_INTERVAL', 30)
+    )
+
+    if use_index:
+        jobs = listing_search_index.search(
+            search_term, position_type, job_site_address, min_salary, max_salary,
+            company_id=company_id, limit=limit, after=decode_cursor(after) if after else None, offset=offset
+        )
+        #Company names and logos are read from the database, as another worker may have just changed them
+        companies = {
+            company.id: (company.registered_name, company.profile_photo_file_path)
+            for company in db.session.query(
+                CompanyAccount.id, CompanyAccount.registered_name, CompanyAccount.profile_photo_file_path
+            ).filter(CompanyAccount.id.in_({job['company_id'] for job in jobs}))
+        } if jobs else {}
+        job_data = []
+        for job in jobs:
+            company_name, company_logo = companies.get(job['company_id'], (job['company_name'], job['company_logo']))
+            job_data.append({
+                'id': job['id'],
+                'title': job['title'],
+                'position_type': job['position_type'],
+                'job_site_address': job['job_site_address'],
+                'company_name': company_name,
+                'company_logo': url_for('static', filename=get_thumbnail_path(company_logo))
+            })
+
+        next_cursor = None
+        if len(jobs) == limit:
+            next_cursor = encode_rank_cursor(offset + limit) if search_term else encode_cursor(
+                jobs[-1]['datetime_created'], jobs[-1]['id']
+            )
+        return job_data, next_cursor
 
     #Ensure it only searches approved/published listings
-    query = JobListing.query.filter_by(admin_approval_status='APPROVED')
+    query = JobListing.query.filter(JobListing.admin_approval_status == 'APPROVED')
     
-    #Once term is retrieved from input, see if it matches any company names or job titles 
+    #Once term is retrieved from input, rank listings by how well their title, description, position type or company name match it
     if search_term:
-        search_term = search_term.strip()
-        like_pattern = f"%{search_term}%"
-        query = query.filter(
-            (JobListing.title.ilike(like_pattern)) |
-            (JobListing.company.has(CompanyAccount.registered_name.ilike(like_pattern))) 
-        )
+        query = filter_query_by_search_term(query, search_term)
 
     #Once filter is retrieved from input, see if it matches postion type, job address or salary
     if position_type:
-        query = query.filter_by(position_type=position_type)
+        query = query.filter(JobListing.position_type == position_type)
 
     if job_site_address:
-        query = query.filter_by(job_site_address=job_site_address)
+        query = query.filter(JobListing.job_site_address == job_site_address)
 
     if min_salary is not None and max_salary is not None:
         query = query.filter(
@@ -436,7 +565,26 @@ def search_jobs():
             JobListing.monthly_salary_ttd <= max_salary
         )
 
-    jobs = query.all()
+    if company_id is not None:
+        query = query.filter(JobListing.company_id == company_id)
+
+    query = query.join(JobListing.company)
+    query = query.offset(offset).limit(limit) if search_term else paginate_by_keyset(query, limit, after)
+
+    #Only the columns a job card shows (and the cursor needs) are selected, no JobListing objects are loaded
+    jobs = query.with_entities(
+        JobListing.id,
+        JobListing.title,
+        JobListing.position_type,
+        JobListing.job_site_address,
+        JobListing.datetime_created,
+        CompanyAccount.registered_name,
+        CompanyAccount.profile_photo_file_path
+    ).all()
+    if search_term:
+        next_cursor = encode_rank_cursor(offset + limit) if len(jobs) == limit else None
+    else:
+        next_cursor = get_next_cursor(jobs, limit)
 
     #return a list for front end use to render job info
     job_data = [ {
@@ -444,11 +592,30 @@ def search_jobs():
         'title': job.title,
         'position_type': job.position_type,
         'job_site_address': job.job_site_address,
-        'company_name': job.company.registered_name,
-        'company_logo': url_for('static', filename=job.company.profile_photo_file_path)
+        'company_name': job.registered_name,
+        'company_logo': url_for('static', filename=get_thumbnail_path(job.profile_photo_file_path))
     } for job in jobs ]
 
-    return jsonify(job_data)  # Always return a list — even if it's empty, this is so user can get output messages when searches turn up empty
+    #Warm the index back up for the next searches, off the request path
+    if current_app.config.get('LISTING_SEARCH_INDEX_ENABLED'):
+        queue_listing_search_index_refresh()
+
+    return job_data, next_cursor
+
+@alumnus_views.route('/search_listings', methods=['GET'])
+@jwt_required()
+@conditional_view(get_listing_search_validators)
+@cached_response(LISTINGS_NAMESPACE)
+def search_jobs():
+    try:
+        job_data, next_cursor = search_approved_listings()
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    response = jsonify(job_data)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response  # Always return a list — even if it's empty, this is so user can get output messages when searches turn up empty
 
 @alumnus_views.route('/api/apply_to_listing/<int:job_listing_id>', methods=['POST'])
 @jwt_required()
@@ -456,18 +623,12 @@ def api_apply(job_listing_id):
    
     # Get form data
     work_experience = request.form.get("work-experience")
-    resume = request.files["resume"]
-
-    # Secure and save filename
-    filename = secure_filename(resume.filename)
-    static_folder = os.path.join(current_app.root_path, 'static')
-    resume_path = os.path.join(static_folder, 'uploads', 'resumes', filename)
-    file_path = os.path.join('uploads', 'resumes', filename)
-
-    # Save the file to the directory
-    resume.save(resume_path)  # This actually writes the file!
-    resume_path = resume_path.replace("\\", "/")
-    file_path = file_path.replace("\\", "/")
+
+    # Stored once per distinct file, under the SHA-256 of its content (see App/utils/resume_storage.py)
+    try:
+        file_path = store_resume(request.files["resume"])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     alumnus_id = current_user.id
 
     # Create a new JobApplication record
@@ -496,53 +657,15 @@ def api_save_job_listing(job_listing_id):
     return jsonify({"message": "Job saved successfully!", "status": "saved"}), 200
 
 @alumnus_views.route('/api/search_listings', methods=['GET'])
+@conditional_view(get_listing_search_validators)
+@cached_response(LISTINGS_NAMESPACE)
 def api_search_jobs():
-    #input by the user in search bar
-    search_term = request.args.get('search','')
-    #chosen postion type
-    position_type = request.args.get('position')
-    #chosen address
-    job_site_address = request.args.get('location')
-    #Salary range
-    min_salary = request.args.get('min_salary', type=int)
-    max_salary = request.args.get('max_salary', type=int)
-
-    #Ensure it only searches approved/published listings
-    query = JobListing.query.filter_by(admin_approval_status='APPROVED')
-    
-    #Once term is retrieved from input, see if it matches any company names or job titles 
-    if search_term:
-        search_term = search_term.strip()
-        like_pattern = f"%{search_term}%"
-        query = query.filter(
-            (JobListing.title.ilike(like_pattern)) |
-            (JobListing.company.has(CompanyAccount.registered_name.ilike(like_pattern))) 
-        )
-
-    #Once filter is retrieved from input, see if it matches postion type, job address or salary
-    if position_type:
-        query = query.filter_by(position_type=position_type)
-
-    if job_site_address:
-        query = query.filter_by(job_site_address=job_site_address)
-
-    if min_salary is not None and max_salary is not None:
-        query = query.filter(
-            JobListing.monthly_salary_ttd >= min_salary,
-            JobListing.monthly_salary_ttd <= max_salary
-        )
-
-    jobs = query.all()
-
-    #return a list for front end use to render job info
-    job_data = [ {
-        'id': job.id,
-        'title': job.title,
-        'position_type': job.position_type,
-        'job_site_address': job.job_site_address,
-        'company_name': job.company.registered_name,
-        'company_logo': url_for('static', filename=job.company.profile_photo_file_path)
-    } for job in jobs ]
-
-    return jsonify(job_data),200  # Always return a list — even if it's empty, this is so user can get output messages when searches turn up empty
-
+    try:
+        job_data, next_cursor = search_approved_listings()
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    response = jsonify(job_data)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response,200  # Always return a list — even if it's empty, this is so user can get output messages when searches turn up empty
\ No newline at end of file
@@ -137,7 +137,6 @@ API Routes
 @auth_views.route('/api/login', methods=['POST'])
 def user_login_api():
     data = request.json
-    print("Incoming JSON data:", data)
     response = login(data['login_email'], data['password'])
 
     if not response:
@@ -156,7 +155,6 @@ def identify_user():
 @jwt_required()
 def update_user():
     data = request.json
-    print("Incoming JSON PUT data:", data)
     # current_user.first_name = data.get('fname')
     # current_user.last_name = data.get('lname')
     # return jsonify({'message': f"First Name: {current_user.first_name}, Last Name : {current_user.last_name}"})
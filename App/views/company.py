@@ -1,9 +1,7 @@
-import os
 from flask import Blueprint, current_app, flash, make_response, redirect, render_template, request, url_for, jsonify
 from App.controllers.base_user_account import get_user_by_email
 from App.models import db
 from datetime import date, datetime
-from werkzeug.utils import secure_filename
 from flask_jwt_extended import current_user, jwt_required, unset_jwt_cookies
 
 from App.controllers.company_account import get_company_account, update_company_account
@@ -13,8 +11,14 @@ from App.controllers.job_listing import (
     get_job_listing,
     update_job_listing,
 )
+from App.controllers.notification_counts import get_unread_notification_count
+from App.controllers.notification_events import notification_stream_response
+from App.utils.db_utils import encode_cursor, get_next_cursor, get_pagination_args
+from App.utils.images import save_profile_image
 from App.controllers.notifications import (
+    get_unread_notifications_by_account,
     mark_notification_as_reviewed,
+    mark_notifications_as_reviewed,
     notify_admins,
     notify_company_account,
     notify_subscribed_alumni
@@ -110,19 +114,9 @@ def update_profile_photo(id):
 
     if file:
         try:
-            # Ensure secure filename
-            filename = secure_filename(file.filename)
-
-            # Build absolute path to save
-            save_folder = os.path.join(current_app.root_path, 'static', 'profile-images')
-            os.makedirs(save_folder, exist_ok=True)
-
-            # Save file
-            file_path = os.path.join(save_folder, filename)
-            file.save(file_path)
-
-            # Save relative path in DB (for use with url_for('static', filename=...))
-            relative_path = f"profile-images/{filename}"
+            # Resized, re-encoded and stored under a content-hashed name (see App/utils/images.py).
+            # Relative to the static folder, for use with url_for('static', filename=...)
+            relative_path = save_profile_image(file)
 
             # Update database
             company = get_company_account(id)
@@ -214,7 +208,7 @@ def request_delete_listing_action(job_id):
     
     except Exception as e:
         flash('Could not send deletion request.', 'unsuccessful')
-        print(f"Error requesting listing deletion: {e}")
+        current_app.logger.warning("Could not request the deletion of listing %s: %s", job_id, e)
         return redirect(url_for('index_views.index_page'))
 
 
@@ -269,11 +263,8 @@ def view_applications_page(id):
     # get the listing
     listing = get_job_listing(id)
 
-    print(listing)
-
     try:
         applications = get_job_applications_by_job_listing_id(listing.id)
-        print(applications)
         return render_template('viewapp-company.html', applications=applications, user=current_user)
 
     except Exception:
@@ -296,8 +287,14 @@ def view_notifications_page():
 
     try:
         # Fetch notifications for the company
-        notifications = current_user.notifications.filter_by(reviewed_by_user=False).all()
-        return render_template('company_notifications.html', notifications=notifications, company=current_user)
+        # Only the first page is rendered, the rest are loaded on demand
+        page_size = current_app.config.get('NOTIFICATION_PAGE_SIZE', 20)
+        notifications = get_unread_notifications_by_account(current_user, limit=page_size)
+        return render_template(
+            'company_notifications.html', notifications=notifications, company=current_user,
+            next_cursor=get_next_cursor(notifications, page_size),
+            mark_all_cursor=encode_cursor(notifications[0].created_at, notifications[0].id) if notifications else None
+        )
 
     except Exception as e:
         flash('Error retrieving notifications', 'unsuccessful')
@@ -322,13 +319,67 @@ def check_notifications():
         flash('Unauthorized access', 'unsuccessful')
         return redirect(url_for('index_views.index_page'))
 
-    # Fetch unread notifications for the current user
-    unread_notifications = Notification.query.filter_by(
-    company_id=current_user.id, reviewed_by_user=False).all()
+    # Read the account's unread counter rather than loading its unread notifications
+    unread_count = get_unread_notification_count(current_user)
+    return jsonify({'has_new_notifications': unread_count > 0, 'unread_count': unread_count})
+
+
+@company_views.route('/company_notifications/stream', methods=['GET'])
+@jwt_required()
+def stream_notifications():
+    """
+    Streams the current company's new notifications as Server-Sent Events.
+    """
+    if not isinstance(current_user, CompanyAccount):
+        return jsonify({'error': 'Unauthorized access'}), 403
+
+    return notification_stream_response(current_user)
+
+
+@company_views.route('/company_notifications/page', methods=['GET'])
+@jwt_required()
+def get_notifications_page():
+    """
+    Returns a page of the current company's unread notifications as JSON, newest first.
+    The cursor of the next page (if any) is returned in the X-Next-Cursor header.
+    """
+    if not isinstance(current_user, CompanyAccount):
+        return jsonify({'error': 'Unauthorized access'}), 403
+
+    limit, after = get_pagination_args(
+        request.args,
+        current_app.config.get('NOTIFICATION_PAGE_SIZE', 20),
+        current_app.config.get('NOTIFICATION_MAX_PAGE_SIZE', 100)
+    )
+    try:
+        notifications = get_unread_notifications_by_account(current_user, True, limit, after)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    response = jsonify(notifications)
+    next_cursor = get_next_cursor(notifications, limit)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+
+@company_views.route('/update/company/notification_status', methods=['POST'])
+@jwt_required()
+def bulk_notification_status():
+    """
+    Marks several of the current company's notifications as read in one UPDATE, given either a list
+    of `ids` or a `through` cursor (the newest notification to mark) in the JSON body.
+    """
+    if not isinstance(current_user, CompanyAccount):
+        return jsonify({'success': False, 'message': 'Unauthorized access'}), 403
+
+    data = request.get_json(silent=True) or {}
+    try:
+        updated = mark_notifications_as_reviewed(current_user, data.get('ids'), data.get('through'))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
 
-    # Determine if there are new notifications
-    has_new_notifications = len(unread_notifications) > 0
-    return jsonify({'has_new_notifications': has_new_notifications})
+    return jsonify({'success': True, 'updated': updated}), 200
 
 """
 ====== COMPANY APPLICATION HANDLING ======
@@ -385,7 +436,6 @@ def update_status(id):
 @jwt_required()
 def api_add_listing_action():
     data = request.json
-    print("Incoming JSON PUT data:", data)
     response = None
 
     try:
@@ -433,7 +483,6 @@ def api_request_delete_listing_action(job_id):
 @jwt_required()   
 def api_update_status(id):
     new_status = request.form.get('status')
-    print("Incoming JSON POST data:", new_status)
     application = JobApplication.query.filter_by(id=id).first()
     
     if not application:
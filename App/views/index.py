@@ -1,6 +1,8 @@
-from flask import Blueprint, redirect, render_template, jsonify, url_for
+from flask import Blueprint, current_app, redirect, render_template, jsonify, url_for
 from App.models import db
 from flask_jwt_extended import current_user, jwt_required
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 
 from App.controllers import (
     get_all_job_listings,
@@ -22,6 +24,8 @@ from App.controllers.saved_job_listing import (
     get_saved_job_listings_by_alumnus_id
 )
 
+from App.utils.db_utils import get_next_cursor
+
 from App.models import (
     AlumnusAccount,
     CompanyAccount,
@@ -38,21 +42,24 @@ index_views = Blueprint(
 @index_views.route('/app', methods=['GET'])
 @jwt_required()
 def index_page():
-    jobs = get_all_job_listings()
     companies = get_all_company_accounts()
-    approved_jobs = get_approved_listings()
 
     # Use current_user directly if already loaded
     user = current_user
 
     if isinstance(user, AlumnusAccount):
-        saved = get_saved_job_listings_by_alumnus_id(user.id)
-        applications = get_job_applications_by_alumnus_id(user.id)
+        saved = get_saved_job_listings_by_alumnus_id(user.id, loading_profile="saved_listing_with_listing")
+        applications = get_job_applications_by_alumnus_id(user.id, loading_profile="application_with_listing")
+
+        # Only the first page is rendered, the rest are loaded from /search_listings while scrolling
+        page_size = current_app.config.get('LISTING_PAGE_SIZE', 20)
+        approved_jobs = get_approved_listings(limit=page_size, loading_profile="listing_card")
 
         show_modal = False  # TODO: Replace with `user.has_seen_modal`
         return render_template(
             'alumnus.html',
             jobs=approved_jobs,
+            next_cursor=get_next_cursor(approved_jobs, page_size),
             show_modal=show_modal,
             companies=companies,
             user=user,
@@ -61,6 +68,7 @@ def index_page():
         )
 
     if isinstance(user, CompanyAccount):
+        approved_jobs = get_approved_listings()
         company_listings = get_job_listings_by_company_id(user.id)
         return render_template(
             'company-view.html',
@@ -71,6 +79,7 @@ def index_page():
         )
 
     if isinstance(user, AdminAccount):
+        jobs = get_all_job_listings()
         return render_template('admin.html', jobs=jobs, user=user)
 
     return redirect(url_for('auth_views.login'))
@@ -138,5 +147,14 @@ def init():
 
 
 @index_views.route('/health', methods=['GET'])
+@index_views.route('/healthcheck', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'healthy'})
+    # Healthy only if the database answers, so that the platform stops routing to a worker that lost it
+    try:
+        db.session.execute(text('SELECT 1'))
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        current_app.logger.warning("Health check failed: %s", e)
+        return jsonify({'status': 'unhealthy', 'database': 'unavailable'}), 503
+
+    return jsonify({'status': 'healthy', 'database': 'ok'})
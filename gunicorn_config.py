@@ -1,5 +1,7 @@
 # gunicorn_config.py
 import multiprocessing
+import os
+import shutil
 
 # The socket to bind.
 # "0.0.0.0" to bind to all interfaces. 8000 is the port number.
@@ -17,3 +19,21 @@ loglevel = 'info'
 # Where to log to
 accesslog = '-'  # '-' means log to stdout
 errorlog = '-'  # '-' means log to stderr
+
+# Workers share their Prometheus metrics through files in this folder (see App/utils/metrics.py). It is set
+# here, before the workers start, and emptied at startup so that no counter outlives the server.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance", "prometheus"))
+
+
+def on_starting(server):
+    shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+
+
+def child_exit(server, worker):
+    # Drops the exited worker's live gauges (e.g. connections in use); its counters keep counting
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,41 @@
+"""add composite indexes for approved job listing queries
+
+Revision ID: 3f1c2a9d7b10
+Revises: 
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+INDEXES = {
+    'ix_job_listings_approval_status_created': ['admin_approval_status', 'datetime_created'],
+    'ix_job_listings_company_approval_status': ['company_id', 'admin_approval_status'],
+}
+
+
+def _existing_indexes():
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('job_listings')}
+
+
+def upgrade():
+    # Databases created with `flask init` after the indexes were added to the model already have them
+    existing = _existing_indexes()
+    for name, columns in INDEXES.items():
+        if name not in existing:
+            op.create_index(name, 'job_listings', columns, unique=False)
+
+
+def downgrade():
+    existing = _existing_indexes()
+    for name in INDEXES:
+        if name in existing:
+            op.drop_index(name, table_name='job_listings')
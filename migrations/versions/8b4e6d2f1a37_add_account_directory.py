@@ -0,0 +1,38 @@
+"""add account directory table
+
+Revision ID: 8b4e6d2f1a37
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b4e6d2f1a37'
+down_revision = '3f1c2a9d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created with `flask init` after the model was added already have the table.
+    # The directory is backfilled on the next start-up (or with `flask user rebuild-directory`).
+    if sa.inspect(op.get_bind()).has_table('account_directory'):
+        return
+
+    op.create_table(
+        'account_directory',
+        sa.Column('field', sa.String(length=50), nullable=False),
+        sa.Column('value', sa.String(length=255), nullable=False),
+        sa.Column('account_type', sa.String(length=50), nullable=False),
+        sa.Column('account_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('field', 'value')
+    )
+    op.create_index('ix_account_directory_account', 'account_directory', ['account_type', 'account_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_account_directory_account', table_name='account_directory')
+    op.drop_table('account_directory')
@@ -0,0 +1,52 @@
+"""key account directory entries by account type
+
+Revision ID: 9d4b2e7a5c13
+Revises: b8e1f4a6c29d
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4b2e7a5c13'
+down_revision = 'b8e1f4a6c29d'
+branch_labels = None
+depends_on = None
+
+GLOBAL_DIRECTORY_CONDITION = "field IN ('login_email', 'phone_number')"
+
+
+def _create_directory(primary_key):
+    op.create_table(
+        'account_directory',
+        sa.Column('field', sa.String(length=50), nullable=False),
+        sa.Column('value', sa.String(length=255), nullable=False),
+        sa.Column('account_type', sa.String(length=50), nullable=False),
+        sa.Column('account_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint(*primary_key)
+    )
+    op.create_index('ix_account_directory_account', 'account_directory', ['account_type', 'account_id'], unique=False)
+
+
+def upgrade():
+    # Login emails and phone numbers stay unique across account types, as sign-up checked them against
+    # every account table. Website URLs and registered names only belong to company accounts, so they
+    # are keyed by type with the other fields. The directory only holds derived data: it is recreated
+    # empty, and backfilled on the next start-up (or with `flask user rebuild-directory`, which lists the
+    # values held by more than one account).
+    op.drop_index('ix_account_directory_account', table_name='account_directory')
+    op.drop_table('account_directory')
+    _create_directory(['field', 'value', 'account_type'])
+    op.create_index(
+        'uq_account_directory_global_value', 'account_directory', ['field', 'value'], unique=True,
+        sqlite_where=sa.text(GLOBAL_DIRECTORY_CONDITION), postgresql_where=sa.text(GLOBAL_DIRECTORY_CONDITION)
+    )
+
+
+def downgrade():
+    op.drop_index('uq_account_directory_global_value', table_name='account_directory')
+    op.drop_index('ix_account_directory_account', table_name='account_directory')
+    op.drop_table('account_directory')
+    _create_directory(['field', 'value'])
@@ -0,0 +1,44 @@
+"""add pending listing events table
+
+Revision ID: a4c7e2b9d361
+Revises: f3a9c1e7b254
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c7e2b9d361'
+down_revision = 'f3a9c1e7b254'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created with `flask init` after the model was added already have the table
+    if sa.inspect(op.get_bind()).has_table('pending_listing_events'):
+        return
+
+    op.create_table(
+        'pending_listing_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column('listing_id', sa.Integer(), nullable=False),
+        sa.Column('event', sa.String(length=20), nullable=False),
+        sa.Column('message', sa.String(length=1000), nullable=False),
+        sa.Column('job_title', sa.String(length=255), nullable=False),
+        sa.Column('company_name', sa.String(length=255), nullable=False),
+        sa.Column('job_location', sa.String(length=255), nullable=True),
+        sa.Column('job_url', sa.String(length=500), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['company_id'], ['company_accounts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_pending_listing_events_created_at'), 'pending_listing_events', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_pending_listing_events_created_at'), table_name='pending_listing_events')
+    op.drop_table('pending_listing_events')
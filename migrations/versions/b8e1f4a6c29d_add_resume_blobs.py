@@ -0,0 +1,38 @@
+"""add resume blobs table
+
+Revision ID: b8e1f4a6c29d
+Revises: a4c7e2b9d361
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e1f4a6c29d'
+down_revision = 'a4c7e2b9d361'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created with `flask init` after the model was added already have the table
+    if sa.inspect(op.get_bind()).has_table('resume_blobs'):
+        return
+
+    op.create_table(
+        'resume_blobs',
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('path', sa.String(length=255), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('last_stored_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('content_hash'),
+        sa.UniqueConstraint('path')
+    )
+
+
+def downgrade():
+    op.drop_table('resume_blobs')
@@ -0,0 +1,46 @@
+"""add email outbox table
+
+Revision ID: c5d9e3a1f482
+Revises: 8b4e6d2f1a37
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d9e3a1f482'
+down_revision = '8b4e6d2f1a37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created with `flask init` after the model was added already have the table
+    if sa.inspect(op.get_bind()).has_table('email_outbox'):
+        return
+
+    op.create_table(
+        'email_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('recipient_email', sa.String(length=255), nullable=False),
+        sa.Column('subject', sa.String(length=255), nullable=False),
+        sa.Column('text_content', sa.Text(), nullable=False),
+        sa.Column('html_content', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('claim_token', sa.String(length=32), nullable=True),
+        sa.Column('claimed_at', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.String(length=1000), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_email_outbox_status_next_attempt', 'email_outbox', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_email_outbox_status_next_attempt', table_name='email_outbox')
+    op.drop_table('email_outbox')
@@ -0,0 +1,46 @@
+"""add unread notification counters to accounts
+
+Revision ID: d7a2f6c8e914
+Revises: c5d9e3a1f482
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a2f6c8e914'
+down_revision = 'c5d9e3a1f482'
+branch_labels = None
+depends_on = None
+
+# Account table -> notifications column naming it as the recipient
+ACCOUNT_TABLES = {
+    'alumnus_accounts': 'alumnus_id',
+    'company_accounts': 'company_id',
+    'admin_accounts': 'admin_id'
+}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    for table, recipient_column in ACCOUNT_TABLES.items():
+        # Databases created with `flask init` after the model was changed already have the column
+        if 'unread_notification_count' not in {column['name'] for column in inspector.get_columns(table)}:
+            op.add_column(table, sa.Column(
+                'unread_notification_count', sa.Integer(), nullable=False, server_default='0'
+            ))
+
+        op.execute(
+            f"UPDATE {table} SET unread_notification_count = ("
+            f"SELECT COUNT(*) FROM notifications WHERE notifications.{recipient_column} = {table}.id "
+            f"AND notifications.reviewed_by_user = false)"
+        )
+
+
+def downgrade():
+    for table in ACCOUNT_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('unread_notification_count')
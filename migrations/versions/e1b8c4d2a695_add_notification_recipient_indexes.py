@@ -0,0 +1,42 @@
+"""add composite indexes for notification pages
+
+Revision ID: e1b8c4d2a695
+Revises: d7a2f6c8e914
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1b8c4d2a695'
+down_revision = 'd7a2f6c8e914'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = {
+    'ix_notifications_alumnus_reviewed_created': ['alumnus_id', 'reviewed_by_user', 'created_at'],
+    'ix_notifications_company_reviewed_created': ['company_id', 'reviewed_by_user', 'created_at'],
+    'ix_notifications_admin_reviewed_created': ['admin_id', 'reviewed_by_user', 'created_at'],
+}
+
+
+def _existing_indexes():
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('notifications')}
+
+
+def upgrade():
+    # Databases created with `flask init` after the indexes were added to the model already have them
+    existing = _existing_indexes()
+    for name, columns in INDEXES.items():
+        if name not in existing:
+            op.create_index(name, 'notifications', columns, unique=False)
+
+
+def downgrade():
+    existing = _existing_indexes()
+    for name in INDEXES:
+        if name in existing:
+            op.drop_index(name, table_name='notifications')
@@ -0,0 +1,45 @@
+"""add notification archive table
+
+Revision ID: f3a9c1e7b254
+Revises: e1b8c4d2a695
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a9c1e7b254'
+down_revision = 'e1b8c4d2a695'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created with `flask init` after the model was added already have the table and index
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('notification_archive'):
+        op.create_table(
+            'notification_archive',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('recipient_type', sa.String(length=20), nullable=False),
+            sa.Column('recipient_id', sa.Integer(), nullable=False),
+            sa.Column('message', sa.String(length=1000), nullable=False),
+            sa.Column('occurrences', sa.Integer(), nullable=False),
+            sa.Column('first_created_at', sa.DateTime(), nullable=True),
+            sa.Column('last_created_at', sa.DateTime(), nullable=True),
+            sa.Column('archived_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('recipient_type', 'recipient_id', 'message', name='uq_notification_archive_digest')
+        )
+
+    if 'ix_notifications_reviewed_created' not in {index['name'] for index in inspector.get_indexes('notifications')}:
+        op.create_index('ix_notifications_reviewed_created', 'notifications', ['reviewed_by_user', 'created_at'],
+                        unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_notifications_reviewed_created', table_name='notifications')
+    op.drop_table('notification_archive')
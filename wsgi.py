@@ -4,9 +4,13 @@ from App.database import db, get_migrate
 
 # Import CLI command groups
 from App.cli.admin_cli import admin_cli
+from App.cli.assets_cli import assets_cli
 from App.cli.alumnus_cli import alumnus_cli
 from App.cli.company_cli import company_cli
+from App.cli.email_cli import email_cli
 from App.cli.job_listing_cli import job_listing_cli
+from App.cli.notification_cli import notification_cli
+from App.cli.resume_cli import resume_cli
 from App.cli.user_cli import user_cli
 from App.cli.test_cli import test_cli
 
@@ -21,9 +25,13 @@ migrate = get_migrate(app)
 
 # Register CLI commands
 app.cli.add_command(admin_cli)
+app.cli.add_command(assets_cli)
 app.cli.add_command(alumnus_cli)
 app.cli.add_command(company_cli)
+app.cli.add_command(email_cli)
 app.cli.add_command(job_listing_cli)
+app.cli.add_command(notification_cli)
+app.cli.add_command(resume_cli)
 app.cli.add_command(user_cli)
 app.cli.add_command(test_cli)
 